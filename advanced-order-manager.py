@@ -1,14 +1,20 @@
 
 # modules/advanced_order_manager.py
 
+from collections import deque
 from datetime import datetime
 import logging
+import time
 import numpy as np
+from order_book import OrderBookManager
 
 class AdvancedOrderManager:
-    def __init__(self, exchange, config):
+    def __init__(self, exchange, config, ob_manager=None):
         self.exchange = exchange
         self.config = config
+        # Feed'den beslenen kitap yoksa giriş fiyatlaması için REST ile doldurulan yerel kitap
+        self.owns_book = ob_manager is None
+        self.ob_manager = ob_manager or OrderBookManager('XBTUSDT')
         self.logger = logging.getLogger(__name__)
         
         self.active_orders = {
@@ -18,42 +24,138 @@ class AdvancedOrderManager:
         }
         
         self.position = None
-        self.slippage_data = []
+        self.trailing_stop = None
+        self.execution = None
+        self.reconciler = None
+        self.quality = None
+        # Son dolumlar, kalıcı kayıt execution_quality / trade_store'da
+        self.slippage_data = deque(maxlen=config.get('slippage_history', 1000))
         self.entry_delay = None
         self.last_signal = None
+        self.last_impact = None
 
-    def calculate_entry_level(self, signal_price, direction):
+    def attach_trailing_stop(self, engine):
+        """Stop emirlerini takip edecek trailing stop motorunu bağla"""
+        self.trailing_stop = engine
+
+    def attach_execution(self, engine):
+        """Büyük girişleri child emirlere bölecek execution motorunu bağla"""
+        self.execution = engine
+        engine.add_listener(self._record_parent_report)
+
+    def attach_execution_quality(self, tracker):
+        """Gönderilen emirlerin varış fiyatı ve kitap durumunu kaydedecek izleyiciyi bağla"""
+        self.quality = tracker
+
+    def attach_reconciler(self, reconciler):
+        """Emir / dolum düzeltmelerini uzlaştırıcıdan al, pozisyonu yerelden oku"""
+        self.reconciler = reconciler
+        reconciler.add_listener(self._on_reconciliation)
+
+    def _on_reconciliation(self, kind, payload):
+        if kind == 'orders':
+            self.reconcile_orders(payload['open_ids'], payload['cutoff'])
+        elif kind == 'fill':
+            self.calculate_slippage(payload['order'], payload['price'])
+
+    def _record_parent_report(self, report):
+        """Tamamlanan parent emrin slipajını kaydet"""
+        if report['average_price'] is None:
+            return
+        slippage = abs(report['average_price'] - report['arrival_price'])
+        self.slippage_data.append({
+            'timestamp': datetime.now(),
+            'order_type': f"entry_{report['algo']}",
+            'intended_price': report['arrival_price'],
+            'execution_price': report['average_price'],
+            'slippage': slippage,
+            'slippage_percent': slippage / report['arrival_price'] * 100,
+            'fill_rate': report['fill_rate']
+        })
+
+    def _recent_slippage(self):
+        """Son dolumların medyan kayma yüzdesi"""
+        window = self.config.get('slippage_window', 50)
+        recent = [entry['slippage_percent'] for entry in list(self.slippage_data)[-window:]]
+        return float(np.median(recent)) if recent else 0.0
+
+    def estimate_impact(self, direction, quantity):
+        """
+        Emir miktarı için beklenen dolum fiyatı ve kayma
+
+        Bellekteki kitap üzerinde kümülatif derinlik yürünür, geçmiş
+        slippage_data'dan medyan kayma eklenir. Görünür derinliğin yetmediği
+        kısım en kötü seviyeden bir kayma payıyla fiyatlanır.
+        """
+        side = 'buy' if direction == 'long' else 'sell'
+        book = self.ob_manager
+        if not len(book.bids) or not len(book.asks):
+            return None
+
+        walk = book.walk_depth(side, quantity)
+        if walk is None:
+            return None
+
+        sign = 1 if side == 'buy' else -1
+        average = walk['average_price']
+        if walk['shortfall'] > 0:
+            # İnce kitap: kalan miktar en kötü seviyenin ötesinde dolar
+            penalty = self.config.get('thin_book_penalty_percent', 0.1) / 100
+            beyond = walk['worst_price'] * (1 + sign * penalty)
+            average = (average * walk['filled'] + beyond * walk['shortfall']) / quantity
+
+        expected = average * (1 + sign * self._recent_slippage() / 100)
+        touch = book.best_ask() if side == 'buy' else book.best_bid()
+        return {
+            'expected_price': expected,
+            'impact_bps': float(sign * (expected - touch) / touch * 10000),
+            'levels': walk['levels'],
+            'shortfall': walk['shortfall']
+        }
+
+    def calculate_entry_level(self, signal_price, direction, quantity=None):
         """OrderBook derinliğine göre giriş seviyesi hesapla"""
-        orderbook = self.exchange.fetch_order_book('XBTUSDT')
-        if not orderbook:
+        if self.owns_book or not len(self.ob_manager.asks):
+            # Feed yoksa veya kitap henüz dolmadıysa REST ile doldur
+            orderbook = self.exchange.fetch_order_book('XBTUSDT')
+            if orderbook:
+                self.ob_manager.update(orderbook)
+
+        impact = self.estimate_impact(direction, quantity or 1)
+        if impact is None:
             return signal_price
-            
+        self.last_impact = impact
+
         if direction == 'long':
-            # En iyi 5 ask seviyesini kontrol et
-            asks = orderbook['asks'][:5]
-            weighted_price = np.average([price for price, _ in asks], 
-                                      weights=[vol for _, vol in asks])
-            return min(weighted_price, signal_price)
-        else:
-            # En iyi 5 bid seviyesini kontrol et
-            bids = orderbook['bids'][:5]
-            weighted_price = np.average([price for price, _ in bids],
-                                      weights=[vol for _, vol in bids])
-            return max(weighted_price, signal_price)
-
-    def place_orders(self, signal_type, signal_price):
-        """Emir yerleştirme"""
+            return min(impact['expected_price'], signal_price)
+        return max(impact['expected_price'], signal_price)
+
+    def calculate_position_size(self, free_balance):
+        """Serbest bakiyenin position_size_percent kadarı (gönderilen emir miktarı)"""
+        return (free_balance * self.config['position_size_percent']) / 100
+
+    def place_orders(self, signal_type, signal_price, position_size=None):
+        """
+        Emir yerleştirme
+
+        Args:
+            position_size: Risk aşamasında kontrol edilen miktar; verilmezse
+                           güncel bakiyeden hesaplanır
+        """
         try:
             # Mevcut emirleri temizle
             self.cancel_all_orders()
             
+            # Uzlaştırma bu andan sonra başlayan açık emir listesine göre siler
+            submitted_at = time.time()
+
             # Pozisyon büyüklüğü hesapla
-            balance = self.exchange.fetch_balance()
-            free_balance = balance['free']['USDT']
-            position_size = (free_balance * self.config['position_size_percent']) / 100
+            if position_size is None:
+                balance = self.exchange.fetch_balance()
+                position_size = self.calculate_position_size(balance['free']['USDT'])
             
             # En iyi giriş seviyesini hesapla
-            entry_price = self.calculate_entry_level(signal_price, signal_type)
+            entry_price = self.calculate_entry_level(signal_price, signal_type, position_size)
             
             # Stop Loss hesapla
             if signal_type == 'long':
@@ -61,81 +163,144 @@ class AdvancedOrderManager:
             else:
                 stop_price = entry_price * (1 + self.config['stop_loss_percent'] / 100)
 
-            # Ana emir
-            main_order = self.exchange.create_order(
-                symbol='XBTUSDT',
-                type='stop_market',
-                side='buy' if signal_type == 'long' else 'sell',
-                amount=position_size,
-                params={
-                    'stopPx': entry_price,
-                    'execInst': 'Last',
-                    'closeOnTrigger': False
-                }
-            )
+            # Ana emir, büyük girişler TWAP / iceberg / limit merdiveni ile bölünür
+            if self.execution and self.execution.should_slice(position_size):
+                parent = self.execution.submit(
+                    'XBTUSDT',
+                    'buy' if signal_type == 'long' else 'sell',
+                    position_size,
+                    reference_price=entry_price
+                )
+                main_order = {'id': parent.id, 'parent': True}
+            else:
+                main_order = self.exchange.create_order(
+                    symbol='XBTUSDT',
+                    type='stop_market',
+                    side='buy' if signal_type == 'long' else 'sell',
+                    amount=position_size,
+                    params={
+                        'stopPx': entry_price,
+                        'execInst': 'Last',
+                        'closeOnTrigger': False
+                    }
+                )
             
             # Stop Loss emri
-            sl_order = self.exchange.create_order(
-                symbol='XBTUSDT',
-                type='stop',
-                side='sell' if signal_type == 'long' else 'buy',
-                amount=position_size,
-                params={
-                    'stopPx': stop_price,
-                    'execInst': 'Last',
-                    'closeOnTrigger': True
-                }
-            )
+            sl_params = {
+                'stopPx': stop_price,
+                'execInst': 'Last',
+                'closeOnTrigger': True
+            }
+            native_trailing = self.trailing_stop and self.trailing_stop.enabled and self.trailing_stop.native
+            if native_trailing:
+                # Exchange tarafında TrailingStopPeg, stopPx exchange tarafından belirlenir
+                sl_params.pop('stopPx')
+                sl_params.update(self.trailing_stop.native_params(signal_type, entry_price))
+                sl_params['execInst'] = 'LastPrice,Close'
+                sl_params.pop('closeOnTrigger')
+
+            try:
+                sl_order = self.exchange.create_order(
+                    symbol='XBTUSDT',
+                    type='stop',
+                    side='sell' if signal_type == 'long' else 'buy',
+                    amount=position_size,
+                    params=sl_params
+                )
+            except Exception:
+                # Stop konamadıysa giriş emri korumasız kalmasın
+                self._abort_entry(main_order)
+                raise
             
+            if self.quality:
+                side = 'buy' if signal_type == 'long' else 'sell'
+                if not main_order.get('parent'):
+                    self.quality.on_submit(main_order['id'], f'entry_{signal_type}', side, position_size, entry_price)
+                self.quality.on_submit(
+                    sl_order['id'], 'stop_loss', 'sell' if side == 'buy' else 'buy', position_size, stop_price
+                )
+
             # Emirleri kaydet
             self.active_orders[f'entry_{signal_type}'] = {
                 'order': main_order,
-                'intended_price': entry_price
+                'intended_price': entry_price,
+                'submitted_at': submitted_at
             }
             
             self.active_orders['stop_loss'] = {
                 'order': sl_order,
-                'intended_price': stop_price
+                'intended_price': stop_price,
+                'submitted_at': submitted_at,
+                'side': 'sell' if signal_type == 'long' else 'buy',
+                'amount': position_size
             }
             
-            self.logger.info(f"Orders placed - Type: {signal_type}, Entry: {entry_price}, Stop: {stop_price}")
+            if self.trailing_stop:
+                self.trailing_stop.track(
+                    sl_order, 'XBTUSDT', signal_type, stop_price, position_size, entry_price
+                )
+            
+            self.logger.info(
+                f"Orders placed - Type: {signal_type}, Entry: {entry_price}, Stop: {stop_price}",
+                extra={
+                    'order_id': main_order['id'],
+                    'stop_order_id': sl_order['id'],
+                    'side': signal_type,
+                    'amount': position_size,
+                    'entry_price': entry_price,
+                    'stop_price': stop_price
+                }
+            )
             return True
             
         except Exception as e:
             self.logger.error(f"Order placement error: {e}")
             return False
 
+    def _abort_entry(self, main_order):
+        """Stop emri başarısız olduğunda giriş emrini geri çek"""
+        try:
+            if main_order.get('parent'):
+                report = self.execution.cancel(main_order['id'])
+                if report and report['filled'] > 0:
+                    # Dolmuş dilimler stopsuz kalmasın, reduce-only ile kapat
+                    self.exchange.create_order(
+                        symbol='XBTUSDT',
+                        type='market',
+                        side='sell' if report['side'] == 'buy' else 'buy',
+                        amount=report['filled'],
+                        params={'execInst': 'ReduceOnly'}
+                    )
+            else:
+                self.exchange.cancel_order(main_order['id'], 'XBTUSDT')
+            self.logger.error(
+                "Stop loss placement failed, entry order withdrawn",
+                extra={'order_id': main_order['id']}
+            )
+        except Exception as e:
+            self.logger.critical(
+                f"Stop loss placement failed and entry cancel failed: {e}",
+                extra={'order_id': main_order['id']}
+            )
+
     def modify_stop_loss(self, new_stop_price):
         """Stop Loss güncelle"""
         try:
-            if not self.active_orders['stop_loss']:
+            stop_loss = self.active_orders['stop_loss']
+            if not stop_loss:
                 return False
 
-            position = self.get_position()
-            if not position:
-                return False
-
-            # Yeni stop loss emri
-            new_sl_order = self.exchange.create_order(
-                symbol='XBTUSDT',
-                type='stop',
-                side='sell' if position['side'] == 'buy' else 'buy',
-                amount=abs(position['size']),
-                params={
-                    'stopPx': new_stop_price,
-                    'execInst': 'Last',
-                    'closeOnTrigger': True
-                }
+            # İptal / yeniden oluşturma yerine mevcut emri yerinde güncelle (amend)
+            self.exchange.edit_order(
+                stop_loss['order']['id'],
+                'XBTUSDT',
+                'stop',
+                stop_loss['side'],
+                stop_loss['amount'],
+                None,
+                {'stopPx': new_stop_price}
             )
-            
-            # Eski emri iptal et
-            self.cancel_order(self.active_orders['stop_loss']['order']['id'])
-            
-            # Yeni emri kaydet
-            self.active_orders['stop_loss'] = {
-                'order': new_sl_order,
-                'intended_price': new_stop_price
-            }
+            stop_loss['intended_price'] = new_stop_price
             
             return True
             
@@ -169,19 +334,96 @@ class AdvancedOrderManager:
             self.logger.error(f"Slippage calculation error: {e}")
             return 0
 
+    def export_state(self):
+        """Warm-start için aktif emirler ve son sinyal"""
+        return {
+            'active_orders': dict(self.active_orders),
+            'last_signal': self.last_signal,
+            'slippage_data': list(self.slippage_data)[-self.config.get('slippage_window', 50):]
+        }
+
+    def restore_state(self, state):
+        self.active_orders = dict(state['active_orders'])
+        self.last_signal = state['last_signal']
+        self.slippage_data.clear()
+        self.slippage_data.extend(state['slippage_data'])
+
+    def reconcile_orders(self, open_order_ids, cutoff=None):
+        """
+        Exchange'de artık açık olmayan emirleri yerel durumdan çıkar
+
+        Args:
+            cutoff: Açık emir listesinin çekilmeye başlandığı an (epoch saniye,
+                    pay dahil); bundan sonra gönderilen emirler listede
+                    olmayabilir, bu turda dokunulmaz
+        """
+        # place_orders başka thread'de çalışabilir, anlık kopya üzerinde dolaş
+        for key, order_info in list(self.active_orders.items()):
+            if not order_info or order_info['order']['id'] in open_order_ids:
+                continue
+            # Parent emir id'leri exchange'de yoktur, yürütme motoru takip eder
+            if order_info['order'].get('parent'):
+                continue
+            if cutoff is not None and order_info.get('submitted_at', 0) > cutoff:
+                continue
+            self.active_orders[key] = None
+        if self.trailing_stop:
+            self.trailing_stop.retain(open_order_ids, cutoff)
+
+    def reconcile_position(self, position):
+        """
+        Geri yüklenen emir durumunu uzlaştırılmış pozisyonla eşle (warm start)
+
+        Bot kapalıyken stop dolmuş olabilir; kitap düzken kalan last_signal
+        yeni girişleri engeller ve çıkış mantığı olmayan pozisyona çalışır.
+
+        Args:
+            position: Reconciler'ın ccxt pozisyonu, yoksa None
+        """
+        # Yürütme motoru boş başlar, bilmediği veya bitmiş parent'lar takip edilemez
+        for key, order_info in list(self.active_orders.items()):
+            if not order_info or not order_info['order'].get('parent'):
+                continue
+            report = self.execution.get_report(order_info['order']['id']) if self.execution else None
+            if report is None or report['status'] != 'working':
+                self.active_orders[key] = None
+
+        if position and position.get('contracts'):
+            self.last_signal = position['side']
+            return
+
+        # Bekleyen giriş emri varsa stopu ve sinyali geçerli
+        if self.active_orders['entry_long'] or self.active_orders['entry_short']:
+            return
+
+        stop_loss = self.active_orders['stop_loss']
+        if stop_loss:
+            # Pozisyonsuz kalan stop emri kitaptan çekilir
+            self.cancel_order(stop_loss['order']['id'])
+            self.active_orders['stop_loss'] = None
+        if self.last_signal:
+            self.logger.info(
+                f"Restored signal {self.last_signal} dropped, position is flat",
+                extra={'side': self.last_signal}
+            )
+        self.last_signal = None
+
     def get_position(self):
         """Pozisyon bilgisi al"""
         try:
-            positions = self.exchange.fetch_positions(['XBTUSDT'])
-            for position in positions:
-                if position['symbol'] == 'XBTUSDT':
-                    return {
-                        'size': position['contracts'],
-                        'side': position['side'],
-                        'entry_price': position['entryPrice'],
-                        'liquidation_price': position['liquidationPrice'],
-                        'unrealized_pnl': position['unrealizedPnl']
-                    }
+            if self.reconciler and self.reconciler.synced_at:
+                position = self.reconciler.get_position('XBTUSDT')
+            else:
+                positions = self.exchange.fetch_positions(['XBTUSDT'])
+                position = next((item for item in positions if item['symbol'] == 'XBTUSDT'), None)
+            if position:
+                return {
+                    'size': position['contracts'],
+                    'side': position['side'],
+                    'entry_price': position['entryPrice'],
+                    'liquidation_price': position['liquidationPrice'],
+                    'unrealized_pnl': position['unrealizedPnl']
+                }
             return None
             
         except Exception as e:
@@ -192,6 +434,10 @@ class AdvancedOrderManager:
         """Tüm emirleri iptal et"""
         try:
             self.exchange.cancel_all_orders('XBTUSDT')
+            if self.execution:
+                self.execution.cancel_all()
+            if self.trailing_stop:
+                self.trailing_stop.clear()
             self.active_orders = {
                 'entry_long': None,
                 'entry_short': None,
@@ -206,6 +452,8 @@ class AdvancedOrderManager:
         """Tek emir iptal et"""
         try:
             self.exchange.cancel_order(order_id, 'XBTUSDT')
+            if self.trailing_stop:
+                self.trailing_stop.untrack(order_id)
             for key in self.active_orders:
                 if self.active_orders[key] and self.active_orders[key]['order']['id'] == order_id:
                     self.active_orders[key] = None
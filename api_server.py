@@ -0,0 +1,238 @@
+# modules/api_server.py
+
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import threading
+import time
+from functools import lru_cache
+
+import numpy as np
+import uvicorn
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from jose import JWTError, jwt
+
+from state_snapshot import thaw
+
+JWT_ALGORITHM = 'HS256'
+MIN_SECRET_LENGTH = 16
+# Eski varsayılanlar, bunlarla API açılmaz
+INSECURE_SECRETS = {'your-secret-key', 'changeme', 'secret'}
+
+
+def validate_auth_config(config):
+    """API anahtarı ve JWT secret ayarlanmamış, varsayılan veya aynıysa ValueError"""
+    for name, env in (('api_key', 'API_KEY'), ('jwt_secret', 'JWT_SECRET')):
+        value = config.get(name)
+        if not value or value in INSECURE_SECRETS or len(value) < MIN_SECRET_LENGTH:
+            raise ValueError(f"{env} must be set to a non-default value of at least {MIN_SECRET_LENGTH} characters")
+    if hmac.compare_digest(config['api_key'], config['jwt_secret']):
+        raise ValueError("JWT_SECRET must differ from API_KEY")
+
+
+@lru_cache(maxsize=1024)
+def _decode_token(token, secret):
+    """JWT imzasını doğrula, sonuç önbellekte tutulur (süre kontrolü her istekte yapılır)"""
+    return jwt.decode(token, secret, algorithms=[JWT_ALGORITHM], options={'verify_exp': False})
+
+
+class TokenAuth:
+    def __init__(self, config):
+        """
+        JWT doğrulama, I/O yok
+
+        Token'lar API anahtarı ile /auth/token üzerinden alınır,
+        her istekte imza (önbellekli) ve süre yerel olarak kontrol edilir.
+        """
+        self.secret = config['jwt_secret']
+        self.api_key = config['api_key']
+        self.ttl = config['token_ttl']
+
+    def check_api_key(self, api_key):
+        """Sabit zamanlı karşılaştırma"""
+        return bool(api_key) and hmac.compare_digest(api_key.encode(), self.api_key.encode())
+
+    def issue(self, subject):
+        now = int(time.time())
+        return jwt.encode({'sub': subject, 'iat': now, 'exp': now + self.ttl}, self.secret, JWT_ALGORITHM)
+
+    def verify(self, token):
+        try:
+            claims = _decode_token(token, self.secret)
+        except JWTError:
+            raise HTTPException(status_code=401, detail='Invalid token')
+        if claims.get('exp', 0) < time.time():
+            raise HTTPException(status_code=401, detail='Token expired')
+        return claims
+
+    async def __call__(self, authorization: str = Header(None)):
+        if not authorization or not authorization.startswith('Bearer '):
+            raise HTTPException(status_code=401, detail='Missing bearer token')
+        return self.verify(authorization[len('Bearer '):])
+
+
+class AnalyticsCache:
+    def __init__(self, bot):
+        """Pahalı analitik yanıtları, kaynak veri değişene kadar önbellekte"""
+        self.bot = bot
+        self.key = None
+        self.etag = None
+        self.payload = None
+        self.lock = threading.Lock()
+
+    def _source_key(self):
+        execution = getattr(self.bot, 'execution', None)
+        slippage = self.bot.order_manager.slippage_data
+        return (
+            len(slippage),
+            slippage[-1]['timestamp'] if slippage else None,
+            len(execution.reports) if execution else 0,
+            self.bot.risk_manager.daily_stats['trades']
+        )
+
+    def get(self):
+        key = self._source_key()
+        with self.lock:
+            if key != self.key:
+                self.payload = self._compute()
+                self.key = key
+                self.etag = '"' + hashlib.sha1(repr(key).encode()).hexdigest()[:16] + '"'
+            return self.etag, self.payload
+
+    def _compute(self):
+        slippage = self.bot.order_manager.slippage_data
+        by_type = {}
+        for entry in slippage:
+            by_type.setdefault(entry['order_type'], []).append(entry['slippage_percent'])
+
+        execution = getattr(self.bot, 'execution', None)
+        return {
+            'slippage': {
+                order_type: {
+                    'count': len(values),
+                    'mean_percent': float(np.mean(values)),
+                    'median_percent': float(np.median(values)),
+                    'p95_percent': float(np.percentile(values, 95))
+                }
+                for order_type, values in by_type.items()
+            },
+            'execution': execution.get_summary() if execution else {},
+            'daily_stats': dict(self.bot.risk_manager.daily_stats),
+            'generated_at': time.time()
+        }
+
+
+def create_api_app(bot, config):
+    """
+    Pozisyon, sinyal, risk ve analitik sorguları ile emir aksiyonları için API
+
+    Sorgular StateStore snapshot'ından ve bellekteki özetlerden okunur,
+    trading döngüsüne dokunmaz. Emir aksiyonları orchestrator'ın emir
+    kuyruğuna konur. Anahtar / secret güvenli değilse ValueError.
+    """
+    validate_auth_config(config)
+    app = FastAPI(title='Trading Bot API')
+    auth = TokenAuth(config)
+    analytics = AnalyticsCache(bot)
+    logger = logging.getLogger(__name__)
+
+    def snapshot_response(request, response, key):
+        snapshot = bot.state.get()
+        etag = f'"{snapshot["version"]}"'
+        if request.headers.get('if-none-match') == etag:
+            return Response(status_code=304, headers={'ETag': etag})
+        response.headers['ETag'] = etag
+        return {'version': snapshot['version'], 'timestamp': snapshot['timestamp'], key: thaw(snapshot.get(key))}
+
+    @app.get('/health')
+    async def health():
+        return {
+            'status': 'degraded' if bot.supervisor.safe_mode else 'ok',
+            'running': bot.running,
+            'snapshot_age': bot.state.age()
+        }
+
+    @app.post('/auth/token')
+    async def token(x_api_key: str = Header(None)):
+        if not auth.check_api_key(x_api_key):
+            raise HTTPException(status_code=401, detail='Invalid API key')
+        return {'access_token': auth.issue('api'), 'token_type': 'bearer', 'expires_in': auth.ttl}
+
+    @app.get('/position')
+    async def position(request: Request, response: Response, _=Depends(auth)):
+        return snapshot_response(request, response, 'position')
+
+    @app.get('/signals')
+    async def signals(request: Request, response: Response, _=Depends(auth)):
+        return snapshot_response(request, response, 'signals')
+
+    @app.get('/risk')
+    async def risk(request: Request, response: Response, _=Depends(auth)):
+        return snapshot_response(request, response, 'risk_metrics')
+
+    @app.get('/balance')
+    async def balance(request: Request, response: Response, _=Depends(auth)):
+        return snapshot_response(request, response, 'balance')
+
+    @app.get('/pipeline')
+    async def pipeline(_=Depends(auth)):
+        return bot.get_pipeline_metrics()
+
+    @app.get('/analytics/trades')
+    async def trade_analytics(request: Request, response: Response, _=Depends(auth)):
+        # Hesaplama gerekiyorsa thread'de, API event loop'u bloklanmaz
+        etag, payload = await asyncio.to_thread(analytics.get)
+        if request.headers.get('if-none-match') == etag:
+            return Response(status_code=304, headers={'ETag': etag})
+        response.headers['ETag'] = etag
+        return payload
+
+    @app.post('/orders/{action}')
+    async def order_action(action: str, _=Depends(auth)):
+        if action not in ('exit', 'cancel'):
+            raise HTTPException(status_code=404, detail=f'Unknown action: {action}')
+        if bot.loop is None:
+            raise HTTPException(status_code=503, detail='Trading pipeline not running')
+        await asyncio.wrap_future(bot.submit_action(action))
+        logger.info(f"API order action queued: {action}")
+        return {'queued': action}
+
+    @app.websocket('/ws/state')
+    async def stream_state(websocket: WebSocket, token: str = None):
+        """Snapshot her yeni sürümde istemciye itilir"""
+        try:
+            auth.verify(token or '')
+        except HTTPException:
+            await websocket.close(code=4401)
+            return
+
+        await websocket.accept()
+        version = None
+        try:
+            while True:
+                snapshot = bot.state.get()
+                if snapshot['version'] != version:
+                    version = snapshot['version']
+                    await websocket.send_text(json.dumps(thaw(snapshot), default=str))
+                await asyncio.sleep(config['stream_interval'])
+        except WebSocketDisconnect:
+            pass
+
+    return app
+
+
+def start_api_server(bot, config):
+    """API'yi kendi event loop'u olan ayrı bir thread'de başlat"""
+    app = create_api_app(bot, config)
+    server = uvicorn.Server(uvicorn.Config(
+        app,
+        host=config['host'],
+        port=config['port'],
+        log_level='warning',
+        access_log=False
+    ))
+    thread = threading.Thread(target=server.run, name='api-server', daemon=True)
+    thread.start()
+    return server
@@ -1,10 +1,14 @@
 
 # bitmex_integration.py
 import ccxt
-import pandas as pd
+import json
+import logging
 from datetime import datetime
 import time
 
+from rate_limiter import get_rate_limit_manager
+from settings import TRADING_CONFIG
+
 class BitmexTrader:
     def __init__(self, api_key, api_secret, testnet=False):
         self.exchange = ccxt.bitmex({
@@ -13,6 +17,9 @@ class BitmexTrader:
             'enableRateLimit': True,
             'test': testnet  # Testnet için True
         })
+        self.logger = logging.getLogger(__name__)
+        # Tüm ccxt örnekleri süreç genelindeki tek bütçeyi paylaşır
+        get_rate_limit_manager().install(self.exchange)
         
         # Parametre ayarları
         self.position_config = {
@@ -24,6 +31,8 @@ class BitmexTrader:
         
         self.active_orders = {}
         self.current_position = None
+        self.last_order_time = None
+        self.reconciler = None
 
     def calculate_position_size(self, price):
         """USD cinsinden pozisyon büyüklüğü hesaplama"""
@@ -101,6 +110,7 @@ class BitmexTrader:
                 )
             
             # Order bilgilerini sakla
+            self.last_order_time = datetime.now()
             self.active_orders = {
                 'main': main_order,
                 'tp': tp_order,
@@ -147,8 +157,16 @@ class BitmexTrader:
         except Exception as e:
             return False, f"Error cancelling orders: {str(e)}"
 
+    def attach_reconciler(self, reconciler):
+        """Pozisyonu exchange yerine uzlaştırıcının yerel modelinden oku"""
+        self.reconciler = reconciler
+
     def get_current_position(self):
         """Mevcut pozisyon bilgisini al"""
+        if self.reconciler and self.reconciler.synced_at:
+            # Uzlaştırıcı botun işlem sembolünü takip eder
+            self.current_position = self.reconciler.get_position()
+            return self.current_position
         try:
             positions = self.exchange.fetch_positions()
             for position in positions:
@@ -157,6 +175,7 @@ class BitmexTrader:
                     return position
             return None
         except Exception as e:
+            self.logger.error(f"Position fetch error: {e}")
             return None
 
     def calculate_pnl(self):
@@ -172,66 +191,148 @@ class BitmexTrader:
             }
         return None
 
+    def get_position(self):
+        """Risk yöneticisi ve Telegram için sadeleştirilmiş pozisyon bilgisi"""
+        position = self.get_current_position()
+        if not position or not position['contracts']:
+            return None
+        return {
+            'size': position['contracts'],
+            'side': position['side'],
+            'entry_price': position['entryPrice'],
+            'liquidation_price': position['liquidationPrice'],
+            'unrealized_pnl': position['unrealizedPnl'],
+            'leverage': position['leverage']
+        }
+
+    def update_balance(self):
+        """Uzlaşma para birimi (TRADING_CONFIG['settlement_currency']) bakiyesini al"""
+        currency = self.exchange.fetch_balance()[TRADING_CONFIG['settlement_currency']]
+        return {
+            'total': float(currency.get('total') or 0),
+            'free': float(currency.get('free') or 0),
+            'used': float(currency.get('used') or 0)
+        }
+
+    def close_position(self):
+        """Açık pozisyonu piyasa emriyle kapat"""
+        try:
+            position = self.get_current_position()
+            if not position or not position['contracts']:
+                return False
+
+            self.cancel_all_orders()
+            self.exchange.create_order(
+                symbol='BTC/USD',
+                type='market',
+                side='sell' if position['side'] == 'long' else 'buy',
+                amount=abs(position['contracts']),
+                params={'execInst': 'ReduceOnly'}
+            )
+            self.last_order_time = datetime.now()
+            return True
+        except Exception as e:
+            self.logger.error(f"Position close error: {e}")
+            return False
+
+    def _protective_prices(self, tp_usd=None, sl_usd=None):
+        """Yerel emir durumundan yeni TP / SL fiyatlarını hesapla"""
+        entry_price = self.active_orders['entry_price']
+        position_size = self.active_orders['position_size']
+        direction = 1 if self.active_orders['type'] == 'buy' else -1
+
+        prices = {}
+        if tp_usd is not None:
+            prices['tp'] = entry_price + direction * (tp_usd / position_size)
+        if sl_usd is not None:
+            prices['sl'] = entry_price - direction * (sl_usd / position_size)
+        return prices
+
+    def amend_order(self, key, price=None, amount=None):
+        """Aktif emri tek istekle yerinde güncelle (iptal / yeniden oluşturma yok)"""
+        order = self.active_orders[key]
+        params = {'stopPx': price} if price is not None else {}
+        amended = self.exchange.edit_order(
+            order['id'],
+            'BTC/USD',
+            order.get('type'),
+            order.get('side'),
+            amount,
+            price,
+            params
+        )
+        self.active_orders[key] = amended or order
+        return self.active_orders[key]
+
+    def amend_orders(self, prices, amount=None):
+        """
+        Birden fazla aktif emri birlikte güncelle
+
+        Tek emir için edit_order, birden fazlası için BitMEX toplu amend
+        (PUT /order/bulk) kullanılır. Toplu istek başarısız olursa emirler
+        tek tek güncellenir.
+
+        Args:
+            prices: {'tp': fiyat, 'sl': fiyat}
+            amount: Yeni kontrat sayısı (None ise değişmez)
+        """
+        if len(prices) == 1:
+            key, price = next(iter(prices.items()))
+            self.amend_order(key, price, amount)
+            return
+
+        orders = []
+        for key, price in prices.items():
+            amend = {'orderID': self.active_orders[key]['id'], 'price': price, 'stopPx': price}
+            if amount is not None:
+                amend['orderQty'] = amount
+            orders.append(amend)
+
+        try:
+            self.exchange.private_put_order_bulk({'orders': json.dumps(orders)})
+        except Exception:
+            for key, price in prices.items():
+                self.amend_order(key, price, amount)
+            return
+
+        for key, price in prices.items():
+            order = self.active_orders[key]
+            order['price'] = price
+            order['stopPrice'] = price
+            if amount is not None:
+                order['amount'] = amount
+
+    def modify_orders(self, tp_usd=None, sl_usd=None, size=None):
+        """TP / SL seviyelerini ve miktarını yerinde güncelle"""
+        if not self.active_orders:
+            return False, "No active orders"
+
+        try:
+            prices = self._protective_prices(tp_usd, sl_usd)
+            missing = [key for key in prices if key not in self.active_orders]
+            if missing:
+                return False, f"No active {'/'.join(key.upper() for key in missing)} order"
+
+            self.amend_orders(prices, size)
+            if size is not None:
+                self.active_orders['position_size'] = size
+            return True, "Orders updated successfully"
+
+        except Exception as e:
+            return False, f"Error updating orders: {str(e)}"
+
     def modify_take_profit(self, new_tp_usd):
         """Take Profit değerini güncelle"""
         if not self.active_orders or 'tp' not in self.active_orders:
             return False, "No active TP order"
-            
-        try:
-            # Mevcut TP orderı iptal et
-            self.exchange.cancel_order(self.active_orders['tp']['id'])
-            
-            # Yeni TP orderı yerleştir
-            position = self.get_current_position()
-            if position:
-                side = 'sell' if position['side'] == 'buy' else 'buy'
-                new_tp_price = position['entryPrice'] + (new_tp_usd / position['contracts'])
-                if side == 'sell':
-                    new_tp_price = position['entryPrice'] - (new_tp_usd / position['contracts'])
-                
-                new_tp_order = self.exchange.create_order(
-                    symbol='BTC/USD',
-                    type='limit',
-                    side=side,
-                    amount=abs(position['contracts']),
-                    price=new_tp_price,
-                    params={'stopPx': new_tp_price}
-                )
-                
-                self.active_orders['tp'] = new_tp_order
-                return True, "TP updated successfully"
-                
-        except Exception as e:
-            return False, f"Error updating TP: {str(e)}"
+
+        success, message = self.modify_orders(tp_usd=new_tp_usd)
+        return (True, "TP updated successfully") if success else (False, message)
 
     def modify_stop_loss(self, new_sl_usd):
         """Stop Loss değerini güncelle"""
         if not self.active_orders or 'sl' not in self.active_orders:
             return False, "No active SL order"
-            
-        try:
-            # Mevcut SL orderı iptal et
-            self.exchange.cancel_order(self.active_orders['sl']['id'])
-            
-            # Yeni SL orderı yerleştir
-            position = self.get_current_position()
-            if position:
-                side = 'sell' if position['side'] == 'buy' else 'buy'
-                new_sl_price = position['entryPrice'] - (new_sl_usd / position['contracts'])
-                if side == 'buy':
-                    new_sl_price = position['entryPrice'] + (new_sl_usd / position['contracts'])
-                
-                new_sl_order = self.exchange.create_order(
-                    symbol='BTC/USD',
-                    type='stop',
-                    side=side,
-                    amount=abs(position['contracts']),
-                    price=new_sl_price,
-                    params={'stopPx': new_sl_price}
-                )
-                
-                self.active_orders['sl'] = new_sl_order
-                return True, "SL updated successfully"
-                
-        except Exception as e:
-            return False, f"Error updating SL: {str(e)}"
+
+        success, message = self.modify_orders(sl_usd=new_sl_usd)
+        return (True, "SL updated successfully") if success else (False, message)
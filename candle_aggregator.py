@@ -0,0 +1,268 @@
+# modules/candle_aggregator.py
+
+import logging
+import numpy as np
+import pandas as pd
+
+TIMEFRAME_UNITS = {
+    'm': 60 * 1000,
+    'h': 60 * 60 * 1000,
+    'd': 24 * 60 * 60 * 1000
+}
+
+BASE_TIMEFRAME = '1m'
+BASE_MS = TIMEFRAME_UNITS['m']
+
+# Satır düzeni: timestamp, open, high, low, close, volume
+TS, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+
+
+def timeframe_to_ms(timeframe):
+    """'5m', '1h' gibi zaman dilimini milisaniyeye çevir"""
+    try:
+        return int(timeframe[:-1]) * TIMEFRAME_UNITS[timeframe[-1]]
+    except (KeyError, ValueError):
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+
+
+class CandleSeries:
+    """Tek bir zaman dilimi için önceden ayrılmış halka tampon"""
+
+    def __init__(self, timeframe, capacity):
+        self.timeframe = timeframe
+        self.interval_ms = timeframe_to_ms(timeframe)
+        self.capacity = capacity
+
+        self.bars = np.zeros((capacity, 6), dtype=np.float64)
+        self.count = 0
+        self.head = 0  # Sonraki yazılacak satır
+        self.partial = None  # Henüz kapanmamış mum
+
+    def bucket(self, timestamp):
+        return timestamp - timestamp % self.interval_ms
+
+    def fold(self, bar):
+        """Kapanmış 1m mumu bu zaman dilimine ekle, kapanan mumu döndür"""
+        start = self.bucket(bar[TS])
+        closed = None
+
+        if self.partial is not None and self.partial[TS] != start:
+            closed = self._close()
+
+        if self.partial is None:
+            self.partial = np.array(bar, dtype=np.float64)
+            self.partial[TS] = start
+        else:
+            self.partial[HIGH] = max(self.partial[HIGH], bar[HIGH])
+            self.partial[LOW] = min(self.partial[LOW], bar[LOW])
+            self.partial[CLOSE] = bar[CLOSE]
+            self.partial[VOLUME] += bar[VOLUME]
+
+        # Dilimin son dakikası geldiyse mumu hemen kapat
+        if bar[TS] + BASE_MS >= start + self.interval_ms:
+            closed = self._close()
+
+        return closed
+
+    def _close(self):
+        bar = self.partial
+        self.bars[self.head] = bar
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.partial = None
+        return bar
+
+    def arrays(self, include_partial=False):
+        """Kronolojik sırada OHLCV kopyası"""
+        if self.count < self.capacity:
+            data = self.bars[:self.count]
+        else:
+            data = np.roll(self.bars, -self.head, axis=0)
+
+        if include_partial and self.partial is not None:
+            data = np.vstack([data, self.partial])
+        return data.copy()
+
+
+class CandleAggregator:
+    def __init__(self, timeframes=None, capacity=500):
+        """
+        Tek bir 1m / trade akışından tüm zaman dilimlerini artımlı üret
+
+        Args:
+            timeframes: ['1m', '5m', '15m', '1h'] gibi liste
+            capacity: Her zaman dilimi için tutulacak mum sayısı
+        """
+        self.logger = logging.getLogger(__name__)
+        timeframes = list(timeframes or [BASE_TIMEFRAME])
+        if BASE_TIMEFRAME not in timeframes:
+            timeframes.insert(0, BASE_TIMEFRAME)
+
+        for timeframe in timeframes:
+            if timeframe_to_ms(timeframe) % BASE_MS:
+                raise ValueError(f"Timeframe must be a multiple of 1m: {timeframe}")
+
+        self.series = {
+            timeframe: CandleSeries(timeframe, capacity)
+            for timeframe in timeframes
+        }
+        self.subscribers = {timeframe: [] for timeframe in timeframes}
+
+        # Son 1m mum güncellenebilir, yeni dakika gelene kadar kapanmış sayılmaz
+        self.pending = None
+        self.last_closed_ts = None
+
+        # Her değişiklikte artar, indikatör önbelleği anahtarında kullanılır
+        self.version = 0
+
+    @property
+    def timeframes(self):
+        return list(self.series)
+
+    def subscribe(self, timeframe, callback):
+        """Mum kapanışında çağrılacak fonksiyonu kaydet: callback(timeframe, bar)"""
+        if timeframe not in self.subscribers:
+            raise ValueError(f"Timeframe not configured: {timeframe}")
+        self.subscribers[timeframe].append(callback)
+
+    def add_bar(self, timestamp, open_, high, low, close, volume):
+        """Exchange'den gelen 1m mumu işle, kapanan zaman dilimlerini döndür"""
+        timestamp = int(timestamp)
+        if self.last_closed_ts is not None and timestamp <= self.last_closed_ts:
+            return []
+
+        bar = np.array([timestamp, open_, high, low, close, volume], dtype=np.float64)
+
+        if self.pending is not None and timestamp == self.pending[TS]:
+            if not np.array_equal(self.pending, bar):
+                self.pending = bar
+                self.version += 1
+            return []
+
+        self.version += 1
+
+        closed = []
+        if self.pending is not None:
+            closed = self._finalize_pending()
+        self.pending = bar
+        return closed
+
+    def add_trade(self, timestamp, price, amount):
+        """Ham trade ile 1m mumu güncelle"""
+        minute = int(timestamp) - int(timestamp) % BASE_MS
+        if self.last_closed_ts is not None and minute <= self.last_closed_ts:
+            return []
+
+        if self.pending is not None and self.pending[TS] == minute:
+            self.pending[HIGH] = max(self.pending[HIGH], price)
+            self.pending[LOW] = min(self.pending[LOW], price)
+            self.pending[CLOSE] = price
+            self.pending[VOLUME] += amount
+            self.version += 1
+            return []
+
+        return self.add_bar(minute, price, price, price, price, amount)
+
+    def ingest_ohlcv(self, ohlcv):
+        """fetch_ohlcv çıktısını toplu işle"""
+        closed = []
+        for row in ohlcv:
+            closed.extend(self.add_bar(*row[:6]))
+        return closed
+
+    def _finalize_pending(self):
+        bar = self.pending
+        self.pending = None
+        self.last_closed_ts = int(bar[TS])
+
+        closed = []
+        for timeframe, series in self.series.items():
+            closed_bar = series.fold(bar)
+            if closed_bar is None:
+                continue
+            closed.append(timeframe)
+            for callback in self.subscribers[timeframe]:
+                try:
+                    callback(timeframe, closed_bar)
+                except Exception as e:
+                    self.logger.error(f"Candle close callback error ({timeframe}): {e}")
+        return closed
+
+    def export_state(self):
+        """Warm-start için mum tamponlarının kopyası"""
+        return {
+            'series': {
+                timeframe: {
+                    'bars': series.arrays(),
+                    'partial': None if series.partial is None else series.partial.copy()
+                }
+                for timeframe, series in self.series.items()
+            },
+            'pending': None if self.pending is None else self.pending.copy(),
+            'last_closed_ts': self.last_closed_ts,
+            'version': self.version
+        }
+
+    def restore_state(self, state):
+        """export_state çıktısını yükle, yapılandırılmamış zaman dilimleri atlanır"""
+        for timeframe, saved in state['series'].items():
+            series = self.series.get(timeframe)
+            if series is None:
+                continue
+            bars = saved['bars'][-series.capacity:]
+            series.bars[:len(bars)] = bars
+            series.count = len(bars)
+            series.head = len(bars) % series.capacity
+            series.partial = saved['partial']
+
+        self.pending = state['pending']
+        self.last_closed_ts = state['last_closed_ts']
+        # Önbellek anahtarları eski sürümlerle çakışmasın
+        self.version = state['version'] + 1
+
+    def get_arrays(self, timeframe, include_partial=False):
+        """Zaman dilimi için OHLCV dizilerini sözlük olarak döndür"""
+        data = self._with_pending(timeframe, include_partial)
+        return {
+            'timestamp': data[:, TS].astype(np.int64),
+            'open': data[:, OPEN],
+            'high': data[:, HIGH],
+            'low': data[:, LOW],
+            'close': data[:, CLOSE],
+            'volume': data[:, VOLUME]
+        }
+
+    def to_frame(self, timeframe, include_partial=False):
+        """Zaman dilimini price_data ile aynı formatta DataFrame'e çevir"""
+        data = self._with_pending(timeframe, include_partial)
+        df = pd.DataFrame(
+            data,
+            columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']
+        )
+        df['timestamp'] = pd.to_datetime(df['timestamp'].astype(np.int64), unit='ms')
+        df.set_index('timestamp', inplace=True)
+        return df
+
+    def _with_pending(self, timeframe, include_partial):
+        series = self.series[timeframe]
+        data = series.arrays(include_partial)
+        if not include_partial or self.pending is None:
+            return data
+
+        # Henüz kapanmamış 1m mumu kısmi muma yansıt
+        if timeframe == BASE_TIMEFRAME:
+            return np.vstack([data, self.pending])
+
+        pending = self.pending
+        start = series.bucket(pending[TS])
+        if len(data) and data[-1, TS] == start and series.partial is not None:
+            last = data[-1]
+            last[HIGH] = max(last[HIGH], pending[HIGH])
+            last[LOW] = min(last[LOW], pending[LOW])
+            last[CLOSE] = pending[CLOSE]
+            last[VOLUME] += pending[VOLUME]
+            return data
+
+        partial = pending.copy()
+        partial[TS] = start
+        return np.vstack([data, partial])
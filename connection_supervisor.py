@@ -0,0 +1,294 @@
+# modules/connection_supervisor.py
+
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import deque
+
+import ccxt
+
+from rate_limiter import RateLimitDeferred
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Tekrar denenmesi güvenli çağrılar (aynı sonucu verir veya zaten hedef durumdadır)
+IDEMPOTENT_METHODS = ('cancel_order', 'cancel_all_orders', 'edit_order', 'private_put_order_bulk')
+
+
+class CircuitOpenError(ccxt.ExchangeNotAvailable):
+    """Uç nokta devre kesici açıkken çağrı yapılmadı"""
+
+
+class CircuitBreaker:
+    def __init__(self, name, threshold, reset_timeout):
+        """
+        Uç nokta başına devre kesici
+
+        Art arda threshold ağ hatasında açılır, reset_timeout sonra tek bir
+        deneme çağrısına izin verir (half_open); başarılıysa kapanır.
+        """
+        self.name = name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow(self):
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+            return True, True
+        return self.state != OPEN, False
+
+    def record_success(self):
+        changed = self.state != CLOSED
+        self.state = CLOSED
+        self.failures = 0
+        return changed
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.threshold):
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            return True
+        return False
+
+
+class EndpointStats:
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.last_latency_ms = 0.0
+        self.avg_latency_ms = 0.0
+
+    def record(self, latency_ms):
+        self.calls += 1
+        self.last_latency_ms = latency_ms
+        # Üssel ortalama, ilk çağrıda doğrudan değer
+        self.avg_latency_ms = latency_ms if self.calls == 1 else self.avg_latency_ms * 0.9 + latency_ms * 0.1
+
+
+class ConnectionSupervisor:
+    def __init__(self, config):
+        """
+        Exchange bağlantısı için tekrar deneme, devre kesici ve feed gözetimi
+
+        Ağ hatalarında üssel geri çekilme (jitter'lı) ile tekrar dener;
+        create_order clOrdID ile idempotent yapılır. Feed belirli süre gelmezse
+        güvenli moda geçilir (yeni giriş yok), her geçiş dinleyicilere iletilir.
+        """
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self.breakers = {}
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.listeners = []
+        self.transitions = deque(maxlen=50)
+
+        self.safe_mode = False
+        self.safe_mode_since = None
+        self.last_feed = time.monotonic()
+
+    def add_listener(self, callback):
+        """Durum geçişlerinde callback(event) çağrılır"""
+        self.listeners.append(callback)
+
+    def _emit(self, kind, **fields):
+        event = {'type': kind, 'timestamp': time.time(), **fields}
+        self.transitions.append(event)
+        self.logger.warning(f"Connection transition: {kind}", extra=fields)
+        for callback in self.listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                self.logger.error(f"Supervisor listener error: {e}")
+
+    def _endpoint(self, name):
+        with self.lock:
+            if name not in self.breakers:
+                self.breakers[name] = CircuitBreaker(
+                    name, self.config['breaker_threshold'], self.config['breaker_reset']
+                )
+                self.stats[name] = EndpointStats()
+            return self.breakers[name], self.stats[name]
+
+    def _backoff(self, attempt):
+        """Tam jitter'lı üssel geri çekilme"""
+        delay = min(self.config['backoff_max'], self.config['backoff_base'] * 2 ** attempt)
+        return random.uniform(0, delay)
+
+    def call(self, endpoint, fn, *args, retry=True, before_retry=None, **kwargs):
+        """
+        Çağrıyı devre kesici ve tekrar deneme ile yap
+
+        Args:
+            retry: Ağ hatasında tekrar denensin mi (idempotent çağrılar)
+            before_retry: Tekrar denemeden önce çağrılır, sonuç döndürürse
+                          çağrı tekrar yapılmaz (ör. emir zaten oluşmuş)
+        """
+        breaker, stats = self._endpoint(endpoint)
+        attempts = self.config['max_retries'] + 1 if retry else 1
+
+        for attempt in range(attempts):
+            with self.lock:
+                allowed, trial = breaker.allow()
+            if trial:
+                self._emit('breaker_half_open', endpoint=endpoint)
+            if not allowed:
+                raise CircuitOpenError(f"Circuit open for {endpoint}")
+
+            if attempt and before_retry:
+                existing = before_retry()
+                if existing is not None:
+                    with self.lock:
+                        breaker.record_success()
+                    return existing
+
+            started = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except RateLimitDeferred:
+                raise
+            except (ccxt.RateLimitExceeded, ccxt.DDoSProtection):
+                # NetworkError alt sınıfları: 429 uç nokta arızası değildir, devre
+                # kesiciye sayılmaz ve burada tekrar denenmez; bekleme süresini
+                # rate limiter Retry-After ile uygular
+                with self.lock:
+                    stats.rate_limited += 1
+                raise
+            except ccxt.NetworkError as e:
+                latency_ms = (time.perf_counter() - started) * 1000
+                with self.lock:
+                    stats.failures += 1
+                    opened = breaker.record_failure()
+                if opened:
+                    self._emit('breaker_open', endpoint=endpoint, error=str(e), latency_ms=latency_ms)
+                if attempt + 1 >= attempts:
+                    raise
+                stats.retries += 1
+                delay = self._backoff(attempt)
+                self.logger.info(
+                    f"Retrying {endpoint} in {delay:.2f}s: {e}",
+                    extra={'endpoint': endpoint, 'attempt': attempt + 1}
+                )
+                time.sleep(delay)
+                continue
+
+            latency_ms = (time.perf_counter() - started) * 1000
+            with self.lock:
+                stats.record(latency_ms)
+                closed = breaker.record_success()
+            if closed:
+                self._emit('breaker_closed', endpoint=endpoint, latency_ms=latency_ms)
+            return result
+
+    def create_order(self, exchange, symbol, type, side, amount, price=None, params=None):
+        """clOrdID ile idempotent emir; tekrar öncesi emrin oluşup oluşmadığı kontrol edilir"""
+        params = dict(params or {})
+        cl_ord_id = params.setdefault('clOrdID', uuid.uuid4().hex)
+
+        def find_existing():
+            try:
+                orders = exchange.fetch_orders(
+                    symbol, params={'filter': json.dumps({'clOrdID': cl_ord_id})}
+                )
+            except ccxt.BaseError:
+                return None
+            return orders[0] if orders else None
+
+        return self.call(
+            'create_order', exchange.create_order, symbol, type, side, amount, price, params,
+            before_retry=find_existing
+        )
+
+    def wrap(self, exchange):
+        """Exchange'i gözetimli vekil ile sar"""
+        return SupervisedExchange(exchange, self)
+
+    def on_feed(self):
+        """Başarılı piyasa verisi alındı"""
+        self.last_feed = time.monotonic()
+
+    def check_feed(self):
+        """Feed yaşına göre güvenli moda gir / çık"""
+        age = time.monotonic() - self.last_feed
+        if not self.safe_mode and age > self.config['stale_feed_after']:
+            self.safe_mode = True
+            self.safe_mode_since = time.monotonic()
+            self._emit('safe_mode_on', feed_age=age)
+        elif (self.safe_mode and age <= self.config['stale_feed_after']
+              and time.monotonic() - self.safe_mode_since >= self.config['safe_mode_min_duration']):
+            self.safe_mode = False
+            self._emit('safe_mode_off', feed_age=age)
+        return self.safe_mode
+
+    def get_health(self):
+        with self.lock:
+            endpoints = {
+                name: {
+                    'state': self.breakers[name].state,
+                    'calls': stats.calls,
+                    'failures': stats.failures,
+                    'retries': stats.retries,
+                    'rate_limited': stats.rate_limited,
+                    'last_latency_ms': stats.last_latency_ms,
+                    'avg_latency_ms': stats.avg_latency_ms
+                }
+                for name, stats in self.stats.items()
+            }
+        return {
+            'safe_mode': self.safe_mode,
+            'feed_age': time.monotonic() - self.last_feed,
+            'endpoints': endpoints,
+            'transitions': list(self.transitions)[-10:]
+        }
+
+
+class SupervisedExchange:
+    def __init__(self, exchange, supervisor):
+        """
+        ccxt exchange vekili
+
+        create_order clOrdID ile, fetch_* ve IDEMPOTENT_METHODS tekrar
+        denemeyle, diğer metotlar sadece devre kesici ve metriklerle çağrılır.
+        Öznitelikler (markets, last_response_headers ...) doğrudan exchange'den okunur.
+        """
+        self.exchange = exchange
+        self.supervisor = supervisor
+
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        return self.supervisor.create_order(self.exchange, symbol, type, side, amount, price, params)
+
+    def cancel_order(self, id, symbol=None, params=None):
+        """Tekrar öncesi emir zaten iptal / dolmuş ise önceki deneme sonucu kabul edilir"""
+        def find_done():
+            try:
+                order = self.exchange.fetch_order(id, symbol)
+            except ccxt.BaseError:
+                return None
+            return order if order.get('status') in ('canceled', 'closed') else None
+
+        args = (id, symbol) if params is None else (id, symbol, params)
+        return self.supervisor.call(
+            'cancel_order', self.exchange.cancel_order, *args, before_retry=find_done
+        )
+
+    def __getattr__(self, name):
+        attribute = getattr(self.exchange, name)
+        if not callable(attribute) or name.startswith('_'):
+            return attribute
+
+        retry = name.startswith('fetch') or name in IDEMPOTENT_METHODS
+
+        def supervised(*args, **kwargs):
+            return self.supervisor.call(name, attribute, *args, retry=retry, **kwargs)
+
+        return supervised
@@ -0,0 +1,64 @@
+# dashboard_server.py
+
+import logging
+
+import numpy as np
+
+from depth_history import DepthHistory
+from settings import DASHBOARD_CONFIG, STATE_BUS_CONFIG, TRADING_CONFIG
+from state_bus import Serializer, StateSubscriber, create_state_bus
+from state_snapshot import StateStore
+from visualization import DashboardVisualizer, create_dashboard_app
+
+
+def create_server():
+    """
+    Trading sürecinden ayrı çalışan dashboard
+
+    Bot DASHBOARD_MODE=external ile durumu bus'a yayınlar, her dashboard
+    süreci (veya gunicorn worker'ı) kendi aboneliğiyle yerel StateStore'u
+    doldurur. Dashboard yükü trading sürecinin GIL'ini paylaşmaz.
+
+        gunicorn -w 4 -b 0.0.0.0:8050 'dashboard_server:create_server()'
+    """
+    logger = logging.getLogger(__name__)
+    if STATE_BUS_CONFIG['backend'] == 'memory':
+        logger.warning("In-memory state bus only works inside one process, use STATE_BUS=redis")
+
+    store = StateStore()
+    subscriber = StateSubscriber(
+        create_state_bus(STATE_BUS_CONFIG), Serializer(STATE_BUS_CONFIG['serializer']), store
+    )
+
+    # Derinlik geçmişi bu süreçte snapshot'lardaki kitaptan örneklenir
+    depth_history = DepthHistory(
+        TRADING_CONFIG['tick_size'],
+        rows=DASHBOARD_CONFIG['depth_rows'],
+        bucket_ticks=DASHBOARD_CONFIG['depth_bucket_ticks'],
+        capacity=DASHBOARD_CONFIG['depth_capacity'],
+        interval=0
+    )
+
+    def record_depth(snapshot):
+        book = snapshot.get('order_book')
+        if book and book['bids_prices'] and book['asks_prices']:
+            depth_history.record(
+                np.column_stack([book['bids_prices'], book['bids_volumes']]),
+                np.column_stack([book['asks_prices'], book['asks_volumes']]),
+                snapshot['timestamp']
+            )
+
+    subscriber.add_listener(record_depth)
+    subscriber.start()
+
+    app = create_dashboard_app(DashboardVisualizer(store, depth_history))
+    return app.server
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    create_server().run(
+        host=DASHBOARD_CONFIG['host'],
+        port=DASHBOARD_CONFIG['port'],
+        debug=DASHBOARD_CONFIG['debug']
+    )
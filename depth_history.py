@@ -0,0 +1,155 @@
+# modules/depth_history.py
+
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+
+
+class DepthHistory:
+    def __init__(self, tick_size, rows=200, bucket_ticks=2, capacity=3600, interval=1.0):
+        """
+        L2 kitabın zaman içindeki derinlik geçmişi (heatmap için)
+
+        Kitap sabit aralıklarla örneklenir, hacim fiyat kovalarına toplanıp
+        (zaman x fiyat) float32 matrise yazılır. Matris sabit kapasiteli bir
+        halkadır, bellek kullanımı capacity * rows * 4 byte ile sınırlıdır.
+        Fiyat ızgarası orta fiyata göre kurulur; fiyat ızgaranın kenarına
+        yaklaşınca matris kaydırılır ve grid_version artar.
+
+        Args:
+            tick_size: Enstrüman tick büyüklüğü
+            rows: Izgaradaki fiyat kovası sayısı
+            bucket_ticks: Bir kovanın tick cinsinden genişliği
+            capacity: Saklanan örnek (sütun) sayısı
+            interval: Örnekleme aralığı (saniye)
+        """
+        self.bucket = tick_size * bucket_ticks
+        self.rows = rows
+        self.capacity = capacity
+        self.interval = interval
+
+        self.volumes = np.zeros((capacity, rows), dtype=np.float32)
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.mids = np.zeros(capacity, dtype=np.float64)
+        self.seq = 0  # Toplam yazılan örnek, halka indeksi seq % capacity
+        self.origin = None  # İlk kovanın alt fiyatı
+        self.grid_version = 0
+        self.last_sample = 0.0
+        self.lock = threading.Lock()
+        # Süreç kimliği: gunicorn worker'larının her biri ayrı geçmiş tutar,
+        # bir worker'ın cursor'ı diğerinde geçersizdir
+        self.history_id = f"{os.getpid()}-{uuid.uuid4().hex}"
+
+    def record(self, bids, asks, timestamp=None):
+        """
+        Kitabı örnekle, aralık dolmadıysa atla
+
+        Args:
+            bids, asks: (fiyat, hacim) satırlı Nx2 diziler
+
+        Returns:
+            bool: Örnek yazıldıysa True
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        if timestamp - self.last_sample < self.interval or not len(bids) or not len(asks):
+            return False
+
+        mid = (bids[0, 0] + asks[0, 0]) / 2
+        levels = np.concatenate([bids, asks])
+
+        with self.lock:
+            self._recenter(mid)
+            buckets = ((levels[:, 0] - self.origin) // self.bucket).astype(np.int64)
+            inside = (buckets >= 0) & (buckets < self.rows)
+            column = np.bincount(buckets[inside], weights=levels[inside, 1], minlength=self.rows)
+
+            index = self.seq % self.capacity
+            self.volumes[index] = column
+            self.times[index] = timestamp
+            self.mids[index] = mid
+            self.seq += 1
+            self.last_sample = timestamp
+        return True
+
+    def record_book(self, book, timestamp=None):
+        """OrderBookManager dizilerinden örnekle"""
+        return self.record(book.bids, book.asks, timestamp)
+
+    def _recenter(self, mid):
+        """Orta fiyat ızgaranın iç yarısından çıktıysa ızgarayı kaydır"""
+        center = self.rows // 2
+        if self.origin is None:
+            self.origin = (mid // self.bucket - center) * self.bucket
+            return
+
+        offset = int((mid - self.origin) // self.bucket) - center
+        if abs(offset) < self.rows // 4:
+            return
+
+        # Eski sütunlar yeni ızgaraya kaydırılır, dışarıda kalan kovalar düşer
+        if abs(offset) >= self.rows:
+            self.volumes[:] = 0
+        elif offset > 0:
+            self.volumes[:, :-offset] = self.volumes[:, offset:]
+            self.volumes[:, -offset:] = 0
+        else:
+            self.volumes[:, -offset:] = self.volumes[:, :offset]
+            self.volumes[:, :-offset] = 0
+        self.origin += offset * self.bucket
+        self.grid_version += 1
+
+    def cursor(self, window):
+        """Pencereden istemci cursor'ı"""
+        return {
+            'history_id': window['history_id'],
+            'origin': None if window['origin'] is None else float(window['origin']),
+            'seq': window['seq'],
+            'grid_version': window['grid_version']
+        }
+
+    def matches(self, cursor):
+        """Cursor bu geçmişe ve mevcut ızgaraya aitse True"""
+        return bool(cursor) and (
+            cursor.get('history_id') == self.history_id
+            and cursor.get('origin') == (None if self.origin is None else float(self.origin))
+            and cursor.get('grid_version') == self.grid_version
+        )
+
+    def prices(self):
+        """Kova orta fiyatları"""
+        if self.origin is None:
+            return np.empty(0)
+        return self.origin + (np.arange(self.rows) + 0.5) * self.bucket
+
+    def window(self, after=None):
+        """
+        Zaman sırasıyla örnekler
+
+        Args:
+            after: Bu seq'ten sonraki örnekler; None ise tüm halka
+
+        Returns:
+            dict: history_id, origin, seq (son örnek), grid_version, prices, times, mids,
+                  volumes (örnek x fiyat) veya after halkada yoksa None (tam yeniden
+                  çizim gerekir)
+        """
+        with self.lock:
+            oldest = max(0, self.seq - self.capacity)
+            start = oldest if after is None else after
+            if start < oldest or start > self.seq:
+                return None
+
+            indices = np.arange(start, self.seq) % self.capacity
+            return {
+                'history_id': self.history_id,
+                'origin': self.origin,
+                'seq': self.seq,
+                'grid_version': self.grid_version,
+                'prices': self.prices(),
+                'times': self.times[indices],
+                'mids': self.mids[indices],
+                'volumes': self.volumes[indices]
+            }
@@ -0,0 +1,466 @@
+# modules/execution.py
+
+import asyncio
+import itertools
+import logging
+import math
+import threading
+import time
+from collections import deque
+import numpy as np
+
+ALGO_TWAP = 'twap'
+ALGO_ICEBERG = 'iceberg'
+ALGO_LADDER = 'ladder'
+
+OPEN_STATUSES = ('open', 'new', None)
+
+
+class Timer:
+    __slots__ = ('deadline', 'callback', 'args', 'cancelled')
+
+    def __init__(self, deadline, callback, args):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerWheel:
+    def __init__(self, tick=0.05, slots=512):
+        """
+        Hashed timer wheel, child emir zamanlaması için
+
+        Zamanlayıcı ekleme / iptal O(1), her tick'te sadece o slot taranır.
+        schedule herhangi bir thread'den çağrılabilir, callback'ler event
+        loop üzerinde çalışır (coroutine fonksiyonlar task olarak başlatılır).
+
+        Args:
+            tick: Tick süresi (saniye)
+            slots: Slot sayısı, tick * slots süresinden uzun gecikmeler tur sayar
+        """
+        self.tick = tick
+        self.slots = [[] for _ in range(slots)]
+        self.current = 0
+        self.lock = threading.Lock()
+        self.tasks = set()
+        self.logger = logging.getLogger(__name__)
+
+    def schedule(self, delay, callback, *args):
+        """delay saniye sonra callback(*args) çağır"""
+        with self.lock:
+            deadline = self.current + max(1, math.ceil(delay / self.tick))
+            timer = Timer(deadline, callback, args)
+            self.slots[deadline % len(self.slots)].append(timer)
+        return timer
+
+    def _advance(self):
+        with self.lock:
+            self.current += 1
+            bucket = self.slots[self.current % len(self.slots)]
+            due = [timer for timer in bucket if timer.deadline <= self.current]
+            bucket[:] = [timer for timer in bucket if timer.deadline > self.current]
+        return due
+
+    def _fire(self, timer):
+        try:
+            if asyncio.iscoroutinefunction(timer.callback):
+                task = asyncio.ensure_future(timer.callback(*timer.args))
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+            else:
+                timer.callback(*timer.args)
+        except Exception as e:
+            self.logger.error(f"Timer callback error: {e}")
+
+    async def run(self):
+        """Wheel'i durdurulana kadar döndür"""
+        next_tick = time.monotonic()
+        while True:
+            next_tick += self.tick
+            await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+            for timer in self._advance():
+                if not timer.cancelled:
+                    self._fire(timer)
+
+
+class ParentOrder:
+    def __init__(self, parent_id, symbol, side, amount, algo, arrival_price):
+        """Child emirlere bölünmüş büyük emir ve dolum istatistikleri"""
+        self.id = parent_id
+        self.symbol = symbol
+        self.side = side
+        self.amount = amount
+        self.algo = algo
+        self.arrival_price = arrival_price
+
+        self.children = {}  # order_id -> {'amount', 'filled', 'average', 'price', 'status'}
+        self.sent = 0.0
+        self.status = 'working'
+        self.created = time.time()
+        self.deadline = None
+        self.completed = None
+        self.timers = []
+
+    @property
+    def filled(self):
+        return sum(child['filled'] for child in self.children.values())
+
+    @property
+    def remaining(self):
+        return max(0.0, self.amount - self.filled)
+
+    def open_children(self):
+        return [
+            order_id for order_id, child in self.children.items()
+            if child['status'] in OPEN_STATUSES
+        ]
+
+    def apply(self, order):
+        """Exchange emir cevabıyla child durumunu güncelle"""
+        child = self.children.setdefault(order['id'], {
+            'amount': order.get('amount') or 0.0,
+            'price': order.get('price'),
+            'filled': 0.0,
+            'average': None,
+            'status': None
+        })
+        child['filled'] = float(order.get('filled') or 0.0)
+        child['average'] = order.get('average') or child['average'] or order.get('price')
+        child['status'] = order.get('status')
+
+    def average_price(self):
+        filled = self.filled
+        if not filled:
+            return None
+        cost = sum(
+            child['filled'] * child['average']
+            for child in self.children.values() if child['filled'] and child['average']
+        )
+        return cost / filled
+
+    def report(self):
+        """Slipaj (varış fiyatına göre, bps, pozitif = aleyhte) ve dolum oranı"""
+        average = self.average_price()
+        slippage_bps = None
+        if average and self.arrival_price:
+            direction = 1 if self.side == 'buy' else -1
+            slippage_bps = float(direction * (average - self.arrival_price) / self.arrival_price * 10000)
+
+        return {
+            'id': self.id,
+            'symbol': self.symbol,
+            'side': self.side,
+            'algo': self.algo,
+            'status': self.status,
+            'amount': self.amount,
+            'filled': self.filled,
+            'fill_rate': self.filled / self.amount if self.amount else 0.0,
+            'arrival_price': self.arrival_price,
+            'average_price': average,
+            'slippage_bps': slippage_bps,
+            'children': len(self.children),
+            'duration': (self.completed or time.time()) - self.created
+        }
+
+
+class ExecutionEngine:
+    def __init__(self, exchange, ob_manager, config, runner=None):
+        """
+        Büyük girişler için TWAP, iceberg ve post-only limit merdiveni
+
+        Child emir büyüklükleri canlı order book derinliğinden hesaplanır,
+        zamanlama TimerWheel ile yapılır. Bloklayan exchange çağrıları
+        runner (ör. TradingOrchestrator.run_blocking) üzerinden çalışır.
+
+        Args:
+            exchange: ccxt exchange instance
+            ob_manager: OrderBookManager instance
+            config: EXECUTION_CONFIG sözlüğü
+            runner: async runner(func, *args), varsayılan asyncio.to_thread
+        """
+        self.exchange = exchange
+        self.ob_manager = ob_manager
+        self.config = config
+        self.runner = runner or asyncio.to_thread
+        self.logger = logging.getLogger(__name__)
+
+        self.wheel = TimerWheel(config['wheel_tick'])
+        self.tick_size = config['tick_size']
+        self.lot_size = config['lot_size']
+        self.parents = {}  # Çalışan parent emirler
+        self.lock = threading.Lock()  # parents ve parent durum geçişleri (executor thread'leri)
+        self.reports = deque(maxlen=500)
+        self.listeners = []
+        self._ids = itertools.count(1)
+
+    def add_listener(self, callback):
+        """Parent emir tamamlandığında callback(report) çağrılır"""
+        self.listeners.append(callback)
+
+    def should_slice(self, amount):
+        return bool(self.config['algo']) and amount >= self.config['min_parent_size']
+
+    def submit(self, symbol, side, amount, algo=None, reference_price=None):
+        """Parent emri oluştur ve ilk child'ları zamanla (thread-safe)"""
+        algo = algo or self.config['algo']
+        arrival_price = self.ob_manager.mid_price() or reference_price
+        arrival_price = float(arrival_price) if arrival_price else None
+        parent = ParentOrder(f"parent-{next(self._ids)}", symbol, side, amount, algo, arrival_price)
+        with self.lock:
+            self.parents[parent.id] = parent
+
+        if algo == ALGO_TWAP:
+            slices = self.config['twap_slices']
+            self._schedule(parent, 0, self._twap_slice, parent, slices)
+        elif algo == ALGO_ICEBERG:
+            parent.deadline = time.monotonic() + self.config['iceberg_timeout']
+            self._schedule(parent, 0, self._place_iceberg, parent)
+        elif algo == ALGO_LADDER:
+            parent.deadline = time.monotonic() + self.config['ladder_timeout']
+            self._schedule(parent, 0, self._place_ladder, parent)
+        else:
+            raise ValueError(f"Unknown execution algo: {algo}")
+
+        self.logger.info(
+            f"Parent order submitted - {parent.id}: {algo} {side} {amount}",
+            extra={'order_id': parent.id, 'algo': algo, 'side': side, 'amount': amount}
+        )
+        return parent
+
+    def _schedule(self, parent, delay, callback, *args):
+        parent.timers.append(self.wheel.schedule(delay, callback, *args))
+
+    def _book_side(self, side, own=False):
+        """Emrin karşı tarafı (veya own=True ise kendi tarafı) [fiyat, hacim] dizisi"""
+        buying = side == 'buy'
+        if own:
+            buying = not buying
+        levels = self.ob_manager.asks if buying else self.ob_manager.bids
+        return levels[:self.config['depth_levels']]
+
+    def _depth_cap(self, side):
+        """Karşı taraf görünür derinliğin katılım oranı kadarı"""
+        levels = self._book_side(side)
+        if not len(levels):
+            return None
+        return float(levels[:, 1].sum()) * self.config['participation_rate']
+
+    def _round(self, price):
+        return round(round(price / self.tick_size) * self.tick_size, 8)
+
+    def _lot(self, amount):
+        return round(math.floor(amount / self.lot_size + 1e-9) * self.lot_size, 8)
+
+    async def _send(self, parent, amount, price, params):
+        """Child limit emri gönder"""
+        if amount <= 0 or parent.status != 'working':
+            return None
+        side = parent.side
+        try:
+            order = await self.runner(
+                self.exchange.create_order, parent.symbol, 'limit', side, amount, price, params
+            )
+            parent.sent += amount
+            parent.apply(order)
+            if parent.status != 'working':
+                # Gönderim sürerken parent iptal edildi, yeni child açık kalmasın
+                await self.runner(self._cancel_children, parent)
+            return order
+        except Exception as e:
+            self.logger.error(f"Child order error ({parent.id}): {e}")
+            return None
+
+    async def _twap_slice(self, parent, slices_left):
+        """Eşit zaman aralıklı IOC dilimler, dilim büyüklüğü derinlikle sınırlı"""
+        if parent.status != 'working':
+            return
+
+        remaining = parent.remaining
+        quantity = remaining / slices_left
+        cap = self._depth_cap(parent.side)
+        if cap is not None:
+            quantity = min(quantity, cap)
+
+        touch = self._book_side(parent.side)
+        if len(touch):
+            offset = self.config['max_slippage_ticks'] * self.tick_size
+            price = touch[0, 0] + offset if parent.side == 'buy' else touch[0, 0] - offset
+            await self._send(parent, self._lot(quantity), self._round(price), {'timeInForce': 'ImmediateOrCancel'})
+
+        if slices_left > 1 and parent.remaining > 0:
+            interval = self.config['twap_duration'] / self.config['twap_slices']
+            self._schedule(parent, interval, self._twap_slice, parent, slices_left - 1)
+        else:
+            self._complete(parent)
+
+    async def _place_iceberg(self, parent):
+        """Görünen kısmı en iyi seviye hacmine göre ayarlanmış tek gizli emir"""
+        own = self._book_side(parent.side, own=True)
+        if not len(own):
+            self._complete(parent)
+            return
+
+        display = max(self.lot_size, self._lot(own[0, 1] * self.config['iceberg_display_fraction']))
+        display = min(display, self._lot(parent.amount))
+        await self._send(parent, self._lot(parent.amount), float(own[0, 0]), {
+            'displayQty': display,
+            'execInst': 'ParticipateDoNotInitiate'
+        })
+        self._schedule(parent, self.config['poll_interval'], self._poll, parent)
+
+    async def _place_ladder(self, parent):
+        """Kendi taraftaki seviyelere, kuyruk hacmiyle orantılı post-only emirler"""
+        own = self._book_side(parent.side, own=True)[:self.config['ladder_levels']]
+        if not len(own):
+            self._complete(parent)
+            return
+
+        weights = own[:, 1] / own[:, 1].sum()
+        sizes = [self._lot(weight * parent.amount) for weight in weights]
+        sizes[0] = self._lot(parent.amount - sum(sizes[1:]))  # Yuvarlama farkı en iyi seviyeye
+
+        for price, size in zip(own[:, 0], sizes):
+            await self._send(parent, size, float(price), {'execInst': 'ParticipateDoNotInitiate'})
+        self._schedule(parent, self.config['poll_interval'], self._poll, parent)
+
+    async def _poll(self, parent):
+        """Açık child emirlerin dolumlarını güncelle, süre dolduğunda iptal et"""
+        if parent.status != 'working':
+            return
+
+        for order_id in parent.open_children():
+            try:
+                order = await self.runner(self.exchange.fetch_order, order_id, parent.symbol)
+                parent.apply(order)
+            except Exception as e:
+                self.logger.error(f"Child order fetch error ({order_id}): {e}")
+
+        self.logger.debug(
+            "Parent order progress",
+            extra={'order_id': parent.id, 'filled': parent.filled, 'open_children': len(parent.open_children())}
+        )
+        if not parent.open_children() or parent.remaining <= 0:
+            self._complete(parent)
+            return
+
+        if time.monotonic() >= parent.deadline:
+            await self.runner(self._cancel_children, parent)
+            self._complete(parent)
+            return
+
+        if parent.algo == ALGO_ICEBERG:
+            await self._reprice_iceberg(parent)
+        self._schedule(parent, self.config['poll_interval'], self._poll, parent)
+
+    async def _reprice_iceberg(self, parent):
+        """Kitap uzaklaştıysa iceberg fiyatını yerinde güncelle (amend)"""
+        own = self._book_side(parent.side, own=True)
+        if not len(own):
+            return
+        touch = float(own[0, 0])
+        for order_id in parent.open_children():
+            child = parent.children[order_id]
+            if child['price'] is None:
+                continue
+            moved = touch - child['price'] if parent.side == 'buy' else child['price'] - touch
+            if moved < self.config['reprice_ticks'] * self.tick_size:
+                continue
+            try:
+                await self.runner(
+                    self.exchange.edit_order, order_id, parent.symbol, 'limit', parent.side,
+                    None, touch
+                )
+                child['price'] = touch
+            except Exception as e:
+                self.logger.error(f"Iceberg reprice error ({order_id}): {e}")
+
+    def _cancel_children(self, parent):
+        """Açık child emirleri exchange'de iptal et (bloklayan, executor'da)"""
+        for order_id in parent.open_children():
+            try:
+                order = self.exchange.cancel_order(order_id, parent.symbol)
+                if order and order.get('id'):
+                    parent.apply(order)
+                else:
+                    parent.children[order_id]['status'] = 'canceled'
+            except Exception as e:
+                self.logger.error(f"Child order cancel error ({order_id}): {e}")
+
+    def _complete(self, parent):
+        with self.lock:
+            if parent.status != 'working':
+                return
+            self.parents.pop(parent.id, None)
+            parent.completed = time.time()
+            parent.status = 'filled' if parent.remaining <= 0 else ('partial' if parent.filled else 'unfilled')
+        for timer in parent.timers:
+            timer.cancel()
+        parent.timers = []
+
+        report = parent.report()
+        self.reports.append(report)
+        self.logger.info(
+            f"Parent order done - {parent.id}: {report['status']}, "
+            f"fill rate {report['fill_rate']:.1%}, slippage {report['slippage_bps']} bps",
+            extra={
+                'order_id': parent.id,
+                'algo': parent.algo,
+                'fill_rate': report['fill_rate'],
+                'slippage_bps': report['slippage_bps'],
+                'duration_ms': report['duration'] * 1000
+            }
+        )
+        for callback in self.listeners:
+            try:
+                callback(report)
+            except Exception as e:
+                self.logger.error(f"Execution listener error: {e}")
+
+    def cancel(self, parent_id):
+        """
+        Parent emri durdur: zamanlanmış child'ları ve exchange'de açık
+        child emirleri iptal et (bloklayan, executor'da çağrılmalı)
+
+        Returns:
+            dict: Parent raporu (filled ile dolmuş kısım); parent yoksa None
+        """
+        with self.lock:
+            parent = self.parents.pop(parent_id, None)
+            if not parent or parent.status != 'working':
+                return None
+            parent.status = 'cancelled'
+        for timer in parent.timers:
+            timer.cancel()
+        parent.timers = []
+        self._cancel_children(parent)
+        parent.completed = time.time()
+        report = parent.report()
+        self.reports.append(report)
+        return report
+
+    def cancel_all(self):
+        with self.lock:
+            parent_ids = list(self.parents)
+        return [self.cancel(parent_id) for parent_id in parent_ids]
+
+    def get_report(self, parent_id):
+        with self.lock:
+            parent = self.parents.get(parent_id)
+        if parent:
+            return parent.report()
+        return next((report for report in self.reports if report['id'] == parent_id), None)
+
+    def get_summary(self):
+        """Tamamlanan parent emirler için ortalama slipaj ve dolum oranı"""
+        done = [report for report in self.reports if report['status'] != 'cancelled']
+        slippages = [report['slippage_bps'] for report in done if report['slippage_bps'] is not None]
+        return {
+            'parents': len(done),
+            'working': len(self.parents),
+            'avg_fill_rate': float(np.mean([report['fill_rate'] for report in done])) if done else 0.0,
+            'avg_slippage_bps': float(np.mean(slippages)) if slippages else 0.0
+        }
@@ -0,0 +1,151 @@
+# modules/execution_quality.py
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MARKOUT_HORIZONS = (1, 10, 60)  # saniye, trade_store kolonlarıyla aynı
+
+
+class ExecutionQualityTracker:
+    def __init__(self, store, ob_manager, config):
+        """
+        Dolum kalitesi kaydı
+
+        Emir gönderilirken niyet edilen fiyat, varış (mid) fiyatı ve kitap
+        durumu saklanır. Dolumda kayma, implementation shortfall ve gecikme
+        hesaplanır; 1s / 10s / 60s markout'lar fiyat akışından doldurulur.
+        Tamamlanan kayıtlar flush() ile toplu olarak depoya yazılır.
+        """
+        self.store = store
+        self.ob_manager = ob_manager
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self.lock = threading.Lock()
+
+        self.submits = OrderedDict()  # emir id -> gönderim anındaki durum
+        self.pending = []  # markout bekleyen dolumlar
+        self.completed = []  # depoya yazılacak kayıtlar
+
+    def on_submit(self, order_id, order_type, side, amount, intended_price):
+        """Emir gönderildi, varış fiyatı ve kitap durumunu sakla"""
+        book = self.ob_manager
+        best_bid, best_ask = book.best_bid(), book.best_ask()
+        near = book.asks if side == 'buy' else book.bids
+        levels = self.config['depth_levels']
+
+        with self.lock:
+            self.submits[order_id] = {
+                'order_id': order_id,
+                'order_type': order_type,
+                'side': side,
+                'intended_price': float(intended_price),
+                'arrival_price': float(book.mid_price()) if best_bid is not None and best_ask is not None else None,
+                'submitted_at': time.time(),
+                'spread': float(best_ask - best_bid) if best_bid is not None and best_ask is not None else None,
+                'imbalance': book.get_imbalance(levels),
+                'top_depth': float(near[:levels, 1].sum()) if len(near) else 0.0
+            }
+            while len(self.submits) > self.config['max_tracked_orders']:
+                self.submits.popitem(last=False)
+
+    def on_fill(self, order_id, price, amount, timestamp=None):
+        """Dolum geldi, gönderim kaydıyla eşleştir ve markout için beklet"""
+        with self.lock:
+            submit = self.submits.get(order_id)
+        if submit is None:
+            return False
+
+        filled_at = timestamp / 1000 if timestamp else time.time()
+        sign = 1 if submit['side'] == 'buy' else -1
+        arrival = submit['arrival_price'] or submit['intended_price']
+        row = {
+            **submit,
+            'amount': float(amount),
+            'exec_price': float(price),
+            'filled_at': filled_at,
+            'latency_ms': max(0.0, filled_at - submit['submitted_at']) * 1000,
+            # Pozitif değer aleyhte: alışta daha yüksek, satışta daha düşük fiyat
+            'slippage_bps': sign * (price - submit['intended_price']) / submit['intended_price'] * 10000,
+            'shortfall_bps': sign * (price - arrival) / arrival * 10000
+        }
+        with self.lock:
+            self.pending.append(row)
+        return True
+
+    def on_reconciliation(self, kind, payload):
+        """PositionReconciler dinleyicisi"""
+        if kind == 'fill':
+            self.on_fill(payload['order'], payload['price'], payload['amount'], payload.get('timestamp'))
+
+    def on_price(self, mid_price, now=None):
+        """Fiyat akışı, vadesi gelen markout'ları doldur (event loop'ta, I/O yok)"""
+        if not self.pending or mid_price is None:
+            return
+        now = time.time() if now is None else now
+        with self.lock:
+            still_pending = []
+            for row in self.pending:
+                sign = 1 if row['side'] == 'buy' else -1
+                for horizon in MARKOUT_HORIZONS:
+                    key = f'markout_{horizon}s'
+                    if key not in row and now - row['filled_at'] >= horizon:
+                        # Pozitif değer lehte: dolumdan sonra fiyat pozisyon yönünde gitti
+                        row[key] = sign * (mid_price - row['exec_price']) / row['exec_price'] * 10000
+                if f'markout_{MARKOUT_HORIZONS[-1]}s' in row:
+                    self.completed.append(row)
+                else:
+                    still_pending.append(row)
+            self.pending = still_pending
+
+    def flush(self):
+        """Tamamlanan kayıtları depoya yaz (executor'da çağrılmalı)"""
+        with self.lock:
+            rows, self.completed = self.completed, []
+        return self.store.record_executions(rows)
+
+
+def summarize_execution_quality(df):
+    """
+    Emir tipi ve saat kırılımında dolum kalitesi
+
+    Returns:
+        dict: overall (genel ortalamalar), by_order_type ve by_hour tabloları
+    """
+    if df.empty:
+        return None
+
+    df = df.assign(hour=pd.to_datetime(df['filled_at'], unit='s').dt.hour)
+    # Miktarla ağırlıklı shortfall: toplam maliyet / toplam miktar
+    df['shortfall_cost'] = df['shortfall_bps'] * df['amount']
+    metrics = {
+        'fills': ('exec_price', 'count'),
+        'amount': ('amount', 'sum'),
+        'slippage_bps': ('slippage_bps', 'mean'),
+        'shortfall_bps': ('shortfall_bps', 'mean'),
+        'shortfall_cost': ('shortfall_cost', 'sum'),
+        'latency_ms': ('latency_ms', 'median'),
+        **{f'markout_{h}s': (f'markout_{h}s', 'mean') for h in MARKOUT_HORIZONS}
+    }
+
+    def breakdown(column):
+        table = df.groupby(column).agg(**metrics)
+        table['weighted_shortfall_bps'] = table['shortfall_cost'] / table['amount'].replace(0, np.nan)
+        return table.drop(columns='shortfall_cost').reset_index()
+
+    return {
+        'overall': {
+            'fills': int(len(df)),
+            'slippage_bps': float(df['slippage_bps'].mean()),
+            'shortfall_bps': float(df['shortfall_bps'].mean()),
+            'shortfall_p95_bps': float(df['shortfall_bps'].quantile(0.95)),
+            'latency_ms_p50': float(df['latency_ms'].median()),
+            **{f'markout_{h}s': float(df[f'markout_{h}s'].mean()) for h in MARKOUT_HORIZONS}
+        },
+        'by_order_type': breakdown('order_type'),
+        'by_hour': breakdown('hour')
+    }
@@ -0,0 +1,119 @@
+# modules/indicator_cache.py
+
+import logging
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+def _nbytes(value):
+    """Önbellekteki değerin yaklaşık bellek kullanımı"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(item) for item in value)
+    if isinstance(value, dict):
+        return sum(_nbytes(item) for item in value.values())
+    return 64
+
+
+def _freeze(value):
+    """Paylaşılan dizilerin yanlışlıkla değiştirilmesini engelle"""
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            _freeze(item)
+    return value
+
+
+class IndicatorCache:
+    def __init__(self, max_entries=512, max_bytes=64 * 1024 * 1024):
+        """
+        (symbol, timeframe, version, indicator, params) anahtarlı LRU önbellek
+
+        Args:
+            max_entries: Tutulacak maksimum kayıt sayısı
+            max_bytes: Toplam dizi belleği üst sınırı
+        """
+        self.logger = logging.getLogger(__name__)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0
+        }
+
+    @staticmethod
+    def make_key(symbol, timeframe, version, indicator_key):
+        name, params = indicator_key
+        return (symbol, timeframe, version, name, params)
+
+    def get(self, key):
+        """Kayıt varsa döndür ve en yeni olarak işaretle"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Kayıt ekle, sınır aşılırsa en eskileri çıkar"""
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return value
+
+        _freeze(value)
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous[1]
+
+            self.entries[key] = (value, size)
+            self.total_bytes += size
+
+            while (len(self.entries) > self.max_entries or
+                   self.total_bytes > self.max_bytes):
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.stats['evictions'] += 1
+
+        return value
+
+    def get_or_compute(self, key, compute):
+        """Önbellekte yoksa hesapla ve sakla"""
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, compute())
+        return value
+
+    def invalidate(self, symbol=None, timeframe=None):
+        """Sembol / zaman dilimine ait kayıtları sil"""
+        with self.lock:
+            for key in list(self.entries):
+                if symbol is not None and key[0] != symbol:
+                    continue
+                if timeframe is not None and key[1] != timeframe:
+                    continue
+                _, size = self.entries.pop(key)
+                self.total_bytes -= size
+
+    def get_stats(self):
+        """Önbellek istatistikleri"""
+        with self.lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'entries': len(self.entries),
+                'bytes': self.total_bytes,
+                'hit_rate': self.stats['hits'] / lookups if lookups else 0
+            }
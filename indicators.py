@@ -0,0 +1,103 @@
+# modules/indicators.py
+
+import numpy as np
+import talib
+
+
+def atr(high, low, close, period):
+    """Average True Range"""
+    return talib.ATR(high, low, close, timeperiod=period)
+
+
+def roc(close, period):
+    """Rate of change"""
+    return talib.ROC(close, timeperiod=period)
+
+
+def rsi(close, period=14):
+    """Relative strength index"""
+    return talib.RSI(close, timeperiod=period)
+
+
+def sma(values, period):
+    """Basit hareketli ortalama, ilk period-1 değer NaN"""
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    if len(values) < period:
+        return result
+    cumsum = np.cumsum(np.insert(values, 0, 0.0))
+    result[period - 1:] = (cumsum[period:] - cumsum[:-period]) / period
+    return result
+
+
+def supertrend(high, low, close, atr_values, multiplier):
+    """SuperTrend bantları ve trend yönü"""
+    mid = (high + low) / 2
+    upperband = mid + multiplier * atr_values
+    lowerband = mid - multiplier * atr_values
+
+    in_uptrend = np.ones(len(close), dtype=bool)
+    for i in range(1, len(close)):
+        if in_uptrend[i - 1]:
+            in_uptrend[i] = not close[i] < lowerband[i]
+        else:
+            in_uptrend[i] = close[i] > upperband[i]
+
+    return upperband, lowerband, in_uptrend
+
+
+def trend_duration(in_uptrend):
+    """Mevcut trendin kaç mumdur sürdüğü"""
+    index = np.arange(len(in_uptrend))
+    if not len(index):
+        return index
+    change = np.empty(len(in_uptrend), dtype=bool)
+    change[0] = True
+    change[1:] = in_uptrend[1:] != in_uptrend[:-1]
+    run_start = np.maximum.accumulate(np.where(change, index, 0))
+    return index - run_start
+
+
+def signal_strength(in_uptrend, volume, volume_ma, roc_values):
+    """0-100 arası sinyal gücü"""
+    # Trend süresi (0-40 puan)
+    strength = np.minimum(trend_duration(in_uptrend) * 2, 40).astype(np.float64)
+
+    # Hacim desteği (0-30 puan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        strength += np.where(volume > volume_ma, 30, (volume / volume_ma) * 30)
+
+    # Fiyat momentum (0-30 puan)
+    aligned = (in_uptrend & (roc_values > 0)) | (~in_uptrend & (roc_values < 0))
+    strength += np.where(aligned, 30, 0)
+
+    return strength
+
+
+def renko(close, brick_size):
+    """Renko tuğlaları: (kaynak mum indeksi, kapanış, yön) dizileri"""
+    indexes, closes, directions = [], [], []
+    if not len(close):
+        return np.array(indexes), np.array(closes), np.array(directions)
+
+    current_brick = close[0]
+    for i, price in enumerate(close):
+        # Yukarı hareket
+        while price >= current_brick + brick_size:
+            current_brick += brick_size
+            indexes.append(i)
+            closes.append(current_brick)
+            directions.append(1)
+
+        # Aşağı hareket
+        while price <= current_brick - brick_size:
+            current_brick -= brick_size
+            indexes.append(i)
+            closes.append(current_brick)
+            directions.append(-1)
+
+    return (
+        np.array(indexes, dtype=np.int64),
+        np.array(closes, dtype=np.float64),
+        np.array(directions, dtype=np.int8)
+    )
@@ -1,20 +1,102 @@
 # config/logging_config.py
 
+import atexit
+import json
 import logging
 import os
+import queue
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# LogRecord'un standart alanları, geri kalanlar extra={} ile verilen alanlardır
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Tek satır JSON, extra={'order_id': ..., 'latency_ms': ...} alanları üst seviyede"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rates, max_level=logging.DEBUG):
+        """
+        Gürültülü logger'lar için örnekleme
+
+        Sadece max_level ve altındaki kayıtlardan her N'inci kayıt geçer;
+        INFO ve üstü (emir, amend, fill denetim kayıtları) her zaman geçer.
+        Logger adı önek olarak eşleşir.
+
+        Args:
+            rates: {'logger_adı': oran}, ör. {'trailing_stop': 0.1} -> her 10 kayıttan 1'i
+            max_level: Örneklenen en yüksek seviye
+        """
+        super().__init__()
+        self.max_level = max_level
+        self.every = {name: max(1, round(1 / rate)) for name, rate in rates.items() if rate > 0}
+        self.counters = {}
+        self.resolved = {}
+
+    def _every(self, name):
+        every = self.resolved.get(name)
+        if every is None:
+            every = 1
+            for prefix, value in self.every.items():
+                if name == prefix or name.startswith(prefix + '.'):
+                    every = value
+                    break
+            self.resolved[name] = every
+        return every
+
+    def filter(self, record):
+        if record.levelno > self.max_level:
+            return True
+        every = self._every(record.name)
+        if every == 1:
+            return True
+        count = self.counters.get(record.name, 0) + 1
+        self.counters[record.name] = count
+        return count % every == 1
+
+
+class _InProcessQueueHandler(QueueHandler):
+    """Kaydı formatlamadan kuyruğa koy, formatlama listener thread'inde yapılır"""
+
+    def prepare(self, record):
+        return record
+
+
+def setup_logging(log_dir='logs', log_level=logging.INFO, json_format=True, sampling=None):
+    """
+    Loglama sistemini ayarla
+
+    Çağıran thread sadece kaydı kuyruğa koyar, dosya / konsol yazımı
+    QueueListener thread'inde yapılır. Dosya logları JSON formatındadır.
+    """
+    global _listener
 
-def setup_logging(log_dir='logs', log_level=logging.INFO):
-    """Loglama sistemini ayarla"""
-    
     # Log dizinini oluştur
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
 
     # Log dosya adı
     log_file = f"{log_dir}/trading_{datetime.now().strftime('%Y%m%d')}.log"
-    
+
     # Formatter tanımla
     formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -26,17 +108,33 @@ def setup_logging(log_dir='logs', log_level=logging.INFO):
         maxBytes=10*1024*1024,  # 10MB
         backupCount=5
     )
-    file_handler.setFormatter(formatter)
+    file_handler.setFormatter(JsonFormatter() if json_format else formatter)
 
     # Console handler
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
 
+    # Çağrı yeri (dosya / satır) bilgisi için stack taraması yapılmasın
+    logging._srcfile = None
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    if _listener:
+        _listener.stop()
+    _listener = QueueListener(queue.SimpleQueue(), file_handler, console_handler, respect_handler_level=True)
+    queue_handler = _InProcessQueueHandler(_listener.queue)
+    if sampling:
+        queue_handler.addFilter(SamplingFilter(sampling))
+
     # Root logger'ı yapılandır
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    for handler in list(root_logger.handlers):
+        if isinstance(handler, QueueHandler):
+            root_logger.removeHandler(handler)
+    root_logger.addHandler(queue_handler)
+    _listener.start()
+    atexit.register(stop_logging)
 
     # Özel logger'lar
     loggers = {
@@ -51,3 +149,11 @@ def setup_logging(log_dir='logs', log_level=logging.INFO):
         logger.setLevel(log_level)
 
     return loggers
+
+
+def stop_logging():
+    """Kuyruktaki kayıtları yaz ve listener'ı durdur"""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
@@ -1 +1,719 @@
+# main.py
 
+import asyncio
+import importlib
+import logging
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+import numpy as np
+
+from settings import (
+    API_CONFIG,
+    TELEGRAM_CONFIG,
+    TRADING_CONFIG,
+    SYSTEM_CONFIG,
+    DASHBOARD_CONFIG,
+    STATE_BUS_CONFIG,
+    PIPELINE_CONFIG,
+    API_SERVER_CONFIG,
+    PORTFOLIO_RISK_CONFIG,
+    EXECUTION_CONFIG,
+    SUPERVISOR_CONFIG,
+    RECONCILIATION_CONFIG,
+    PERFORMANCE_CONFIG,
+    MONTE_CARLO_CONFIG
+)
+from logging_config import setup_logging
+from trading_config import TradingConfig
+from bitmex_integration import BitmexTrader
+from order_book import OrderBookManager
+from market_analysis import MarketAnalyzer
+from risk_manager import RiskManager
+from portfolio_risk import PortfolioRiskEngine
+from trailing_stop import TrailingStopEngine
+from execution import ExecutionEngine
+from monitoring import SystemMonitor
+from state_snapshot import StateStore
+from state_persistence import StatePersistence
+from depth_history import DepthHistory
+from rate_limiter import PRIORITY_LOW, get_rate_limit_manager
+from connection_supervisor import ConnectionSupervisor
+from reconciliation import PositionReconciler, FillLedger
+from trade_store import TradeStore
+from trade_analysis import TradeAnalyzer
+from execution_quality import ExecutionQualityTracker
+from performance_analyzer import PerformanceAnalyzer
+from monte_carlo import MonteCarloSimulator
+
+# Dosya adı tire içerdiği için normal import ile yüklenemiyor
+AdvancedOrderManager = importlib.import_module('advanced-order-manager').AdvancedOrderManager
+
+
+class StageMetrics:
+    """Pipeline aşaması için kuyruk derinliği ve gecikme ölçümü"""
+
+    def __init__(self, name, queue=None, window=1000):
+        self.name = name
+        self.queue = queue
+        self.processed = 0
+        self.errors = 0
+        self.wait_times = deque(maxlen=window)
+        self.latencies = deque(maxlen=window)
+
+    def record(self, wait_time, latency):
+        self.processed += 1
+        self.wait_times.append(wait_time)
+        self.latencies.append(latency)
+
+    def snapshot(self):
+        latencies = np.array(self.latencies) if self.latencies else np.zeros(1)
+        waits = np.array(self.wait_times) if self.wait_times else np.zeros(1)
+        return {
+            'queue_depth': self.queue.qsize() if self.queue else 0,
+            'queue_max': self.queue.maxsize if self.queue else 0,
+            'processed': self.processed,
+            'errors': self.errors,
+            'wait_avg': float(waits.mean()),
+            'latency_avg': float(latencies.mean()),
+            'latency_p99': float(np.percentile(latencies, 99))
+        }
+
+
+class TradingOrchestrator:
+    def __init__(self):
+        """
+        Feed -> analiz -> risk -> emir akışını tek asyncio döngüsünde yönet
+
+        Aşamalar sınırlı kuyruklarla bağlıdır, kuyruk dolduğunda üretici bekler.
+        Bloklayan exchange / pandas / TA-Lib işleri executor üzerinde çalışır.
+        """
+        self.logger = logging.getLogger('trading')
+        self.config = PIPELINE_CONFIG
+        self.running = False
+
+        self.trader = BitmexTrader(
+            API_CONFIG['api_key'],
+            API_CONFIG['api_secret'],
+            testnet=API_CONFIG['testnet']
+        )
+        self.rate_limits = get_rate_limit_manager()
+        # Tüm bileşenler aynı gözetimli exchange vekilini kullanır
+        self.supervisor = ConnectionSupervisor(SUPERVISOR_CONFIG)
+        self.supervisor.add_listener(self._on_connection_event)
+        self.exchange = self.supervisor.wrap(self.trader.exchange)
+        self.trader.exchange = self.exchange
+
+        self.order_book = OrderBookManager(TRADING_CONFIG['symbol'])
+        self.ws = self.order_book  # SystemMonitor feed gecikmesini buradan okur
+        self.depth_history = DepthHistory(
+            TRADING_CONFIG['tick_size'],
+            rows=DASHBOARD_CONFIG['depth_rows'],
+            bucket_ticks=DASHBOARD_CONFIG['depth_bucket_ticks'],
+            capacity=DASHBOARD_CONFIG['depth_capacity'],
+            interval=DASHBOARD_CONFIG['depth_interval']
+        )
+        self.market_analyzer = MarketAnalyzer(self.exchange, self.order_book, TRADING_CONFIG)
+        self.strategy_manager = self.market_analyzer.strategy_manager
+        self.order_manager = AdvancedOrderManager(self.exchange, TRADING_CONFIG, self.order_book)
+        self.trailing_stops = TrailingStopEngine(self.exchange, TRADING_CONFIG)
+        self.order_manager.attach_trailing_stop(self.trailing_stops)
+        self.execution = ExecutionEngine(
+            self.exchange, self.order_book, EXECUTION_CONFIG, runner=self.run_blocking
+        )
+        self.order_manager.attach_execution(self.execution)
+        # Pozisyon ve emirler tek döngüde toplu çekilir, diğer bileşenler yerel modeli okur
+        self.reconciler = PositionReconciler(self.exchange, TRADING_CONFIG['symbol'], RECONCILIATION_CONFIG)
+        self.trader.attach_reconciler(self.reconciler)
+        self.order_manager.attach_reconciler(self.reconciler)
+        self.trade_store = TradeStore(SYSTEM_CONFIG['trade_db'])
+        self.trade_analyzer = TradeAnalyzer(self.trade_store)
+        self.execution_quality = ExecutionQualityTracker(self.trade_store, self.order_book, EXECUTION_CONFIG)
+        self.order_manager.attach_execution_quality(self.execution_quality)
+        self.reconciler.add_listener(self.execution_quality.on_reconciliation)
+        self.portfolio = PortfolioRiskEngine(PORTFOLIO_RISK_CONFIG)
+        for symbol, spec in PORTFOLIO_RISK_CONFIG['symbols'].items():
+            self.portfolio.register_symbol(symbol, spec['multiplier'], spec['inverse'])
+        self.risk_manager = RiskManager(self.trader, TradingConfig())
+        self.risk_manager.attach_portfolio(self.portfolio)
+        # Dolumlardan gerçekleşen PnL, günlük işlem / kayıp ve drawdown limitlerini besler
+        symbol_spec = PORTFOLIO_RISK_CONFIG['symbols'][TRADING_CONFIG['symbol']]
+        self.fill_ledger = FillLedger(symbol_spec['multiplier'], symbol_spec['inverse'])
+        self.performance = PerformanceAnalyzer(PERFORMANCE_CONFIG)
+        self.monte_carlo = MonteCarloSimulator(MONTE_CARLO_CONFIG)
+        self.reconciler.add_listener(self._on_reconciliation)
+        self.monitor = SystemMonitor(self)
+        self.state = StateStore(self._collect_state)
+        self.persistence = StatePersistence(
+            SYSTEM_CONFIG['state_file'], SYSTEM_CONFIG['state_max_age']
+        )
+        self.next_persist = 0.0
+        self.persist_task = None
+        self.telegram = None
+        self.dashboard_thread = None
+        self.state_publisher = None
+
+        # Kuyrukta bekleyen sinyalin yönü, aynı sinyal tekrar kuyruğa girmesin
+        self.pending_direction = None
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.config['executor_workers'],
+            thread_name_prefix='pipeline'
+        )
+        self.queues = {}
+        self.stage_metrics = {}
+        self.tasks = []
+        self.stop_event = None
+        self.loop = None
+        self.api_server = None
+
+        self.warm_started = self._warm_start()
+
+    def _persistent_components(self):
+        return {
+            'market_analyzer': self.market_analyzer,
+            'risk_manager': self.risk_manager,
+            'order_manager': self.order_manager,
+            'trailing_stops': self.trailing_stops,
+            'monitor': self.monitor
+        }
+
+    def _export_state(self):
+        """Bileşen durumlarının kopyası, analiz aşamasında alınır"""
+        return {
+            name: component.export_state()
+            for name, component in self._persistent_components().items()
+        }
+
+    def _warm_start(self):
+        """Kayıtlı durumu yükle ve açık emirleri tek toplu sorguyla uzlaştır"""
+        state = self.persistence.load()
+        if not state:
+            return False
+
+        for name, component in self._persistent_components().items():
+            if name not in state:
+                continue
+            try:
+                component.restore_state(state[name])
+            except Exception as e:
+                self.logger.error(f"Warm start restore error ({name}): {e}")
+
+        if self.reconciler.run_once():
+            self._seed_fill_ledger()
+            self.order_manager.reconcile_orders({order['id'] for order in self.reconciler.get_open_orders()})
+            # Kapalıyken dolan stop / giriş emirleri: sinyal ve emirler gerçek pozisyona göre
+            self.order_manager.reconcile_position(self.reconciler.get_position(TRADING_CONFIG['symbol']))
+        else:
+            # Uzlaştırılamayan emir durumuna güvenme
+            self.order_manager.reconcile_orders(set())
+
+        self.logger.info("Warm start completed")
+        return True
+
+    def _maybe_persist(self):
+        """Aralık dolduysa snapshot'ı arka planda yaz, önceki yazım sürerken atla"""
+        now = time.monotonic()
+        if now < self.next_persist or (self.persist_task and not self.persist_task.done()):
+            return
+        self.next_persist = now + SYSTEM_CONFIG['state_snapshot_interval']
+        state = self._export_state()
+        self.persist_task = asyncio.ensure_future(self.run_blocking(self.persistence.save, state))
+
+    async def run_blocking(self, func, *args):
+        """Bloklayan çağrıyı executor'da çalıştır"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def _publish(self, stage, event):
+        """Olayı aşama kuyruğuna koy, kuyruk doluysa bekle (backpressure)"""
+        event['enqueued_at'] = time.perf_counter()
+        await self.queues[stage].put(event)
+
+    async def _run_stage(self, stage, handler):
+        """Kuyruktan olay alıp işleyen genel aşama döngüsü"""
+        queue = self.queues[stage]
+        metrics = self.stage_metrics[stage]
+        while True:
+            event = await queue.get()
+            started = time.perf_counter()
+            try:
+                await handler(event)
+            except Exception as e:
+                metrics.errors += 1
+                self.logger.error(f"Pipeline stage {stage} error: {e}", extra={'stage': stage})
+            finally:
+                metrics.record(started - event['enqueued_at'], time.perf_counter() - started)
+                queue.task_done()
+
+    async def _feed_loop(self):
+        """Piyasa verisini çek ve analiz kuyruğuna aktar"""
+        metrics = self.stage_metrics['feed']
+        while self.running:
+            started = time.perf_counter()
+            try:
+                ohlcv, orderbook = await self.run_blocking(self._fetch_market_data)
+                metrics.record(0.0, time.perf_counter() - started)
+                self.supervisor.on_feed()
+                await self._publish('analysis', {
+                    'ohlcv': ohlcv,
+                    'orderbook': orderbook,
+                    'received_at': datetime.now()
+                })
+            except Exception as e:
+                metrics.errors += 1
+                self.logger.error(f"Feed error: {e}")
+
+            elapsed = time.perf_counter() - started
+            await asyncio.sleep(max(0.0, self.config['poll_interval'] - elapsed))
+
+    def _fetch_market_data(self):
+        ohlcv = self.market_analyzer.fetch_ohlcv()
+        orderbook = self.exchange.fetch_order_book(TRADING_CONFIG['symbol'])
+        return ohlcv, orderbook
+
+    async def _analyze(self, event):
+        """İndikatörleri güncelle ve sinyal üret"""
+        self.order_book.update(event['orderbook'])
+        self.depth_history.record_book(self.order_book)
+        mid_price = self.order_book.mid_price()
+        if mid_price:
+            self.portfolio.on_tick(TRADING_CONFIG['symbol'], mid_price)
+            self.execution_quality.on_price(mid_price)
+            if self.trailing_stops.on_price(TRADING_CONFIG['symbol'], mid_price):
+                await self.run_blocking(self.trailing_stops.flush)
+        await self.run_blocking(self.market_analyzer.process_ohlcv, event['ohlcv'])
+        self._maybe_persist()
+
+        signals = self.market_analyzer.current_signals
+        price = self.market_analyzer.price_data['close'].iloc[-1]
+
+        if self.market_analyzer.should_entry():
+            # Aynı yönde tekrar emir gönderme
+            current = self.pending_direction or self.order_manager.last_signal
+            # Güvenli modda (bayat feed) yeni giriş yapılmaz, çıkışlar devam eder
+            if signals['direction'] != current and not self.supervisor.safe_mode:
+                self.pending_direction = signals['direction']
+                await self._publish('risk', {
+                    'action': 'entry',
+                    'direction': signals['direction'],
+                    'price': price,
+                    'strength': signals['strength'],
+                    'signal_at': time.perf_counter()
+                })
+        elif (self.market_analyzer.should_exit() and self.order_manager.last_signal
+              and self.pending_direction is None):
+            self.pending_direction = 'exit'
+            await self._publish('orders', {
+                'action': 'exit',
+                'price': price,
+                'signal_at': time.perf_counter()
+            })
+
+    async def _check_risk(self, event):
+        """Risk kurallarından geçen sinyali emir kuyruğuna aktar"""
+        # I/O yok, önceden hesaplanmış limitler ve güncel portföy durumuyla kontrol
+        side = 'buy' if event['direction'] == 'long' else 'sell'
+        # Kontrol edilen miktar emir aşamasına aynen taşınır, place_orders yeniden hesaplamaz
+        amount = self.order_manager.calculate_position_size(self.risk_manager.free_balance)
+        if not self.risk_manager.check_order(TRADING_CONFIG['symbol'], side, amount, event['price']):
+            self.pending_direction = None
+            return
+        event['amount'] = amount
+        await self._publish('orders', event)
+
+    async def _execute(self, event):
+        """Emirleri yerleştir"""
+        try:
+            if event['action'] == 'entry':
+                placed = await self.run_blocking(
+                    self.order_manager.place_orders, event['direction'], event['price'], event['amount']
+                )
+                if placed:
+                    self.order_manager.last_signal = event['direction']
+                    self.trader.last_order_time = datetime.now()
+                    self.logger.info(
+                        f"Entry executed: {event['direction']}",
+                        extra={
+                            'direction': event['direction'],
+                            'price': event['price'],
+                            'latency_ms': (time.perf_counter() - event['signal_at']) * 1000
+                        }
+                    )
+                    if self.telegram:
+                        self.telegram.notify_fill(
+                            f"✅ {event['direction'].upper()} giriş emri @ {event['price']:.1f}"
+                        )
+            elif event['action'] == 'cancel':
+                await self.run_blocking(self.order_manager.cancel_all_orders)
+            else:
+                await self.run_blocking(self.order_manager.cancel_all_orders)
+                await self.run_blocking(self.trader.close_position)
+                self.order_manager.last_signal = None
+                self.trader.last_order_time = datetime.now()
+                self.logger.info(
+                    "Position closed",
+                    extra={'latency_ms': (time.perf_counter() - event['signal_at']) * 1000}
+                )
+                if self.telegram:
+                    self.telegram.notify_fill("🔒 Pozisyon kapatıldı")
+        finally:
+            # Hata olsa da bekleyen yön serbest kalsın, yoksa sonraki sinyaller bastırılır
+            if event['action'] != 'cancel':
+                self.pending_direction = None
+
+    async def _monitor_loop(self):
+        """SystemMonitor turlarını ayrı thread açmadan çalıştır"""
+        while self.running:
+            self.supervisor.check_feed()
+            try:
+                await self.run_blocking(self.monitor.run_once)
+            except Exception as e:
+                self.logger.error(f"Monitoring error: {e}")
+            await asyncio.sleep(self.config['monitor_interval'])
+
+    def _on_connection_event(self, event):
+        """Devre kesici ve güvenli mod geçişlerini bildir"""
+        if not self.telegram:
+            return
+        if event['type'] == 'safe_mode_on':
+            self.telegram.alert(f"⚠️ Feed {event['feed_age']:.0f}s gecikti, güvenli mod: yeni giriş yok")
+        elif event['type'] == 'safe_mode_off':
+            self.telegram.alert("✅ Feed normale döndü, güvenli mod kapandı")
+        elif event['type'] == 'breaker_open':
+            self.telegram.alert(f"🔌 {event['endpoint']} devre kesici açıldı: {event['error']}", key='breaker')
+
+    async def _balance_loop(self):
+        """Risk motorunun bakiye ve kaldıraç bilgisini emir yolunun dışında tazele"""
+        while self.running:
+            try:
+                await self.run_blocking(self._refresh_account)
+            except Exception as e:
+                self.logger.error(f"Balance refresh error: {e}")
+            await asyncio.sleep(self.config['balance_refresh_interval'])
+
+    def _refresh_account(self):
+        """Bakiye ve kaldıraç; düşük öncelikli, emir bütçesine dokunmaz"""
+        with self.rate_limits.priority(PRIORITY_LOW):
+            self.risk_manager.refresh_balance()
+            self.risk_manager.refresh_leverage(TRADING_CONFIG['symbol'])
+
+    async def _reconcile_loop(self):
+        """Açık emir, pozisyon ve dolumları toplu çekip yerel modelle uzlaştır"""
+        while self.running:
+            try:
+                if await self.run_blocking(self.reconciler.run_once):
+                    self._seed_fill_ledger()
+                await self.run_blocking(self.execution_quality.flush)
+            except Exception as e:
+                self.logger.error(f"Reconciliation loop error: {e}")
+            await asyncio.sleep(RECONCILIATION_CONFIG['interval'])
+
+    async def _calibration_loop(self):
+        """İşlem geçmişinden Monte Carlo ile risk limitlerini periyodik kalibre et"""
+        while self.running:
+            try:
+                await self.run_blocking(self._calibrate_risk_limits)
+            except Exception as e:
+                self.logger.error(f"Risk calibration error: {e}")
+            await asyncio.sleep(MONTE_CARLO_CONFIG['interval'])
+
+    async def _report_loop(self):
+        """Periyodik işlem analizi grafiğini Telegram'a gönder"""
+        interval = TELEGRAM_CONFIG['report_interval']
+        while self.running:
+            await asyncio.sleep(interval)
+            try:
+                since = datetime.now(timezone.utc) - timedelta(seconds=interval)
+                await self.run_blocking(self.telegram.send_analysis_report, since)
+            except Exception as e:
+                self.logger.error(f"Analysis report error: {e}")
+
+    def _calibrate_risk_limits(self):
+        """Geçmişi yükle, simüle et, önerileri logla veya uygula (executor'da)"""
+        if not self.risk_manager.initial_balance:
+            return None
+        # Getiriler hesap sermayesine göre, sabit PERFORMANCE_CONFIG değerine göre değil
+        self.performance.set_starting_equity(self.risk_manager.initial_balance)
+        self.performance.load_trades(self.trade_store.get_trade_history())
+        count = self.performance.count
+        if not count:
+            return None
+        # Günlük işlem sayısı geçmişin kapsadığı süreden tahmin edilir
+        span_days = (self.performance.timestamps[count - 1] - self.performance.timestamps[0]) / 86400
+        # Emir boyutu AdvancedOrderManager'ın config'inden gelir, öneri de ona uygulanır
+        sizing = self.order_manager.config
+        result = self.monte_carlo.run(
+            self.performance.returns[:count],
+            trades_per_day=count / span_days if span_days >= 1 else None,
+            current_limits={'POSITION_SIZE_PERCENT': sizing['position_size_percent']}
+        )
+        if result is None:
+            return None
+
+        recommended = result['recommended_limits']
+        self.logger.info(
+            "Monte Carlo risk limits",
+            extra={
+                'drawdown_p95': result['drawdown']['p95'],
+                'ruin_probability': result['scales'][1.0]['ruin_probability'],
+                **{name: value for name, value in recommended.items() if name.isupper()}
+            }
+        )
+        if MONTE_CARLO_CONFIG['apply_limits']:
+            applied = self.risk_manager.apply_recommended_limits(
+                recommended, tighten_only=MONTE_CARLO_CONFIG['tighten_only'], sizing_config=sizing
+            )
+            if applied and self.telegram:
+                self.telegram.alert(
+                    "🎲 Risk limitleri güncellendi: " + ", ".join(
+                        f"{name} {old:g} → {new:g}" for name, (old, new) in applied.items()
+                    )
+                )
+        return result
+
+    def _seed_fill_ledger(self):
+        """İlk başarılı uzlaştırmadan sonra açık pozisyonu dolum defterine yükle"""
+        if not self.fill_ledger.seeded:
+            self.fill_ledger.seed(self.reconciler.get_position())
+
+    def _on_reconciliation(self, kind, payload):
+        """Pozisyon düzeltmesi ve dolumlar risk motorlarına event loop üzerinden uygulanır"""
+        if kind == 'position':
+            self._call_in_loop(self.portfolio.on_positions, payload['positions'])
+        elif kind == 'fill' and self.fill_ledger.seeded:
+            # Seed öncesi dolumlar zaten yüklenen pozisyona dahil
+            fill = self.fill_ledger.apply(payload)
+            if fill:
+                self._call_in_loop(self.risk_manager.on_fill, fill)
+            if fill and fill['position']:
+                # Reconciler executor'da çalışır, yazım event loop'u bloklamaz
+                self.trade_store.record_position(TRADING_CONFIG['symbol'], **fill['position'])
+
+    def _call_in_loop(self, callback, *args):
+        """Reconciler thread'inden gelen güncellemeyi event loop'a aktar"""
+        if self.loop:
+            self.loop.call_soon_threadsafe(callback, *args)
+        else:
+            callback(*args)
+
+    def _collect_state(self):
+        """Telegram / dashboard okuyucuları için durum parçalarını topla"""
+        with self.rate_limits.priority(PRIORITY_LOW):
+            position = self.trader.get_position()
+        risk = self.risk_manager
+        return {
+            'position': position,
+            'balance': {
+                'total': risk.balance,
+                'free': risk.free_balance,
+                'used': risk.balance - risk.free_balance
+            },
+            'risk_metrics': risk.get_risk_metrics(position, fetch_position=False),
+            'signals': self.market_analyzer.get_signal_summary(),
+            'market': {
+                'price': self.order_book.mid_price(),
+                'best_bid': self.order_book.best_bid(),
+                'best_ask': self.order_book.best_ask()
+            },
+            'chart': self._chart_state(),
+            'order_book': self.order_book.get_current_state()
+        }
+
+    def _chart_state(self):
+        """Dashboard grafikleri için son mumlar ve SuperTrend bantları"""
+        df = self.market_analyzer.price_data.tail(DASHBOARD_CONFIG['chart_bars'])
+        if df.empty:
+            return None
+
+        chart = {
+            'time': df.index.strftime('%Y-%m-%dT%H:%M:%S').tolist(),
+            'open': df['open'].tolist(),
+            'high': df['high'].tolist(),
+            'low': df['low'].tolist(),
+            'close': df['close'].tolist()
+        }
+        bands = self.market_analyzer.calculate_supertrend()
+        if bands is not None:
+            bands = bands.tail(len(df))
+            chart['upperband'] = bands['upperband'].tolist()
+            chart['lowerband'] = bands['lowerband'].tolist()
+            chart['in_uptrend'] = bands['in_uptrend'].astype(float).tolist()
+        return chart
+
+    def _refresh_state(self):
+        snapshot = self.state.refresh()
+        if self.state_publisher:
+            self.state_publisher.publish(snapshot)
+
+    async def _snapshot_loop(self):
+        """Durum snapshot'ını emir yolunun dışında periyodik yayınla"""
+        while self.running:
+            await self.run_blocking(self._refresh_state)
+            await asyncio.sleep(self.config['snapshot_interval'])
+
+    def submit_action(self, action):
+        """
+        Dış kontrol (API) isteğini emir kuyruğuna koy, herhangi bir thread'den çağrılabilir
+
+        Args:
+            action: 'exit' (pozisyonu kapat) veya 'cancel' (emirleri iptal et)
+
+        Returns:
+            concurrent.futures.Future
+        """
+        if action == 'exit':
+            self.pending_direction = 'exit'
+        event = {'action': action, 'price': None, 'signal_at': time.perf_counter()}
+        return asyncio.run_coroutine_threadsafe(self._publish('orders', event), self.loop)
+
+    def get_pipeline_metrics(self):
+        """Aşama bazında kuyruk derinliği ve gecikme"""
+        return {stage: metrics.snapshot() for stage, metrics in self.stage_metrics.items()}
+
+    async def _start_telegram(self):
+        if not TELEGRAM_CONFIG['use_telegram'] or not TELEGRAM_CONFIG['token']:
+            return
+        from telegram_bot import TelegramBot
+
+        self.telegram = TelegramBot()
+        await self.telegram.initialize(
+            TELEGRAM_CONFIG['token'],
+            TELEGRAM_CONFIG['chat_id'],
+            self.market_analyzer,
+            self.trader,
+            self.risk_manager,
+            state_store=self.state,
+            max_age=self.config['snapshot_max_age'],
+            config=TELEGRAM_CONFIG,
+            trade_analyzer=self.trade_analyzer
+        )
+
+    def _start_dashboard(self):
+        if not self.config['enable_dashboard']:
+            return
+        if DASHBOARD_CONFIG['mode'] == 'external':
+            # Dashboard ayrı süreçte (dashboard_server.py), durum bus üzerinden gider
+            from state_bus import Serializer, StatePublisher, create_state_bus
+
+            self.state_publisher = StatePublisher(
+                create_state_bus(STATE_BUS_CONFIG), Serializer(STATE_BUS_CONFIG['serializer'])
+            )
+            self.logger.info(f"Publishing state to {STATE_BUS_CONFIG['backend']} bus")
+            return
+        from visualization import DashboardVisualizer, create_dashboard_app
+
+        visualizer = DashboardVisualizer(self.state, self.depth_history)
+        app = create_dashboard_app(visualizer)
+        self.dashboard_thread = threading.Thread(
+            target=app.run,
+            kwargs={
+                'host': DASHBOARD_CONFIG['host'],
+                'port': DASHBOARD_CONFIG['port'],
+                'debug': DASHBOARD_CONFIG['debug']
+            },
+            daemon=True
+        )
+        self.dashboard_thread.start()
+
+    def _start_api(self):
+        if not API_SERVER_CONFIG['enabled']:
+            return
+        from api_server import start_api_server
+
+        self.api_server = start_api_server(self, API_SERVER_CONFIG)
+
+    async def run(self):
+        """Pipeline'ı başlat ve durdurulana kadar çalıştır"""
+        self.running = True
+        self.stop_event = asyncio.Event()
+        self.loop = asyncio.get_running_loop()
+
+        queue_size = self.config['queue_size']
+        self.queues = {
+            stage: asyncio.Queue(maxsize=queue_size)
+            for stage in ('analysis', 'risk', 'orders')
+        }
+        self.stage_metrics = {'feed': StageMetrics('feed')}
+        self.stage_metrics.update({
+            stage: StageMetrics(stage, queue) for stage, queue in self.queues.items()
+        })
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except NotImplementedError:
+                pass
+
+        try:
+            await self._start_telegram()
+        except Exception as e:
+            self.logger.error(f"Telegram start error: {e}")
+        self._start_dashboard()
+        try:
+            self._start_api()
+        except Exception as e:
+            self.logger.error(f"API server start error: {e}")
+
+        self.tasks = [
+            asyncio.create_task(self._feed_loop()),
+            asyncio.create_task(self._run_stage('analysis', self._analyze)),
+            asyncio.create_task(self._run_stage('risk', self._check_risk)),
+            asyncio.create_task(self._run_stage('orders', self._execute)),
+            asyncio.create_task(self._monitor_loop()),
+            asyncio.create_task(self._balance_loop()),
+            asyncio.create_task(self._reconcile_loop()),
+            asyncio.create_task(self._snapshot_loop()),
+            asyncio.create_task(self.execution.wheel.run())
+        ]
+        if MONTE_CARLO_CONFIG['enabled']:
+            self.tasks.append(asyncio.create_task(self._calibration_loop()))
+        if self.telegram and TELEGRAM_CONFIG['report_interval']:
+            self.tasks.append(asyncio.create_task(self._report_loop()))
+        self.logger.info("Trading pipeline started")
+
+        await self.stop_event.wait()
+        await self.shutdown()
+
+    def stop(self):
+        """Durdurma isteği"""
+        self.running = False
+        if self.stop_event:
+            self.stop_event.set()
+
+    async def shutdown(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+        # Son durumu kaydet, sonraki başlatma buradan devam eder
+        if self.persist_task:
+            await asyncio.gather(self.persist_task, return_exceptions=True)
+        self.persistence.save(self._export_state())
+        self.execution_quality.flush()
+        self.trade_store.close()
+
+        if self.telegram:
+            await self.telegram.stop()
+        if self.api_server:
+            self.api_server.should_exit = True
+        self.executor.shutdown(wait=False)
+        self.logger.info("Trading pipeline stopped")
+
+
+def main():
+    setup_logging(
+        SYSTEM_CONFIG['log_dir'],
+        getattr(logging, SYSTEM_CONFIG['log_level'], logging.INFO),
+        json_format=SYSTEM_CONFIG['log_json'],
+        sampling=SYSTEM_CONFIG['log_sampling']
+    )
+    asyncio.run(TradingOrchestrator().run())
+
+
+if __name__ == "__main__":
+    main()
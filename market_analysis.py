@@ -3,8 +3,11 @@
 from datetime import datetime
 import pandas as pd
 import numpy as np
-import talib
 import logging
+from candle_aggregator import CandleAggregator, BASE_TIMEFRAME, BASE_MS, timeframe_to_ms
+from strategy_manager import StrategyManager, indicator
+from indicator_cache import IndicatorCache
+import indicators
 
 class MarketAnalyzer:
    def __init__(self, exchange, order_book_manager, config):
@@ -20,150 +23,180 @@ class MarketAnalyzer:
            'direction': None,
            'strength': 0
        }
+       self.data_version = None
+
+       # Üst zaman dilimleri 1m akışından türetilir, ek REST çağrısı yok
+       self.candles = CandleAggregator(
+           config.get('timeframes', [BASE_TIMEFRAME]),
+           capacity=config.get('candle_capacity', 500)
+       )
+       self.timeframe_signals = {}
+       # Soğuk başlangıçta en büyük zaman dilimi için atr_period'dan fazla
+       # kapanmış mum gerekir (1h ve atr 7 ile ~9 saatlik 1m mum)
+       largest = max(timeframe_to_ms(timeframe) for timeframe in self.candles.timeframes) // BASE_MS
+       self.history_bars = max(config.get('candle_capacity', 500), largest * (config['atr_period'] + 2))
+
+       # Dashboard, Telegram, monitor ve emir yolu aynı mumda önbellekten okur
+       self.indicator_cache = IndicatorCache(
+           max_entries=config.get('indicator_cache_entries', 512),
+           max_bytes=config.get('indicator_cache_mb', 64) * 1024 * 1024
+       )
+
+       # SuperTrend, Renko ve sinyal gücü strateji motorunda tanımlı
+       self.strategy_manager = StrategyManager.from_config(config, self.indicator_cache)
+       self.supertrend_key = indicator(
+           'supertrend',
+           period=config['atr_period'],
+           multiplier=config['atr_multiplier']
+       )
+       for timeframe in self.candles.timeframes:
+           if timeframe != BASE_TIMEFRAME:
+               self.candles.subscribe(timeframe, self._on_timeframe_close)
 
    def update_data(self):
        """Fiyat verilerini güncelle"""
        try:
-           ohlcv = self.exchange.fetch_ohlcv(
-               symbol='XBTUSDT',
-               timeframe='1m', 
-               limit=100
-           )
-           
-           df = pd.DataFrame(
-               ohlcv,
-               columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']
-           )
-           df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-           df.set_index('timestamp', inplace=True)
-           
-           self.price_data = df
-           self.calculate_indicators()
-           return True
+           return self.process_ohlcv(self.fetch_ohlcv())
            
        except Exception as e:
            self.logger.error(f"Data update error: {e}")
            return False
 
+   def fetch_ohlcv(self):
+       """Eksik 1m mumları exchange'den çek"""
+       # İlk çağrıda geçmişi doldur, sonrasında sadece eksik mumları çek
+       missing = self._missing_bars()
+       page = self.config.get('ohlcv_page_limit', 1000)
+       if missing <= page:
+           return self.exchange.fetch_ohlcv(
+               symbol='XBTUSDT',
+               timeframe=BASE_TIMEFRAME,
+               limit=missing
+           )
+
+       # Tek istek sınırını aşan geçmiş sayfalanarak eskiden yeniye çekilir
+       now = int(datetime.now().timestamp() * 1000)
+       since = now - now % BASE_MS - (missing - 1) * BASE_MS
+       ohlcv = []
+       while since <= now:
+           batch = self.exchange.fetch_ohlcv(
+               symbol='XBTUSDT',
+               timeframe=BASE_TIMEFRAME,
+               since=since,
+               limit=page
+           )
+           if not batch:
+               break
+           ohlcv.extend(batch)
+           since = int(batch[-1][0]) + BASE_MS
+           if len(batch) < page:
+               break
+       return ohlcv
+
+   def process_ohlcv(self, ohlcv):
+       """Çekilen mumları işle ve indikatörleri güncelle"""
+       self.candles.ingest_ohlcv(ohlcv)
+       
+       self.price_data = self.candles.to_frame(BASE_TIMEFRAME, include_partial=True)
+       self.calculate_indicators()
+       return True
+
    def create_renko(self):
        """Renko mumları oluştur"""
        if self.price_data.empty:
            return
            
        brick_size = self.config['renko_brick_size']
-       renko_prices = []
-       current_brick = self.price_data['close'].iloc[0]
+       source, closes, directions = indicators.renko(
+           self.price_data['close'].to_numpy(dtype=np.float64),
+           brick_size
+       )
+       
+       # Yukarı tuğlanın açılışı bir tuğla aşağıda, aşağı tuğlanınki bir tuğla yukarıda
+       opens = closes - directions.astype(np.float64) * brick_size
+       renko_prices = {
+           'timestamp': self.price_data.index[source],
+           'open': opens,
+           'high': np.maximum(opens, closes),
+           'low': np.minimum(opens, closes),
+           'close': closes,
+           'direction': directions
+       }
        
-       for idx, row in self.price_data.iterrows():
-           price = row['close']
-           
-           # Yukarı hareket
-           while price >= current_brick + brick_size:
-               current_brick += brick_size
-               renko_prices.append({
-                   'timestamp': idx,
-                   'open': current_brick - brick_size,
-                   'high': current_brick,
-                   'low': current_brick - brick_size,
-                   'close': current_brick,
-                   'direction': 1
-               })
-               
-           # Aşağı hareket
-           while price <= current_brick - brick_size:
-               current_brick -= brick_size
-               renko_prices.append({
-                   'timestamp': idx,
-                   'open': current_brick + brick_size,
-                   'high': current_brick + brick_size,
-                   'low': current_brick,
-                   'close': current_brick,
-                   'direction': -1  
-               })
-               
        self.renko_data = pd.DataFrame(renko_prices)
 
+   def _missing_bars(self):
+       """Son işlenen mumdan bu yana kaç 1m mum çekilmesi gerektiğini bul"""
+       history = self.history_bars
+       pending = self.candles.pending
+       if pending is None:
+           return history
+       elapsed = datetime.now().timestamp() * 1000 - pending[0]
+       return int(min(history, max(2, elapsed // 60000 + 2)))
+
+   def on_trade(self, timestamp, price, amount):
+       """Trade akışından gelen işlemi mum toplayıcıya ilet"""
+       self.candles.add_trade(timestamp, price, amount)
+
+   def _on_timeframe_close(self, timeframe, bar):
+       """Üst zaman dilimi mumu kapandığında o dilimin sinyallerini güncelle"""
+       df = self.candles.to_frame(timeframe)
+       if len(df) <= self.config['atr_period']:
+           return
+       self.timeframe_signals[timeframe] = self._compute_signals(
+           df, timeframe, self.candles.version
+       )
+
+   def get_timeframe_signal(self, timeframe):
+       """Zaman dilimine ait son sinyal"""
+       if timeframe == BASE_TIMEFRAME:
+           return self.current_signals
+       return self.timeframe_signals.get(timeframe)
+
    def calculate_indicators(self):
        """İndikatörleri hesapla"""
-       df = self.price_data
-       
-       # ATR hesapla
-       df['atr'] = talib.ATR(
-           df['high'].values,
-           df['low'].values,
-           df['close'].values,
-           timeperiod=self.config['atr_period']
-       )
-       
-       # SuperTrend bantlarını hesapla
-       df['upperband'] = ((df['high'] + df['low']) / 2) + (
-           self.config['atr_multiplier'] * df['atr']
-       )
-       df['lowerband'] = ((df['high'] + df['low']) / 2) - (
-           self.config['atr_multiplier'] * df['atr']
+       self.data_version = self.candles.version
+       self.current_signals = self._compute_signals(
+           self.price_data, BASE_TIMEFRAME, self.data_version
        )
-       
-       # Trend yönünü hesapla
-       df['in_uptrend'] = True
-       
-       for i in range(1, len(df)):
-           curr_close = df['close'].iloc[i]
-           curr_upper = df['upperband'].iloc[i]
-           curr_lower = df['lowerband'].iloc[i]
-           prev_close = df['close'].iloc[i-1]
-           prev_upper = df['upperband'].iloc[i-1]
-           prev_lower = df['lowerband'].iloc[i-1]
-           prev_trend = df['in_uptrend'].iloc[i-1]
-           
-           if prev_trend:
-               if curr_close < curr_lower:
-                   df.loc[df.index[i], 'in_uptrend'] = False
-               else:
-                   df.loc[df.index[i], 'in_uptrend'] = True
-           else:
-               if curr_close > curr_upper:
-                   df.loc[df.index[i], 'in_uptrend'] = True
-               else:
-                   df.loc[df.index[i], 'in_uptrend'] = False
-                   
-       # Sinyal gücü hesapla
-       df['signal_strength'] = self.calculate_signal_strength(df)
-       
-       # Son durumu kaydet
-       last_row = df.iloc[-1]
-       self.current_signals = {
-           'supertrend': last_row['in_uptrend'],
-           'direction': 'long' if last_row['in_uptrend'] else 'short',
-           'strength': last_row['signal_strength']
-       }
 
-   def calculate_signal_strength(self, df):
-       """Sinyal gücü hesapla"""
-       strength = pd.Series(index=df.index, data=0)
-       
-       # Trend süresi (0-40 puan)
-       trend_duration = df['in_uptrend'].groupby(
-           (df['in_uptrend'] != df['in_uptrend'].shift()).cumsum()
-       ).cumcount()
-       strength += np.minimum(trend_duration * 2, 40)
-       
-       # Hacim desteği (0-30 puan)
-       volume_ma = df['volume'].rolling(20).mean()
-       strength += np.where(
-           df['volume'] > volume_ma,
-           30,
-           (df['volume'] / volume_ma) * 30
+   def calculate_supertrend(self, timeframe=BASE_TIMEFRAME):
+       """SuperTrend bantlarını önbellekten getir, sadece yeni veride hesapla"""
+       if timeframe == BASE_TIMEFRAME:
+           df, version = self.price_data, self.data_version
+       else:
+           df, version = self.candles.to_frame(timeframe), self.candles.version
+       if df.empty:
+           return None
+
+       upperband, lowerband, in_uptrend = self.indicator_cache.get_or_compute(
+           self.indicator_cache.make_key(
+               self.strategy_manager.symbol, timeframe, version, self.supertrend_key
+           ),
+           lambda: self.strategy_manager.compute_indicators(df)[self.supertrend_key]
        )
-       
-       # Fiyat momentum (0-30 puan)
-       roc = talib.ROC(df['close'], timeperiod=10)
-       strength += np.where(
-           (df['in_uptrend'] & (roc > 0)) | (~df['in_uptrend'] & (roc < 0)),
-           30,
-           0
+       return pd.DataFrame({
+           'upperband': upperband,
+           'lowerband': lowerband,
+           'in_uptrend': in_uptrend
+       }, index=df.index)
+
+   def _compute_signals(self, df, timeframe=BASE_TIMEFRAME, version=None):
+       """Verilen mum serisi için stratejileri ortak indikatörlerle çalıştır"""
+       signals = self.strategy_manager.run(df, timeframe, version)
+
+       # SuperTrend bantlarını grafikler için veri setine yaz
+       upperband, lowerband, in_uptrend = self.strategy_manager.get_indicator(
+           self.supertrend_key, timeframe
        )
-       
-       return strength
+       df['upperband'] = upperband
+       df['lowerband'] = lowerband
+       df['in_uptrend'] = in_uptrend
+
+       signal = signals.get('SuperTrend')
+       if signal is None:
+           return self.strategy_manager.strategies['SuperTrend'].neutral_signal()
+       return signal
 
    def should_entry(self):
        """Giriş sinyali kontrol"""
@@ -179,6 +212,68 @@ class MarketAnalyzer:
            abs(self.ob_manager.get_imbalance()) <= -0.2
        )
 
+   def get_entry_conditions(self):
+       """Giriş sinyalinin gerekçeleri"""
+       strength = self.current_signals['strength']
+       imbalance = self.ob_manager.get_imbalance()
+       reasons = []
+       
+       if self.current_signals['direction']:
+           reasons.append(f"SuperTrend {self.current_signals['direction']}")
+       if strength >= 80:
+           reasons.append(f"Sinyal gücü {strength:.0f}")
+       if abs(imbalance) >= 0.2:
+           reasons.append(f"OrderBook dengesizliği {imbalance:.2f}")
+           
+       return {
+           'strength': strength,
+           'imbalance': imbalance,
+           'reasons': reasons
+       }
+
+   def get_signal_summary(self):
+       """Telegram / snapshot için sinyal özeti"""
+       if self.price_data.empty or self.current_signals['direction'] is None:
+           return None
+
+       close = self.price_data['close'].to_numpy(dtype=np.float64)
+       volume = self.price_data['volume'].to_numpy(dtype=np.float64)
+       period = self.config['atr_period']
+       atr_values = self.strategy_manager.get_indicator(indicator('atr', period=period))
+       volume_ma = volume[-20:].mean()
+
+       return {
+           'trend': 'Yükseliş' if self.current_signals['direction'] == 'long' else 'Düşüş',
+           'direction': self.current_signals['direction'],
+           'strength': float(self.current_signals['strength']),
+           'rsi': float(np.nan_to_num(indicators.rsi(close)[-1], nan=50.0)),
+           'volatility': float(atr_values[-1] / close[-1] * 100) if atr_values is not None else 0.0,
+           'volume_factor': float(volume[-1] / volume_ma) if volume_ma else 0.0,
+           # Üst zaman dilimi sinyalleri, henüz yeterli mum yoksa None
+           'timeframes': {
+               timeframe: self.get_timeframe_signal(timeframe)
+               for timeframe in self.candles.timeframes if timeframe != BASE_TIMEFRAME
+           }
+       }
+
+   def export_state(self):
+       """Warm-start için mumlar ve sinyaller"""
+       return {
+           'candles': self.candles.export_state(),
+           'current_signals': dict(self.current_signals),
+           'timeframe_signals': dict(self.timeframe_signals)
+       }
+
+   def restore_state(self, state):
+       """Kayıtlı mumları yükle, indikatörleri mumlardan yeniden hesapla"""
+       self.candles.restore_state(state['candles'])
+       self.timeframe_signals = dict(state['timeframe_signals'])
+       self.price_data = self.candles.to_frame(BASE_TIMEFRAME, include_partial=True)
+       if len(self.price_data) > self.config['atr_period']:
+           self.calculate_indicators()
+       else:
+           self.current_signals = dict(state['current_signals'])
+
    def get_market_state(self):
        """Piyasa durumu bilgisi"""
        return {
@@ -41,7 +41,6 @@ class SystemMonitor:
         
         self.monitor_thread = None
         self.last_check = datetime.now()
-        self.alert_sent = False
 
     def start_monitoring(self):
         """Monitoring thread'ini başlat"""
@@ -62,27 +61,30 @@ class SystemMonitor:
         """Ana monitoring döngüsü"""
         while self.running:
             try:
-                # Sistem metriklerini topla
-                self._collect_system_metrics()
-                
-                # Trading metriklerini topla
-                self._collect_trading_metrics()
-                
-                # Metrikleri analiz et
-                self._analyze_metrics()
-                
-                # Eski verileri temizle (24 saatten eski)
-                self._cleanup_old_data()
-                
-                # Loglama ve uyarılar
-                self._check_alerts()
-                
+                self.run_once()
                 time.sleep(5)  # 5 saniye bekle
                 
             except Exception as e:
                 self.logger.error(f"Monitoring error: {e}")
                 time.sleep(10)
 
+    def run_once(self):
+        """Tek monitoring turu, orkestratör tarafından da çağrılır"""
+        # Sistem metriklerini topla
+        self._collect_system_metrics()
+        
+        # Trading metriklerini topla
+        self._collect_trading_metrics()
+        
+        # Metrikleri analiz et
+        self._analyze_metrics()
+        
+        # Eski verileri temizle (24 saatten eski)
+        self._cleanup_old_data()
+        
+        # Loglama ve uyarılar
+        self._check_alerts()
+
     def _collect_system_metrics(self):
         """Sistem metriklerini topla"""
         try:
@@ -125,10 +127,8 @@ class SystemMonitor:
         try:
             timestamp = datetime.now()
             
-            # Sinyal hesaplama süresi
-            start_time = time.time()
-            self.bot.strategy_manager.get_signals('SuperTrend', [])
-            signal_time = time.time() - start_time
+            # Sinyal hesaplama süresi (son gerçek çalıştırmanın ölçümü, yeniden hesaplama yok)
+            signal_time = self.bot.strategy_manager.last_run_duration
             
             self.trading_metrics['signal_latency'].append({
                 'timestamp': timestamp,
@@ -136,7 +136,7 @@ class SystemMonitor:
             })
             
             # WebSocket gecikmesi
-            if hasattr(self.bot.ws, 'last_message_time'):
+            if getattr(self.bot.ws, 'last_message_time', None):
                 ws_latency = (datetime.now() - self.bot.ws.last_message_time).total_seconds()
                 self.trading_metrics['websocket_latency'].append({
                     'timestamp': timestamp,
@@ -144,7 +144,7 @@ class SystemMonitor:
                 })
             
             # Order execution zamanları
-            if hasattr(self.bot.trader, 'last_order_time'):
+            if getattr(self.bot.trader, 'last_order_time', None):
                 order_latency = (datetime.now() - self.bot.trader.last_order_time).total_seconds()
                 self.trading_metrics['order_latency'].append({
                     'timestamp': timestamp,
@@ -166,7 +166,7 @@ class SystemMonitor:
             if recent_cpu:
                 avg_cpu = sum(recent_cpu) / len(recent_cpu)
                 if avg_cpu > self.alert_thresholds['cpu_usage']:
-                    self._send_alert(f"High CPU usage: {avg_cpu:.1f}%")
+                    self._send_alert(f"High CPU usage: {avg_cpu:.1f}%", 'cpu_usage')
             
             # Memory kullanım analizi
             recent_memory = [m['value'] for m in self.system_metrics['memory_usage'] 
@@ -174,7 +174,7 @@ class SystemMonitor:
             if recent_memory:
                 avg_memory = sum(recent_memory) / len(recent_memory)
                 if avg_memory > self.alert_thresholds['memory_usage']:
-                    self._send_alert(f"High memory usage: {avg_memory:.1f}%")
+                    self._send_alert(f"High memory usage: {avg_memory:.1f}%", 'memory_usage')
             
             # WebSocket gecikme analizi
             recent_ws = [m['value'] for m in self.trading_metrics['websocket_latency'] 
@@ -182,7 +182,7 @@ class SystemMonitor:
             if recent_ws:
                 avg_ws = sum(recent_ws) / len(recent_ws)
                 if avg_ws > self.alert_thresholds['websocket_latency']:
-                    self._send_alert(f"High WebSocket latency: {avg_ws*1000:.0f}ms")
+                    self._send_alert(f"High WebSocket latency: {avg_ws*1000:.0f}ms", 'websocket_latency')
             
         except Exception as e:
             self.logger.error(f"Metrics analysis error: {e}")
@@ -226,46 +226,53 @@ class SystemMonitor:
             alerts = []
             
             if cpu_percent > self.alert_thresholds['cpu_usage']:
-                alerts.append(f"CPU usage is high: {cpu_percent}%")
+                alerts.append(('cpu_usage', f"CPU usage is high: {cpu_percent}%"))
             
             if memory_percent > self.alert_thresholds['memory_usage']:
-                alerts.append(f"Memory usage is high: {memory_percent}%")
+                alerts.append(('memory_usage', f"Memory usage is high: {memory_percent}%"))
             
             if disk_percent > self.alert_thresholds['disk_usage']:
-                alerts.append(f"Disk usage is high: {disk_percent}%")
+                alerts.append(('disk_usage', f"Disk usage is high: {disk_percent}%"))
             
             # Trading metriklerini kontrol et
-            if hasattr(self.bot.ws, 'last_message_time'):
+            if getattr(self.bot.ws, 'last_message_time', None):
                 ws_delay = (datetime.now() - self.bot.ws.last_message_time).total_seconds()
                 if ws_delay > self.alert_thresholds['websocket_latency']:
-                    alerts.append(f"WebSocket delay is high: {ws_delay*1000:.0f}ms")
+                    alerts.append(('websocket_latency', f"WebSocket delay is high: {ws_delay*1000:.0f}ms"))
             
-            # Uyarıları gönder
-            if alerts and not self.alert_sent:
-                alert_message = "\n".join(alerts)
-                self._send_alert(alert_message)
-                self.alert_sent = True
-            elif not alerts:
-                self.alert_sent = False
+            # Uyarıları gönder, tekrarlar bildirim kuyruğunda özetlenir
+            for key, message in alerts:
+                self._send_alert(message, key)
                 
         except Exception as e:
             self.logger.error(f"Alert check error: {e}")
 
-    async def _send_alert(self, message):
+    def _send_alert(self, message, key=None):
         """Uyarı gönder"""
         try:
             # Log'a kaydet
             self.logger.warning(f"ALERT: {message}")
             
-            # Telegram bildirimi gönder
-            if hasattr(self.bot, 'telegram'):
-                await self.bot.telegram.send_message(
-                    f"⚠️ System Alert:\n{message}"
-                )
+            # Telegram bildirimi kuyruğa ekle (monitor thread'inden çağrılabilir)
+            if getattr(self.bot, 'telegram', None):
+                self.bot.telegram.alert(f"⚠️ System Alert:\n{message}", key)
                 
         except Exception as e:
             self.logger.error(f"Alert sending error: {e}")
 
+    def export_state(self, limit=1000):
+        """Warm-start için son metrik kayıtları"""
+        return {
+            'system_metrics': {key: values[-limit:] for key, values in self.system_metrics.items()},
+            'trading_metrics': {key: values[-limit:] for key, values in self.trading_metrics.items()}
+        }
+
+    def restore_state(self, state):
+        for key, values in state['system_metrics'].items():
+            self.system_metrics[key] = list(values)
+        for key, values in state['trading_metrics'].items():
+            self.trading_metrics[key] = list(values)
+
     def get_performance_summary(self):
         """Performans özeti getir"""
         try:
@@ -293,7 +300,17 @@ class SystemMonitor:
                 'trading': {
                     'orders_per_hour': len(self.trading_metrics['order_latency']),
                     'signals_per_hour': len(self.trading_metrics['signal_latency'])
-                }
+                },
+                'pipeline': self.bot.get_pipeline_metrics() 
+                            if hasattr(self.bot, 'get_pipeline_metrics') else {},
+                'execution': self.bot.execution.get_summary()
+                             if hasattr(self.bot, 'execution') else {},
+                'rate_limits': self.bot.rate_limits.get_stats()
+                               if hasattr(self.bot, 'rate_limits') else {},
+                'connection': self.bot.supervisor.get_health()
+                              if hasattr(self.bot, 'supervisor') else {},
+                'reconciliation': self.bot.reconciler.get_stats()
+                                  if hasattr(self.bot, 'reconciler') else {}
             }
             
         except Exception as e:
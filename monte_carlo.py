@@ -0,0 +1,194 @@
+# modules/monte_carlo.py
+
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def _simulate_chunk(returns, paths, horizon, trades_per_day, scales, seed):
+    """
+    Bir grup bootstrap yolu (worker süreçte çalışır)
+
+    Aynı örnekleme indeksleri her pozisyon ölçeği için kullanılır, böylece
+    ölçekler arasındaki fark örnekleme gürültüsünden değil boyuttan gelir.
+
+    Returns:
+        dict: Ölçek x yol boyutunda max_drawdown, min_equity, final_equity, worst_day
+    """
+    rng = np.random.default_rng(seed)
+    sample = returns[rng.integers(0, len(returns), size=(paths, horizon))]
+    days = horizon // trades_per_day
+    result = {key: np.empty((len(scales), paths)) for key in ('max_drawdown', 'min_equity', 'final_equity', 'worst_day')}
+
+    for i, scale in enumerate(scales):
+        growth = 1.0 + np.maximum(sample * scale, -1.0)
+        equity = np.cumprod(growth, axis=1)
+        # Başlangıç sermayesi (1.0) tepe hesabına dahil
+        peak = np.maximum(np.maximum.accumulate(equity, axis=1), 1.0)
+        result['max_drawdown'][i] = (1.0 - equity / peak).max(axis=1)
+        result['min_equity'][i] = np.minimum(equity.min(axis=1), 1.0)
+        result['final_equity'][i] = equity[:, -1]
+        if days:
+            daily = growth[:, :days * trades_per_day].reshape(paths, days, trades_per_day).prod(axis=2)
+            result['worst_day'][i] = 1.0 - np.minimum(daily.min(axis=1), 1.0)
+        else:
+            result['worst_day'][i] = 1.0 - np.minimum(growth.prod(axis=1), 1.0)
+    return result
+
+
+class MonteCarloSimulator:
+    def __init__(self, config):
+        """
+        İşlem getirileri üzerinde bootstrap Monte Carlo
+
+        Geçmiş işlem başı getiriler yerine koyarak örneklenir, yollar
+        parçalara bölünüp süreç havuzunda NumPy ile vektörel simüle edilir.
+        Drawdown, günlük kayıp ve iflas olasılığı dağılımlarından RiskManager
+        için önerilen limitler üretilir.
+        """
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self.last_result = None
+
+    def _chunks(self, simulations, seed):
+        size = self.config['chunk_size']
+        counts = [size] * (simulations // size)
+        if simulations % size:
+            counts.append(simulations % size)
+        seeds = np.random.SeedSequence(seed).spawn(len(counts))
+        return list(zip(counts, seeds))
+
+    def simulate(self, returns, trades_per_day=None, simulations=None, horizon=None, seed=None):
+        """
+        Bootstrap yollarını üret ve sonuçları birleştir
+
+        Args:
+            returns: İşlem başı getiriler (PnL / işlem öncesi sermaye)
+            trades_per_day: Günlük kayıp dağılımı için; yoksa config değeri
+            horizon: Yol başına işlem sayısı; yoksa config değeri
+        """
+        returns = np.asarray(returns, dtype=float)
+        simulations = simulations or self.config['simulations']
+        horizon = horizon or self.config['horizon']
+        trades_per_day = max(1, int(round(trades_per_day or self.config['trades_per_day'])))
+        scales = sorted(set(self.config['position_scales']) | {1.0}, reverse=True)
+        chunks = self._chunks(simulations, seed)
+        workers = self.config['workers'] or os.cpu_count() or 1
+
+        started = time.perf_counter()
+        args = [(returns, paths, horizon, trades_per_day, scales, chunk_seed) for paths, chunk_seed in chunks]
+        if workers <= 1 or len(chunks) <= 1:
+            parts = [_simulate_chunk(*arg) for arg in args]
+        else:
+            # spawn: bot thread'li çalıştığı için fork yerine temiz worker süreçleri
+            context = multiprocessing.get_context(self.config['start_method'])
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=context) as pool:
+                parts = list(pool.map(_simulate_chunk, *zip(*args)))
+
+        merged = {key: np.concatenate([part[key] for part in parts], axis=1) for key in parts[0]}
+        self.logger.info(
+            "Monte Carlo simulation completed",
+            extra={
+                'simulations': simulations,
+                'horizon': horizon,
+                'workers': min(workers, len(chunks)),
+                'duration_ms': (time.perf_counter() - started) * 1000
+            }
+        )
+        return scales, merged
+
+    def run(self, returns, trades_per_day=None, current_limits=None, seed=None):
+        """
+        Simülasyon özeti ve önerilen limitler
+
+        Args:
+            current_limits: {'POSITION_SIZE_PERCENT': ...} mevcut değerler,
+                            pozisyon boyutu önerisi bunun üzerinden ölçeklenir
+
+        Returns:
+            dict: drawdown / günlük kayıp / son getiri yüzdelikleri, iflas
+                  olasılıkları, ölçek tablosu ve recommended_limits;
+                  yetersiz veride None
+        """
+        returns = np.asarray(returns, dtype=float)
+        if len(returns) < self.config['min_trades']:
+            self.logger.info(f"Monte Carlo skipped: {len(returns)} trades < {self.config['min_trades']}")
+            return None
+
+        scales, sims = self.simulate(returns, trades_per_day, seed=seed)
+        base = scales.index(1.0)
+        quantiles = self.config['quantiles']
+        ruin_level = self.config['ruin_loss']
+
+        def percentiles(values):
+            return {f'p{int(q * 100)}': float(v) * 100 for q, v in zip(quantiles, np.quantile(values, quantiles))}
+
+        max_drawdown = sims['max_drawdown'][base]
+        loss = 1.0 - sims['min_equity'][base]
+        counts, edges = np.histogram(max_drawdown * 100, bins=self.config['histogram_bins'])
+
+        # Ölçek başına iflas olasılığı (başlangıca göre ruin_loss kaybı)
+        by_scale = {
+            scale: {
+                'ruin_probability': float((1.0 - sims['min_equity'][i] >= ruin_level).mean()),
+                'drawdown_p95': float(np.quantile(sims['max_drawdown'][i], 0.95)) * 100,
+                'median_return': float(np.median(sims['final_equity'][i]) - 1.0) * 100
+            }
+            for i, scale in enumerate(scales)
+        }
+
+        result = {
+            'trades': len(returns),
+            'simulations': max_drawdown.size,
+            'horizon': self.config['horizon'],
+            'drawdown': {
+                'mean': float(max_drawdown.mean()) * 100,
+                **percentiles(max_drawdown),
+                'histogram': {'counts': counts.tolist(), 'edges': edges.tolist()}
+            },
+            'loss_from_start': percentiles(loss),
+            'worst_day': percentiles(sims['worst_day'][base]),
+            'final_return': percentiles(sims['final_equity'][base] - 1.0),
+            'ruin_probability': {
+                f'{int(level * 100)}%': float((loss >= level).mean()) for level in self.config['ruin_levels']
+            },
+            'scales': by_scale,
+            'recommended_limits': self.recommend_limits(sims, scales, current_limits or {})
+        }
+        self.last_result = result
+        return result
+
+    def recommend_limits(self, sims, scales, current_limits):
+        """
+        RiskManager limit önerileri (TradingConfig nitelik adlarıyla)
+
+        Drawdown ve günlük kayıp limitleri normal dağılım içindeki yolların
+        limite takılmayacağı yüzdelikten seçilir; pozisyon boyutu iflas
+        olasılığını hedefin altında tutan en büyük ölçekle küçültülür.
+        """
+        confidence = self.config['confidence']
+        floor, ceiling = self.config['limit_floor_percent'], self.config['limit_ceiling_percent']
+        base = scales.index(1.0)
+
+        def limit(values):
+            return round(float(np.clip(np.quantile(values, confidence) * 100, floor, ceiling)), 2)
+
+        limits = {
+            'MAX_DRAWDOWN_PERCENT': limit(1.0 - sims['min_equity'][base]),
+            'MAX_DAILY_LOSS_PERCENT': limit(sims['worst_day'][base])
+        }
+
+        ruin_level = self.config['ruin_loss']
+        safe = [
+            scale for i, scale in enumerate(scales)
+            if (1.0 - sims['min_equity'][i] >= ruin_level).mean() <= self.config['max_ruin_probability']
+        ]
+        scale = max(safe) if safe else min(scales)
+        if 'POSITION_SIZE_PERCENT' in current_limits:
+            limits['POSITION_SIZE_PERCENT'] = round(current_limits['POSITION_SIZE_PERCENT'] * scale, 2)
+        limits['position_scale'] = scale
+        return limits
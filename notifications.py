@@ -0,0 +1,218 @@
+# modules/notifications.py
+
+import asyncio
+import itertools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from telegram.error import NetworkError, RetryAfter, TimedOut
+
+from trailing_stop import TokenBucket
+
+# Düşük değer önce gönderilir
+PRIORITY_CRITICAL = 0  # Fill, emir hataları
+PRIORITY_HIGH = 1  # Sistem uyarıları
+PRIORITY_NORMAL = 2
+PRIORITY_LOW = 3  # Özetler, grafikler
+
+KIND_TEXT = 'text'
+KIND_CHART = 'chart'
+
+
+class NotificationQueue:
+    def __init__(self, bot, chat_id, config):
+        """
+        Telegram'a giden bildirimler için öncelikli kuyruk
+
+        Aynı anahtarlı tekrar eden uyarılar pencere boyunca sayılır ve tek
+        özet mesajında gönderilir. Aynı öncelikteki metinler tek mesajda
+        birleştirilir, gönderim chat başına token bucket ile yapılır,
+        RetryAfter / ağ hatalarında backoff ile tekrar denenir. Grafikler
+        event loop dışında PNG'ye çevrilir.
+
+        Args:
+            bot: telegram.Bot instance
+            chat_id: Hedef chat
+            config: TELEGRAM_CONFIG sözlüğü
+        """
+        self.bot = bot
+        self.chat_id = chat_id
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+
+        self.queue = asyncio.PriorityQueue(maxsize=config.get('queue_size', 1000))
+        self.bucket = TokenBucket(config.get('rate_per_second', 1), config.get('burst', 3))
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='telegram-render')
+        self.loop = None
+        self.worker = None
+        self.digest_task = None
+        self._seq = itertools.count()
+
+        # coalesce anahtarı -> {'message', 'count', 'first_seen'}
+        self.coalesced = {}
+        self.window_started = {}
+
+        self.sent = 0
+        self.dropped = 0
+        self.retries = 0
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.worker = asyncio.create_task(self._run())
+        self.digest_task = asyncio.create_task(self._digest_loop())
+
+    async def stop(self, timeout=5):
+        """Kuyruktakileri göndermeye çalış ve dur"""
+        if self.worker is None:
+            return
+        self._flush_digest()
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Notification queue stopped with {self.queue.qsize()} pending")
+        for task in (self.worker, self.digest_task):
+            task.cancel()
+        await asyncio.gather(self.worker, self.digest_task, return_exceptions=True)
+        self.executor.shutdown(wait=False)
+        self.worker = None
+
+    def notify(self, message, priority=PRIORITY_NORMAL, key=None):
+        """Metin bildirimi ekle, herhangi bir thread'den çağrılabilir"""
+        self._submit(KIND_TEXT, message, priority, key)
+
+    def notify_chart(self, figure, caption=None, priority=PRIORITY_LOW):
+        """
+        Grafik bildirimi ekle
+
+        Args:
+            figure: plotly Figure veya Figure döndüren fonksiyon
+                    (ör. lambda: analyzer.plot_analysis(analysis)), render executor'da yapılır
+        """
+        self._submit(KIND_CHART, (figure, caption), priority, None)
+
+    def _submit(self, kind, payload, priority, key):
+        if self.loop is None:
+            return
+        self.loop.call_soon_threadsafe(self._enqueue, kind, payload, priority, key)
+
+    def _enqueue(self, kind, payload, priority, key, attempts=0):
+        if key is not None and attempts == 0 and self._coalesce(key, payload):
+            return
+        try:
+            self.queue.put_nowait((priority, next(self._seq), kind, payload, attempts))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            self.logger.warning(f"Notification queue full, dropped: {kind}")
+
+    def _coalesce(self, key, message):
+        """Pencere içindeki tekrarları say, ilk mesaj hemen gönderilir"""
+        now = time.monotonic()
+        started = self.window_started.get(key)
+        if started is None or now - started > self.config.get('coalesce_window', 60):
+            self.window_started[key] = now
+            return False
+
+        entry = self.coalesced.setdefault(key, {'count': 0, 'first_seen': now})
+        entry['count'] += 1
+        entry['message'] = message
+        return True
+
+    def _flush_digest(self):
+        """Birleştirilen tekrarları tek özet mesajına çevir"""
+        if not self.coalesced:
+            return
+        window = self.config.get('coalesce_window', 60)
+        lines = [
+            f"• {entry['message']} (x{entry['count']}, son {window}s)"
+            for entry in self.coalesced.values()
+        ]
+        self.coalesced = {}
+        self._enqueue(KIND_TEXT, "🔁 Tekrarlanan uyarılar:\n" + "\n".join(lines), PRIORITY_LOW, None)
+
+    async def _digest_loop(self):
+        while True:
+            await asyncio.sleep(self.config.get('coalesce_window', 60))
+            self._flush_digest()
+
+    def _drain_batch(self, priority, message):
+        """Kuyruktaki aynı öncelikli metinleri mesaj sınırına kadar birleştir"""
+        limit = self.config.get('batch_max_chars', 3500)
+        parts = [message]
+        size = len(message)
+        while not self.queue.empty():
+            item = self.queue.get_nowait()
+            if item[0] != priority or item[2] != KIND_TEXT or size + len(item[3]) + 2 > limit:
+                # Birleştirilemeyen öğeyi sırasını bozmadan geri koy
+                self.queue.put_nowait(item)
+                self.queue.task_done()
+                break
+            parts.append(item[3])
+            size += len(item[3]) + 2
+            self.queue.task_done()
+        return "\n\n".join(parts)
+
+    async def _acquire(self):
+        interval = 1 / self.config.get('rate_per_second', 1)
+        while not self.bucket.try_acquire():
+            await asyncio.sleep(interval)
+
+    async def _run(self):
+        while True:
+            priority, _, kind, payload, attempts = await self.queue.get()
+            try:
+                if kind == KIND_TEXT and priority >= PRIORITY_NORMAL:
+                    payload = self._drain_batch(priority, payload)
+                await self._acquire()
+                await self._deliver(kind, payload)
+                self.sent += 1
+            except RetryAfter as e:
+                # Telegram flood kontrolü, istenen süre kadar bekle
+                self.retries += 1
+                # Yeni python-telegram-bot sürümleri timedelta döndürür
+                retry_after = e.retry_after
+                if hasattr(retry_after, 'total_seconds'):
+                    retry_after = retry_after.total_seconds()
+                self.logger.warning(f"Telegram flood limit, retrying after {retry_after}s")
+                await asyncio.sleep(retry_after)
+                self._enqueue(kind, payload, priority, None, attempts + 1)
+            except (TimedOut, NetworkError) as e:
+                self._retry(kind, payload, priority, attempts, e)
+            except Exception as e:
+                self.logger.error(f"Notification send error: {e}")
+            finally:
+                self.queue.task_done()
+
+    def _retry(self, kind, payload, priority, attempts, error):
+        max_retries = self.config.get('max_retries', 5)
+        if attempts >= max_retries:
+            self.dropped += 1
+            self.logger.error(f"Notification dropped after {attempts} retries: {error}")
+            return
+        self.retries += 1
+        delay = self.config.get('retry_backoff', 1.0) * 2 ** attempts
+        self.loop.call_later(delay, self._enqueue, kind, payload, priority, None, attempts + 1)
+
+    async def _deliver(self, kind, payload):
+        if kind == KIND_TEXT:
+            await self.bot.send_message(chat_id=self.chat_id, text=payload, parse_mode='HTML')
+            return
+
+        figure, caption = payload
+        # Grafik render'ı CPU yoğun, event loop'u bloklamasın
+        image = await self.loop.run_in_executor(self.executor, self._render, figure)
+        await self.bot.send_photo(chat_id=self.chat_id, photo=image, caption=caption)
+
+    @staticmethod
+    def _render(figure):
+        if callable(figure):
+            figure = figure()
+        return figure.to_image(format='png')
+
+    def get_stats(self):
+        return {
+            'pending': self.queue.qsize(),
+            'coalesced': sum(entry['count'] for entry in self.coalesced.values()),
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'retries': self.retries
+        }
@@ -0,0 +1,113 @@
+# modules/order_book.py
+
+import logging
+from datetime import datetime
+import numpy as np
+
+
+class OrderBookManager:
+    def __init__(self, symbol='XBTUSDT', depth=25):
+        """
+        Bellekte tutulan L2 order book
+
+        Args:
+            symbol: Takip edilen sembol
+            depth: Her tarafta tutulacak seviye sayısı
+        """
+        self.symbol = symbol
+        self.depth = depth
+        self.logger = logging.getLogger(__name__)
+
+        # [fiyat, hacim] satırları, bids azalan / asks artan fiyat sırasında
+        self.bids = np.empty((0, 2), dtype=np.float64)
+        self.asks = np.empty((0, 2), dtype=np.float64)
+
+        self.timestamp = None
+        self.last_message_time = None
+        self.connected = False
+
+    def update(self, orderbook):
+        """ccxt fetch_order_book / WebSocket snapshot ile kitabı güncelle"""
+        self.bids = self._to_array(orderbook.get('bids', []))
+        self.asks = self._to_array(orderbook.get('asks', []))
+        self.timestamp = orderbook.get('timestamp')
+        self.last_message_time = datetime.now()
+        self.connected = True
+
+    def _to_array(self, levels):
+        if not levels:
+            return np.empty((0, 2), dtype=np.float64)
+        return np.array([level[:2] for level in levels[:self.depth]], dtype=np.float64)
+
+    def best_bid(self):
+        return self.bids[0, 0] if len(self.bids) else None
+
+    def best_ask(self):
+        return self.asks[0, 0] if len(self.asks) else None
+
+    def mid_price(self):
+        if not len(self.bids) or not len(self.asks):
+            return None
+        return (self.bids[0, 0] + self.asks[0, 0]) / 2
+
+    def get_imbalance(self, levels=10):
+        """-1 (satış baskısı) ile 1 (alış baskısı) arası hacim dengesizliği"""
+        bid_volume = self.bids[:levels, 1].sum()
+        ask_volume = self.asks[:levels, 1].sum()
+        total = bid_volume + ask_volume
+        if total == 0:
+            return 0.0
+        return float((bid_volume - ask_volume) / total)
+
+    def walk_depth(self, side, quantity):
+        """
+        Emir miktarı için kümülatif derinliği yürü
+
+        Args:
+            side: 'buy' (ask tarafını tüketir) veya 'sell' (bid tarafı)
+            quantity: Emir miktarı
+
+        Returns:
+            dict: Ortalama / en kötü dolum fiyatı, dolabilen miktar, kullanılan seviye
+            sayısı ve görünür derinliğin yetmediği kısım, kitap boşsa None
+        """
+        levels = self.asks if side == 'buy' else self.bids
+        if not len(levels) or quantity <= 0:
+            return None
+
+        prices = levels[:, 0]
+        volumes = levels[:, 1]
+        cumulative = np.cumsum(volumes)
+
+        # Miktarı karşılayan ilk seviye, kitap yetmiyorsa tüm seviyeler
+        last = min(int(np.searchsorted(cumulative, quantity)), len(levels) - 1)
+        filled = min(quantity, float(cumulative[last]))
+        taken = volumes[:last + 1].copy()
+        taken[-1] -= cumulative[last] - filled
+
+        return {
+            'average_price': float(taken @ prices[:last + 1] / filled) if filled > 0 else float(prices[0]),
+            'worst_price': float(prices[last]),
+            'filled': filled,
+            'shortfall': quantity - filled,
+            'levels': last + 1
+        }
+
+    def get_current_state(self):
+        """Dashboard ve analiz için kitap özeti"""
+        if not len(self.bids) and not len(self.asks):
+            return None
+
+        best_bid = self.best_bid()
+        best_ask = self.best_ask()
+        return {
+            'timestamp': self.timestamp,
+            'bids_prices': self.bids[:, 0].tolist(),
+            'bids_volumes': self.bids[:, 1].tolist(),
+            'asks_prices': self.asks[:, 0].tolist(),
+            'asks_volumes': self.asks[:, 1].tolist(),
+            'best_bid': best_bid,
+            'best_ask': best_ask,
+            'spread': best_ask - best_bid if best_bid is not None and best_ask is not None else None,
+            'imbalance': self.get_imbalance()
+        }
@@ -1,39 +1,296 @@
 # modules/performance_analyzer.py
+import logging
+
 import pandas as pd
 import numpy as np
 
+# Dizi kapasitesi dolduğunda iki katına çıkarılır
+_INITIAL_CAPACITY = 1024
+_DAY = 86400
+
+
 class PerformanceAnalyzer:
-    def __init__(self):
+    def __init__(self, config=None):
+        """
+        Dizi tabanlı işlem geçmişi üzerinde performans motoru
+
+        Kapanan işlemler NumPy dizilerine eklenir; PnL, kazanç, brüt kâr/zarar
+        ve getiri için önek toplamları ekleme sırasında güncellenir. Böylece
+        son N işlem ve son 7 / 30 gün pencereleri O(1) toplam farkıyla,
+        drawdown ise pencere dilimi üzerinde tek geçişte hesaplanır. Sonuç
+        ve öneriler sadece yeni işlem kapandığında yeniden hesaplanır.
+        """
+        if config is None:
+            from settings import PERFORMANCE_CONFIG
+            config = PERFORMANCE_CONFIG
+        self.config = config
+        self.logger = logging.getLogger(__name__)
         self.is_active = False
-        
-    def analyze_performance(self, trades_history):
-        if not self.is_active:
+
+        self.starting_equity = float(config['starting_equity'])
+        self._allocate(_INITIAL_CAPACITY)
+        self.count = 0
+        self.version = 0
+        self._cached = None
+        self._cached_version = -1
+
+    def _allocate(self, capacity):
+        self.timestamps = np.zeros(capacity)
+        self.pnl = np.zeros(capacity)
+        self.sizes = np.zeros(capacity)
+        self.returns = np.zeros(capacity)
+        # Önek toplamları: [0] = 0, [i] = ilk i işlemin toplamı
+        self.cum_pnl = np.zeros(capacity + 1)
+        self.cum_wins = np.zeros(capacity + 1)
+        self.cum_profit = np.zeros(capacity + 1)
+        self.cum_loss = np.zeros(capacity + 1)
+        self.cum_ret = np.zeros(capacity + 1)
+        self.cum_ret_sq = np.zeros(capacity + 1)
+
+    def _grow(self, needed):
+        capacity = len(self.pnl)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        n = self.count
+        old = {
+            name: getattr(self, name)
+            for name in ('timestamps', 'pnl', 'sizes', 'returns')
+        }
+        old_prefix = {
+            name: getattr(self, name)
+            for name in ('cum_pnl', 'cum_wins', 'cum_profit', 'cum_loss', 'cum_ret', 'cum_ret_sq')
+        }
+        self._allocate(capacity)
+        for name, values in old.items():
+            getattr(self, name)[:n] = values[:n]
+        for name, values in old_prefix.items():
+            getattr(self, name)[:n + 1] = values[:n + 1]
+
+    def set_starting_equity(self, equity):
+        """Başlangıç sermayesi değişirse getiriler ve önek toplamları yeniden kurulur"""
+        self.starting_equity = float(equity)
+        if self.count:
+            self._append(
+                self.timestamps[:self.count].copy(), self.pnl[:self.count].copy(),
+                self.sizes[:self.count].copy(), reset=True
+            )
+
+    def add_trade(self, pnl, size, timestamp=None):
+        """Kapanan tek işlem (timestamp epoch saniye)"""
+        timestamp = pd.Timestamp.now().timestamp() if timestamp is None else float(timestamp)
+        self._append(np.array([timestamp]), np.array([float(pnl)]), np.array([abs(float(size))]))
+
+    def load_trades(self, trades_history):
+        """
+        İşlem geçmişini tek seferde yükle (mevcut geçmişin yerine)
+
+        Args:
+            trades_history: TradeStore.get_trade_history DataFrame'i veya
+                            pnl / size / timestamp alanlı dict listesi
+        """
+        df = trades_history if isinstance(trades_history, pd.DataFrame) else pd.DataFrame(trades_history)
+        if df.empty:
+            self._append(np.zeros(0), np.zeros(0), np.zeros(0), reset=True)
+            return
+        if 'timestamp' in df:
+            df = df.sort_values('timestamp', kind='stable')
+            timestamps = pd.to_datetime(df['timestamp']).to_numpy('datetime64[ns]').astype(np.int64) / 1e9
+        else:
+            timestamps = np.zeros(len(df))
+        sizes = df['size'].to_numpy(float) if 'size' in df else np.zeros(len(df))
+        self._append(timestamps, df['pnl'].to_numpy(float), np.abs(sizes), reset=True)
+
+    def _append(self, timestamps, pnl, sizes, reset=False):
+        """Dizilere ekle ve önek toplamlarını eklenen kısım için vektörel güncelle"""
+        start = 0 if reset else self.count
+        end = start + len(pnl)
+        self._grow(end)
+
+        self.timestamps[start:end] = timestamps
+        self.pnl[start:end] = pnl
+        self.sizes[start:end] = sizes
+
+        # Getiri: PnL / işlem öncesi sermaye
+        equity_before = self.starting_equity + self.cum_pnl[start] + np.concatenate(([0.0], np.cumsum(pnl)[:-1]))
+        returns = np.divide(pnl, equity_before, out=np.zeros_like(pnl), where=equity_before > 0)
+        self.returns[start:end] = returns
+
+        for prefix, values in (
+            (self.cum_pnl, pnl),
+            (self.cum_wins, (pnl > 0).astype(float)),
+            (self.cum_profit, np.where(pnl > 0, pnl, 0.0)),
+            (self.cum_loss, np.where(pnl < 0, -pnl, 0.0)),
+            (self.cum_ret, returns),
+            (self.cum_ret_sq, returns * returns)
+        ):
+            prefix[start + 1:end + 1] = prefix[start] + np.cumsum(values)
+
+        self.count = end
+        self.version += 1
+
+    def _window_start(self, days):
+        """Son işlemden geriye days gün içindeki ilk işlemin indeksi"""
+        cutoff = self.timestamps[self.count - 1] - days * _DAY
+        return int(np.searchsorted(self.timestamps[:self.count], cutoff, side='left'))
+
+    def calculate_win_rate(self, lo=0, hi=None):
+        hi = self.count if hi is None else hi
+        return float((self.cum_wins[hi] - self.cum_wins[lo]) / (hi - lo)) if hi > lo else 0.0
+
+    def calculate_avg_profit(self, lo=0, hi=None):
+        hi = self.count if hi is None else hi
+        return float((self.cum_pnl[hi] - self.cum_pnl[lo]) / (hi - lo)) if hi > lo else 0.0
+
+    def calculate_max_drawdown(self, lo=0, hi=None):
+        """
+        Pencere içi en büyük düşüş
+
+        Returns:
+            tuple: (tepe sermayeye oranla drawdown, mutlak drawdown)
+        """
+        hi = self.count if hi is None else hi
+        if hi <= lo:
+            return 0.0, 0.0
+        # Pencere öncesi sermaye dahil: ilk işlem de drawdown yaratabilir
+        equity = self.starting_equity + self.cum_pnl[lo:hi + 1]
+        peak = np.maximum.accumulate(equity)
+        drawdown = peak - equity
+        ratio = np.divide(drawdown, peak, out=np.zeros_like(drawdown), where=peak > 0)
+        return float(ratio.max()), float(drawdown.max())
+
+    def calculate_sharpe_ratio(self, lo=0, hi=None, risk_free_rate=0.02):
+        """İşlem başı getirilerden Sharpe (TradeAnalyzer ile aynı yıllıklandırma)"""
+        hi = self.count if hi is None else hi
+        n = hi - lo
+        if n < 2:
+            return 0.0
+        mean = (self.cum_ret[hi] - self.cum_ret[lo]) / n
+        variance = ((self.cum_ret_sq[hi] - self.cum_ret_sq[lo]) - n * mean * mean) / (n - 1)
+        if variance <= 1e-18:
+            return 0.0
+        return float(np.sqrt(252) * (mean - risk_free_rate / 252) / np.sqrt(variance))
+
+    def calculate_profit_factor(self, lo=0, hi=None):
+        hi = self.count if hi is None else hi
+        loss = self.cum_loss[hi] - self.cum_loss[lo]
+        return float((self.cum_profit[hi] - self.cum_profit[lo]) / loss) if loss > 0 else 0.0
+
+    def analyze_position_sizes(self, lo=0, hi=None):
+        """
+        Pozisyon boyutu dağılımı
+
+        Returns:
+            dict: Boyut değişkenliği, boyut-PnL korelasyonu ve optimize
+                  edilmesi gerekip gerekmediği; yetersiz veride None
+        """
+        hi = self.count if hi is None else hi
+        if hi - lo < self.config['min_trades']:
             return None
-            
-        stats = {
-            'total_trades': len(trades_history),
-            'win_rate': self.calculate_win_rate(trades_history),
-            'avg_profit': self.calculate_avg_profit(trades_history),
-            'max_drawdown': self.calculate_max_drawdown(trades_history),
-            'sharpe_ratio': self.calculate_sharpe_ratio(trades_history),
-            'improvement_suggestions': self.generate_suggestions(trades_history)
+        sizes, pnl = self.sizes[lo:hi], self.pnl[lo:hi]
+        mean_size = sizes.mean()
+        variation = float(sizes.std() / mean_size) if mean_size > 0 else 0.0
+        # Büyük pozisyonlar daha çok kaybettiriyorsa negatif korelasyon
+        correlation = (
+            float(np.corrcoef(sizes, pnl)[0, 1]) if sizes.std() > 0 and pnl.std() > 0 else 0.0
+        )
+        wins = pnl > 0
+        return {
+            'avg_size': float(mean_size),
+            'size_variation': variation,
+            'size_pnl_correlation': correlation,
+            'avg_win_size': float(sizes[wins].mean()) if wins.any() else 0.0,
+            'avg_loss_size': float(sizes[~wins].mean()) if (~wins).any() else 0.0,
+            'needs_optimization': (
+                variation > self.config['max_size_variation']
+                or correlation < -self.config['max_size_pnl_correlation']
+            )
         }
-        
-        return stats
-        
-    def generate_suggestions(self, trades_history):
+
+    def _window_stats(self, lo, hi):
+        drawdown, drawdown_abs = self.calculate_max_drawdown(lo, hi)
+        return {
+            'trades': hi - lo,
+            'win_rate': self.calculate_win_rate(lo, hi),
+            'total_pnl': float(self.cum_pnl[hi] - self.cum_pnl[lo]),
+            'avg_profit': self.calculate_avg_profit(lo, hi),
+            'profit_factor': self.calculate_profit_factor(lo, hi),
+            'max_drawdown': drawdown,
+            'max_drawdown_abs': drawdown_abs,
+            'sharpe_ratio': self.calculate_sharpe_ratio(lo, hi)
+        }
+
+    def rolling_stats(self):
+        """Son N işlem ve son gün pencereleri (son kapanan işleme göre)"""
+        if not self.count:
+            return {}
+        n = self.count
+        windows = {f"last_{self.config['rolling_trades']}": (max(0, n - self.config['rolling_trades']), n)}
+        for days in self.config['rolling_days']:
+            windows[f'{days}d'] = (self._window_start(days), n)
+        return {name: self._window_stats(lo, hi) for name, (lo, hi) in windows.items()}
+
+    def analyze_performance(self, trades_history=None):
+        """
+        Performans özeti ve öneriler
+
+        Args:
+            trades_history: Verilirse geçmiş yeniden yüklenir; verilmezse
+                            add_trade ile biriken geçmiş kullanılır
+        """
+        if not self.is_active:
+            return None
+
+        try:
+            if trades_history is not None:
+                self.load_trades(trades_history)
+            if self._cached_version == self.version:
+                return self._cached
+
+            overall = self._window_stats(0, self.count)
+            rolling = self.rolling_stats()
+            sizes = self.analyze_position_sizes()
+            stats = {
+                'total_trades': self.count,
+                'win_rate': overall['win_rate'],
+                'avg_profit': overall['avg_profit'],
+                'profit_factor': overall['profit_factor'],
+                'max_drawdown': overall['max_drawdown'],
+                'max_drawdown_abs': overall['max_drawdown_abs'],
+                'sharpe_ratio': overall['sharpe_ratio'],
+                'position_sizes': sizes,
+                'rolling': rolling,
+                'improvement_suggestions': self.generate_suggestions(overall, rolling, sizes)
+            }
+            self._cached, self._cached_version = stats, self.version
+            return stats
+
+        except Exception as e:
+            self.logger.error(f"Performance analysis error: {e}")
+            return None
+
+    def generate_suggestions(self, overall, rolling, sizes):
         suggestions = []
-        
+        if overall['trades'] < self.config['min_trades']:
+            return suggestions
+
         # Win rate analizi
-        if self.calculate_win_rate(trades_history) < 0.5:
+        if overall['win_rate'] < self.config['min_win_rate']:
             suggestions.append("Giriş stratejinizi gözden geçirin")
-            
+
         # Drawdown analizi
-        if self.calculate_max_drawdown(trades_history) > 0.2:
+        if overall['max_drawdown'] > self.config['max_drawdown']:
             suggestions.append("Risk yönetimi parametrelerini sıkılaştırın")
-            
+
         # Pozisyon boyutu analizi
-        if self.analyze_position_sizes(trades_history):
+        if sizes and sizes['needs_optimization']:
             suggestions.append("Pozisyon boyutlarını optimize edin")
-            
+
+        # Son işlemlerde belirgin bozulma
+        recent = rolling.get(f"last_{self.config['rolling_trades']}")
+        if (recent and recent['trades'] < overall['trades']
+                and recent['win_rate'] < overall['win_rate'] - self.config['win_rate_decay']):
+            suggestions.append("Son işlemlerde başarı oranı düştü, piyasa koşullarını kontrol edin")
+
         return suggestions
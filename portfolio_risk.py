@@ -0,0 +1,252 @@
+# modules/portfolio_risk.py
+
+import logging
+import time
+import numpy as np
+
+# Tek taraflı %99 güven düzeyi için z skoru
+Z_99 = 2.326
+
+
+class PortfolioRiskEngine:
+    def __init__(self, config, capacity=16, returns_window=240):
+        """
+        Tüm semboller için portföy seviyesinde risk takibi
+
+        Mark fiyatları, pozisyonlar, marjin ve likidasyon mesafesi feed'den
+        güncellenir. Her tick'te maruziyet, VaR ve stres testleri tüm kitap
+        üzerinde vektörel hesaplanır, emir kontrolleri exchange'e gitmez.
+
+        Özsermaye ve pozisyon değerleri aynı para biriminde olmalıdır
+        (config['equity_currency']).
+
+        Args:
+            config: PORTFOLIO_RISK_CONFIG sözlüğü
+            capacity: Takip edilebilecek maksimum sembol sayısı
+            returns_window: VaR için tutulacak getiri sayısı
+        """
+        self.logger = logging.getLogger(__name__)
+        self.config = config
+        self.capacity = capacity
+
+        self.symbols = {}
+        self.count = 0
+
+        # Sembol bazlı durum dizileri
+        self.size = np.zeros(capacity)  # İşaretli kontrat sayısı
+        self.entry_price = np.zeros(capacity)
+        self.mark_price = np.full(capacity, np.nan)
+        self.leverage = np.ones(capacity)
+        self.liquidation_price = np.zeros(capacity)
+        self.multiplier = np.ones(capacity)
+        self.inverse = np.zeros(capacity, dtype=bool)
+
+        # Getiri halka tamponu (sembol x pencere)
+        self.returns = np.full((capacity, returns_window), np.nan)
+        self.returns_head = np.zeros(capacity, dtype=np.int64)
+        self.last_sample_price = np.full(capacity, np.nan)
+        self.last_sample_time = np.zeros(capacity)
+        self.covariance = None
+
+        self.shocks = np.array(config['stress_shocks'], dtype=np.float64)
+        self.equity = 0.0
+        self.state = {}
+
+    def register_symbol(self, symbol, multiplier=1.0, inverse=False):
+        """Sembol için dizi satırı ayır"""
+        if symbol in self.symbols:
+            return self.symbols[symbol]
+        if self.count >= self.capacity:
+            raise ValueError(f"Portfolio capacity exceeded: {self.capacity}")
+
+        slot = self.count
+        self.symbols[symbol] = slot
+        self.multiplier[slot] = multiplier
+        self.inverse[slot] = inverse
+        self.count += 1
+        return slot
+
+    def set_equity(self, equity):
+        """Hesap özsermayesi (RiskManager bakiye olaylarından)"""
+        self.equity = equity
+
+    def on_position(self, symbol, size, entry_price=0.0, leverage=1.0, liquidation_price=0.0):
+        """Pozisyon olayı, size long için pozitif short için negatif"""
+        slot = self.register_symbol(symbol)
+        self.size[slot] = size
+        self.entry_price[slot] = entry_price or 0.0
+        self.leverage[slot] = leverage or 1.0
+        self.liquidation_price[slot] = liquidation_price or 0.0
+        self._recompute()
+
+    def on_positions(self, positions):
+        """ccxt fetch_positions çıktısını toplu uygula"""
+        seen = set()
+        for position in positions:
+            contracts = position.get('contracts') or 0
+            sign = -1 if position.get('side') == 'short' else 1
+            # ccxt birleşik sembol yerine exchange'in ham sembolünü kullan (XBTUSDT)
+            symbol = (position.get('info') or {}).get('symbol') or position['symbol']
+            slot = self.register_symbol(symbol)
+            self.size[slot] = sign * contracts
+            self.entry_price[slot] = position.get('entryPrice') or 0.0
+            self.leverage[slot] = position.get('leverage') or 1.0
+            self.liquidation_price[slot] = position.get('liquidationPrice') or 0.0
+            if position.get('markPrice'):
+                self.mark_price[slot] = position['markPrice']
+            seen.add(slot)
+
+        # Listede olmayan semboller kapanmış sayılır
+        for slot in range(self.count):
+            if slot not in seen:
+                self.size[slot] = 0.0
+        self._recompute()
+
+    def on_tick(self, symbol, price, timestamp=None):
+        """Mark / son fiyat güncellemesi"""
+        slot = self.register_symbol(symbol)
+        self.mark_price[slot] = price
+        self._sample_return(slot, price, timestamp or time.monotonic())
+        self._recompute()
+
+    def _sample_return(self, slot, price, now):
+        """Sabit aralıklarla log getiri kaydet"""
+        last_price = self.last_sample_price[slot]
+        if np.isnan(last_price):
+            self.last_sample_price[slot] = price
+            self.last_sample_time[slot] = now
+            return
+        if now - self.last_sample_time[slot] < self.config['returns_interval']:
+            return
+
+        head = self.returns_head[slot]
+        self.returns[slot, head % self.returns.shape[1]] = np.log(price / last_price)
+        self.returns_head[slot] = head + 1
+        self.last_sample_price[slot] = price
+        self.last_sample_time[slot] = now
+        self.covariance = None  # Yeni getiri, kovaryansı yeniden hesapla
+
+    def _covariance(self):
+        n = self.count
+        if self.covariance is None or len(self.covariance) != n:
+            # Henüz dolmamış pencere elemanları sıfır getiri kabul edilir
+            returns = np.nan_to_num(self.returns[:n])
+            if n == 0:
+                self.covariance = np.zeros((0, 0))
+            else:
+                self.covariance = np.atleast_2d(np.cov(returns))
+        return self.covariance
+
+    def _notional(self, size, mark):
+        """İşaretli pozisyon değeri (hesap para biriminde)"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            notional = np.where(
+                self.inverse[:len(size)],
+                size * self.multiplier[:len(size)] / mark,
+                size * self.multiplier[:len(size)] * mark
+            )
+        return np.nan_to_num(notional)
+
+    def _portfolio_metrics(self, size):
+        """Verilen pozisyon vektörü için maruziyet, VaR ve stres kaybı"""
+        n = self.count
+        mark = self.mark_price[:n]
+        notional = self._notional(size, mark)
+
+        gross = float(np.abs(notional).sum())
+        margin = float((np.abs(notional) / self.leverage[:n]).sum())
+
+        covariance = self._covariance()
+        horizon = np.sqrt(self.config['var_horizon'])
+        variance = float(notional @ covariance @ notional) if n else 0.0
+        var = float(Z_99 * np.sqrt(max(variance, 0.0)) * horizon)
+
+        # Senaryo x sembol PnL matrisi, en kötü senaryo
+        stress_pnl = (self.shocks[:, None] * notional[None, :]).sum(axis=1)
+        worst_stress = float(stress_pnl.min()) if len(stress_pnl) else 0.0
+
+        return notional, gross, margin, var, stress_pnl, worst_stress
+
+    def _recompute(self):
+        n = self.count
+        size = self.size[:n]
+        mark = self.mark_price[:n]
+        entry = self.entry_price[:n]
+
+        notional, gross, margin, var, stress_pnl, worst_stress = self._portfolio_metrics(size)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            unrealized = np.where(
+                self.inverse[:n],
+                size * self.multiplier[:n] * (1 / entry - 1 / mark),
+                size * self.multiplier[:n] * (mark - entry)
+            )
+            liq = self.liquidation_price[:n]
+            liq_distance = np.where(
+                (liq > 0) & (size != 0),
+                np.abs(mark - liq) / mark * 100,
+                np.inf
+            )
+        unrealized = np.where(size != 0, np.nan_to_num(unrealized), 0.0)
+
+        self.state = {
+            'symbols': list(self.symbols),
+            'notional': notional,
+            'unrealized_pnl': unrealized,
+            'liquidation_distance': liq_distance,
+            'gross_exposure': gross,
+            'net_exposure': float(notional.sum()),
+            'margin_used': margin,
+            'var': var,
+            'stress_pnl': stress_pnl,
+            'worst_stress': worst_stress,
+            'min_liquidation_distance': float(liq_distance.min()) if n else np.inf
+        }
+
+    def check_order(self, symbol, side, amount, price=None):
+        """Emri mevcut portföy durumuna göre kontrol et, (izin, engel nedeni) döndür"""
+        slot = self.register_symbol(symbol)
+        if price is not None and np.isnan(self.mark_price[slot]):
+            self.mark_price[slot] = price
+
+        size = self.size[:self.count].copy()
+        size[slot] += amount if side in ('buy', 'long') else -amount
+        _, gross, margin, var, _, worst_stress = self._portfolio_metrics(size)
+
+        equity = self.equity
+        if equity <= 0:
+            return False, 'no_equity'
+        if gross / equity > self.config['max_gross_leverage']:
+            return False, 'gross_exposure'
+        if margin > equity:
+            return False, 'margin'
+        if var / equity * 100 > self.config['max_var_percent']:
+            return False, 'var'
+        if -worst_stress / equity * 100 > self.config['max_stress_loss_percent']:
+            return False, 'stress'
+        if self.state.get('min_liquidation_distance', np.inf) < self.config['min_liquidation_distance_percent']:
+            return False, 'liquidation_distance'
+        return True, None
+
+    def get_summary(self):
+        """Dashboard / Telegram için sade özet"""
+        state = self.state
+        if not state:
+            return {}
+        return {
+            'positions': {
+                symbol: {
+                    'size': float(self.size[slot]),
+                    'mark_price': float(self.mark_price[slot]),
+                    'notional': float(state['notional'][slot]),
+                    'unrealized_pnl': float(state['unrealized_pnl'][slot]),
+                    'liquidation_distance': float(state['liquidation_distance'][slot])
+                }
+                for symbol, slot in self.symbols.items()
+            },
+            'gross_exposure': state['gross_exposure'],
+            'net_exposure': state['net_exposure'],
+            'margin_used': state['margin_used'],
+            'var': state['var'],
+            'worst_stress': state['worst_stress']
+        }
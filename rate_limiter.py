@@ -0,0 +1,218 @@
+# modules/rate_limiter.py
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+import ccxt
+
+PRIORITY_CRITICAL = 0  # Emir gönderme / iptal
+PRIORITY_HIGH = 1
+PRIORITY_NORMAL = 2  # Trading döngüsü verisi
+PRIORITY_LOW = 3  # Dashboard, izleme, periyodik bakiye
+
+# Emir uç noktaları genel limite ek olarak saniyelik limite tabidir
+ORDER_PATHS = ('order', 'order/bulk', 'order/all', 'order/closePosition', 'order/cancelAllAfter')
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+class RateLimitDeferred(ccxt.RateLimitExceeded):
+    """Düşük öncelikli çağrı, bütçe rezervin altında kaldığı için ertelendi"""
+
+
+class Budget:
+    def __init__(self, name, limit, window):
+        """
+        Kayan pencere bütçesi
+
+        Kalan hak yerel olarak her çağrıda düşülür ve pencere hızında dolar;
+        borsa başlıkları geldikçe sunucunun değeriyle düzeltilir.
+        """
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.remaining = float(limit)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    @property
+    def rate(self):
+        return self.limit / self.window
+
+    def _refill(self, now):
+        self.remaining = min(self.limit, self.remaining + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, floor, now):
+        """floor üzerinde bir hak kalana kadar beklenecek süre"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self._refill(now)
+        if self.remaining - 1 >= floor:
+            return 0.0
+        return (floor + 1 - self.remaining) / self.rate
+
+    def consume(self):
+        self.remaining -= 1
+
+    def on_headers(self, remaining, limit=None, reset=None, now=None):
+        now = time.monotonic() if now is None else now
+        if limit:
+            self.limit = limit
+        self.remaining = float(remaining)
+        self.updated = now
+        if remaining <= 0 and reset:
+            self.blocked_until = now + max(0.0, reset - time.time())
+
+    def on_rate_limited(self, retry_after):
+        now = time.monotonic()
+        self.remaining = 0.0
+        self.updated = now
+        self.blocked_until = max(self.blocked_until, now + retry_after)
+
+
+class RateLimitManager:
+    def __init__(self, config):
+        """
+        Süreç genelinde BitMEX istek bütçesi
+
+        Tüm ccxt örnekleri install() ile bu yöneticiye bağlanır, ccxt'nin
+        örnek başına limitleyicisi kapatılır. Genel ve emir uç noktaları için
+        ayrı bütçe tutulur, x-ratelimit-* başlıklarıyla düzeltilir. Düşük
+        öncelikli çağrılar bütçenin rezerv kısmına dokunamaz; emir ve iptaller
+        için pay ayrılmış olur.
+        """
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self.budgets = {
+            'general': Budget('general', config['general_limit'], config['general_window']),
+            'order': Budget('order', config['order_limit'], config['order_window'])
+        }
+        self.reserve = {
+            PRIORITY_CRITICAL: 0.0,
+            PRIORITY_HIGH: 0.0,
+            PRIORITY_NORMAL: config['reserve_normal'],
+            PRIORITY_LOW: config['reserve_low']
+        }
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.stats = {'calls': 0, 'waited': 0, 'wait_seconds': 0.0, 'deferred': 0, 'rate_limited': 0}
+
+    @contextmanager
+    def priority(self, priority):
+        """Bu thread'deki borsa çağrılarının önceliğini geçici olarak ayarla"""
+        previous = getattr(self.local, 'priority', None)
+        self.local.priority = priority
+        try:
+            yield
+        finally:
+            self.local.priority = previous
+
+    def _budgets_for(self, kind):
+        if kind == 'order':
+            return [self.budgets['general'], self.budgets['order']]
+        return [self.budgets['general']]
+
+    def acquire(self, kind, priority):
+        """Bütçeden bir hak al, gerekirse bekle; düşük öncelik max_defer'i aşarsa RateLimitDeferred"""
+        deadline = time.monotonic() + self.config['max_defer']
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                budgets = self._budgets_for(kind)
+                wait = max(
+                    budget.wait_time(budget.limit * self.reserve[priority], now) for budget in budgets
+                )
+                if wait == 0:
+                    for budget in budgets:
+                        budget.consume()
+                    self.stats['calls'] += 1
+                    if waited:
+                        self.stats['waited'] += 1
+                        self.stats['wait_seconds'] += waited
+                    return waited
+
+            if priority >= PRIORITY_LOW and now + wait > deadline:
+                self.stats['deferred'] += 1
+                raise RateLimitDeferred(f"Rate limit budget reserved, {kind} call deferred")
+            sleep = min(wait, 1.0)
+            time.sleep(sleep)
+            waited += sleep
+
+    def on_response(self, kind, headers):
+        """x-ratelimit-* başlıklarıyla bütçeleri düzelt"""
+        if not headers:
+            return
+        with self.lock:
+            remaining = headers.get('x-ratelimit-remaining')
+            if remaining is not None:
+                reset = headers.get('x-ratelimit-reset')
+                limit = headers.get('x-ratelimit-limit')
+                self.budgets['general'].on_headers(
+                    int(remaining), int(limit) if limit else None, int(reset) if reset else None
+                )
+            remaining_1s = headers.get('x-ratelimit-remaining-1s')
+            if kind == 'order' and remaining_1s is not None:
+                self.budgets['order'].on_headers(int(remaining_1s))
+
+    def on_rate_limited(self, kind, headers):
+        """429 sonrası Retry-After boyunca ilgili bütçeleri kapat"""
+        retry_after = float((headers or {}).get('retry-after') or self.config['default_retry_after'])
+        self.stats['rate_limited'] += 1
+        with self.lock:
+            for budget in self._budgets_for(kind):
+                budget.on_rate_limited(retry_after)
+        self.logger.warning(f"Rate limited on {kind} endpoint, backing off {retry_after:.0f}s")
+
+    def install(self, exchange, default_priority=PRIORITY_NORMAL):
+        """
+        ccxt örneğinin REST çağrılarını bütçeye bağla
+
+        Args:
+            default_priority: priority() bağlamı yoksa emir dışı çağrıların önceliği
+        """
+        exchange.enableRateLimit = False
+        fetch2 = exchange.fetch2
+
+        def limited_fetch2(path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+            kind = 'order' if path in ORDER_PATHS and method != 'GET' else 'general'
+            priority = getattr(self.local, 'priority', None)
+            if priority is None:
+                priority = PRIORITY_CRITICAL if kind == 'order' else default_priority
+            self.acquire(kind, priority)
+            try:
+                return fetch2(path, api, method, params, headers, body, config)
+            except (ccxt.RateLimitExceeded, ccxt.DDoSProtection):
+                self.on_rate_limited(kind, exchange.last_response_headers)
+                raise
+            finally:
+                self.on_response(kind, exchange.last_response_headers)
+
+        exchange.fetch2 = limited_fetch2
+        return exchange
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                **self.stats,
+                'budgets': {
+                    name: {'remaining': budget.remaining, 'limit': budget.limit}
+                    for name, budget in self.budgets.items()
+                }
+            }
+
+
+def get_rate_limit_manager(config=None):
+    """Süreç genelindeki tek yönetici, ilk çağrıda config ile oluşturulur"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            if config is None:
+                from settings import RATE_LIMIT_CONFIG
+                config = RATE_LIMIT_CONFIG
+            _manager = RateLimitManager(config)
+        return _manager
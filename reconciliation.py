@@ -0,0 +1,258 @@
+# modules/reconciliation.py
+
+import logging
+import threading
+import time
+from collections import deque
+
+# Karşılaştırmada dikkate alınan emir / pozisyon alanları
+ORDER_FIELDS = ('status', 'amount', 'price', 'stopPrice', 'filled')
+POSITION_FIELDS = ('contracts', 'side', 'entryPrice', 'liquidationPrice', 'leverage')
+
+
+def _position_key(position):
+    """ccxt birleşik sembol yerine exchange'in ham sembolü (XBTUSDT)"""
+    return (position.get('info') or {}).get('symbol') or position['symbol']
+
+
+class PositionReconciler:
+    def __init__(self, exchange, symbol, config):
+        """
+        Emir, pozisyon ve dolumların tek kaynaklı yerel modeli
+
+        Her turda üç toplu çağrı yapılır (açık emirler, pozisyonlar, son
+        dolumlar), sonuç yerel modelle karşılaştırılır ve sadece fark varsa
+        dinleyicilere düzeltme gönderilir. Diğer bileşenler pozisyonu
+        buradan okur, exchange'e ayrıca sormaz.
+        """
+        self.exchange = exchange
+        self.symbol = symbol
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self.lock = threading.Lock()
+        self.listeners = []
+
+        self.positions = {}  # ham sembol -> ccxt pozisyonu
+        self.open_orders = {}  # emir id -> ccxt emri
+        self.seen_trades = deque(maxlen=config['trade_memory'])
+        self.seen_trade_ids = set()
+        self.last_trade_ts = None
+        self.synced_at = None
+        self.stats = {'runs': 0, 'corrections': 0, 'fills': 0, 'errors': 0, 'last_duration_ms': 0.0}
+
+    def add_listener(self, callback):
+        """Düzeltmelerde callback(kind, payload) çağrılır: 'fill' / 'position' / 'orders' sırasıyla"""
+        self.listeners.append(callback)
+
+    def _emit(self, kind, payload):
+        for callback in self.listeners:
+            try:
+                callback(kind, payload)
+            except Exception as e:
+                self.logger.error(f"Reconciliation listener error: {e}")
+
+    def run_once(self):
+        """Exchange durumunu çek ve yerel modelle uzlaştır (executor'da çağrılmalı)"""
+        started = time.perf_counter()
+        # Bu andan (pay dahil) sonra gönderilen emirler listede olmayabilir
+        cutoff = time.time() - self.config['order_grace']
+        try:
+            orders = self.exchange.fetch_open_orders(self.symbol)
+            positions = self.exchange.fetch_positions()
+            since = self.last_trade_ts + 1 if self.last_trade_ts else None
+            trades = self.exchange.fetch_my_trades(self.symbol, since, self.config['trade_limit'])
+        except Exception as e:
+            self.stats['errors'] += 1
+            self.logger.error(f"Reconciliation fetch error: {e}")
+            return False
+
+        position_changes = self._diff_positions(positions)
+        order_changes = self._diff_orders(orders)
+        fills = self._new_fills(trades)
+        self.synced_at = time.time()
+
+        # Dolumlar önce: emir kaydı 'orders' ile silinmeden kayma eşleştirilebilsin
+        for trade in fills:
+            self._emit('fill', trade)
+        if position_changes:
+            self._emit('position', {'positions': list(self.positions.values()), 'changes': position_changes})
+        if order_changes:
+            self._emit('orders', {'open_ids': set(self.open_orders), 'cutoff': cutoff, **order_changes})
+
+        corrections = bool(position_changes) + bool(order_changes)
+        self.stats['runs'] += 1
+        self.stats['corrections'] += corrections
+        self.stats['fills'] += len(fills)
+        self.stats['last_duration_ms'] = (time.perf_counter() - started) * 1000
+        if corrections:
+            self.logger.info(
+                "Reconciliation corrections applied",
+                extra={
+                    'position_changes': len(position_changes),
+                    'orders_added': len(order_changes.get('added', [])),
+                    'orders_removed': len(order_changes.get('removed', [])),
+                    'orders_changed': len(order_changes.get('changed', []))
+                }
+            )
+        return True
+
+    def _diff_positions(self, positions):
+        remote = {_position_key(position): position for position in positions if position.get('contracts')}
+        changes = []
+        with self.lock:
+            for key in set(remote) | set(self.positions):
+                local, fresh = self.positions.get(key), remote.get(key)
+                if local is None or fresh is None or any(
+                    local.get(field) != fresh.get(field) for field in POSITION_FIELDS
+                ):
+                    changes.append(key)
+            if changes:
+                self.positions = remote
+            else:
+                # Fark yoksa da PnL / mark fiyatı gibi alanlar güncel tutulur
+                self.positions.update(remote)
+        return changes
+
+    def _diff_orders(self, orders):
+        remote = {order['id']: order for order in orders}
+        with self.lock:
+            added = [order_id for order_id in remote if order_id not in self.open_orders]
+            removed = [order_id for order_id in self.open_orders if order_id not in remote]
+            changed = [
+                order_id for order_id in remote
+                if order_id in self.open_orders and any(
+                    self.open_orders[order_id].get(field) != remote[order_id].get(field)
+                    for field in ORDER_FIELDS
+                )
+            ]
+            self.open_orders = remote
+        if not (added or removed or changed):
+            return {}
+        return {'added': added, 'removed': removed, 'changed': changed}
+
+    def _new_fills(self, trades):
+        fills = []
+        for trade in trades:
+            if trade['id'] in self.seen_trade_ids:
+                continue
+            if len(self.seen_trades) == self.seen_trades.maxlen:
+                self.seen_trade_ids.discard(self.seen_trades[0])
+            self.seen_trades.append(trade['id'])
+            self.seen_trade_ids.add(trade['id'])
+            fills.append(trade)
+            if trade.get('timestamp'):
+                self.last_trade_ts = max(self.last_trade_ts or 0, trade['timestamp'])
+        return fills
+
+    def get_position(self, symbol=None):
+        """Yerel modeldeki ccxt pozisyonu (ham veya birleşik sembolle)"""
+        symbol = symbol or self.symbol
+        with self.lock:
+            for key, position in self.positions.items():
+                if symbol in (key, position['symbol']):
+                    return position
+        return None
+
+    def get_positions(self):
+        with self.lock:
+            return list(self.positions.values())
+
+    def get_open_orders(self):
+        with self.lock:
+            return list(self.open_orders.values())
+
+    def get_stats(self):
+        return {**self.stats, 'synced_at': self.synced_at, 'open_orders': len(self.open_orders)}
+
+
+class FillLedger:
+    def __init__(self, multiplier=1.0, inverse=False, started_at=None):
+        """
+        Dolumlardan net pozisyon ve gerçekleşen PnL
+
+        Pozisyonu azaltan her dolum için ortalama giriş fiyatına göre PnL
+        hesaplanır (uzlaşma para birimi cinsinden). Başlangıçtan önceki
+        dolumlar (reconciler'ın ilk turda çektiği geçmiş) yok sayılır;
+        mevcut pozisyon seed() ile yüklenir.
+        """
+        self.multiplier = multiplier
+        self.inverse = inverse
+        self.started_at = started_at if started_at is not None else time.time() * 1000
+        self.size = 0.0  # İşaretli kontrat sayısı
+        self.entry_price = 0.0
+        self.seeded = False
+        self._reset_round_trip()
+
+    def _reset_round_trip(self):
+        """Açık pozisyonun kapanışa kadar biriken kapanan miktar, PnL ve komisyonu"""
+        self.closed_quantity = 0.0
+        self.exit_notional = 0.0
+        self.round_trip_pnl = 0.0
+        self.round_trip_fees = 0.0
+
+    def seed(self, position):
+        """Reconciler'ın ccxt pozisyonuyla başlangıç durumu"""
+        if position and position.get('contracts'):
+            sign = -1 if position.get('side') == 'short' else 1
+            self.size = sign * float(position['contracts'])
+            self.entry_price = float(position.get('entryPrice') or 0.0)
+        self.seeded = True
+
+    def _pnl(self, quantity, entry, exit_price):
+        """quantity: kapanan işaretli miktar (long için pozitif)"""
+        if self.inverse:
+            return quantity * self.multiplier * (1 / entry - 1 / exit_price)
+        return quantity * self.multiplier * (exit_price - entry)
+
+    def apply(self, trade):
+        """
+        ccxt dolumunu uygula
+
+        Returns:
+            dict: RiskManager.on_fill girdisi (pnl, fee, closed); pozisyon
+                  kapandıysa position altında side, size, entry_price,
+                  exit_price ve komisyon sonrası pnl; başlangıç öncesi dolumda None
+        """
+        if (trade.get('timestamp') or 0) < self.started_at:
+            return None
+        price = float(trade['price'])
+        quantity = float(trade['amount']) * (1 if trade['side'] == 'buy' else -1)
+        fee = float((trade.get('fee') or {}).get('cost') or 0.0)
+        previous, entry = self.size, self.entry_price
+        size = previous + quantity
+
+        closed = 0.0
+        if previous and (previous > 0) != (quantity > 0):
+            # Pozisyonu azaltan kısım, işaret pozisyon yönünde
+            closed = min(abs(quantity), abs(previous)) * (1 if previous > 0 else -1)
+
+        if not size:
+            self.entry_price = 0.0
+        elif not closed:
+            # Açılış / ekleme: ağırlıklı ortalama giriş
+            self.entry_price = (entry * abs(previous) + price * abs(quantity)) / abs(size)
+        elif (size > 0) != (previous > 0):
+            # Yön değişti: kalan miktar dolum fiyatından yeni pozisyon
+            self.entry_price = price
+        self.size = size
+
+        pnl = self._pnl(closed, entry, price) if closed else 0.0
+        self.round_trip_pnl += pnl
+        self.round_trip_fees += fee
+        self.closed_quantity += abs(closed)
+        self.exit_notional += abs(closed) * price
+
+        result = {'pnl': pnl, 'fee': fee, 'closed': False, 'position': None}
+        if closed and (not size or (size > 0) != (previous > 0)):
+            # Pozisyon sıfırlandı veya yön değişti: tamamlanan işlem
+            result['closed'] = True
+            result['position'] = {
+                'side': 'long' if previous > 0 else 'short',
+                'size': self.closed_quantity,
+                'entry_price': entry,
+                'exit_price': self.exit_notional / self.closed_quantity,
+                'pnl': self.round_trip_pnl - self.round_trip_fees,
+                'timestamp': trade.get('timestamp')
+            }
+            self._reset_round_trip()
+        return result
@@ -1,24 +1,53 @@
 import logging
-from datetime import datetime, time
+import time
+from datetime import datetime
 import pandas as pd
 
+# can_trade engel nedenleri
+BLOCK_TRADING_HOURS = 'trading_hours'
+BLOCK_MAX_TRADES = 'max_trades_per_day'
+BLOCK_DAILY_LOSS = 'max_daily_loss'
+BLOCK_DRAWDOWN = 'max_drawdown'
+BLOCK_MIN_BALANCE = 'min_balance'
+
+BLOCK_MESSAGES = {
+    BLOCK_TRADING_HOURS: "Trading saatleri dışında",
+    BLOCK_MAX_TRADES: "Günlük işlem limiti aşıldı",
+    BLOCK_DAILY_LOSS: "Günlük kayıp limiti aşıldı",
+    BLOCK_DRAWDOWN: "Maximum drawdown aşıldı",
+    BLOCK_MIN_BALANCE: "Yetersiz bakiye"
+}
+
+MIN_FREE_BALANCE = 0.0001  # Minimum serbest bakiye (uzlaşma para birimi)
+MIN_POSITION_SIZE = 0.001  # 0.001 BTC minimum
+MIN_TICK = 0.5  # Minimum hareket (0.5$ for XBTUSD)
+
+
+def _parse_minutes(value):
+    """'HH:MM' -> gün içindeki dakika"""
+    parsed = datetime.strptime(value, '%H:%M')
+    return parsed.hour * 60 + parsed.minute
+
+
 class RiskManager:
     def __init__(self, trader, config):
         """
         Risk yönetimi için ana sınıf
-        
+
+        Limitler konfigürasyon yüklenirken hesaplanır, bakiye / PnL / drawdown
+        fill ve bakiye olaylarıyla güncellenir. can_trade ve pozisyon
+        büyüklüğü hesabı I/O yapmaz.
+
         Args:
             trader: BitmexTrader instance
             config: TradingConfig instance
         """
         self.trader = trader
-        self.config = config
         self.logger = logging.getLogger(__name__)
-        
+
         # İstatistikler
         self.daily_trades = 0
         self.daily_loss = 0
-        self.initial_balance = self._get_initial_balance()
         self.max_drawdown = 0
         self.daily_stats = {
             'trades': 0,
@@ -26,20 +55,148 @@ class RiskManager:
             'losses': 0,
             'pnl': 0.0
         }
-        
+
+        # Olaylarla güncellenen hesap durumu
+        self.balance = 0.0
+        self.free_balance = 0.0
+        self.realized_pnl = 0.0
+        self.drawdown = 0.0
+        self.leverage = 1
+        self.block_reason = None
+        self.current_day = None
+        self.portfolio = None
+
+        self.load_config(config)
+        self.initial_balance = self._get_initial_balance()
         self._reset_daily_stats()
+        self._update_limits()
+        self.current_day = time.localtime().tm_yday
+
+    def load_config(self, config):
+        """Konfigürasyonu yükle ve limit eşiklerini önceden hesapla"""
+        self.config = config
+        self.session_start = _parse_minutes(config.TRADING_HOURS['START'])
+        self.session_end = _parse_minutes(config.TRADING_HOURS['END'])
+        self.max_trades = config.MAX_TRADES_PER_DAY
+        self.daily_loss_fraction = config.MAX_DAILY_LOSS_PERCENT / 100
+        self.max_drawdown_percent = config.MAX_DRAWDOWN_PERCENT
+        self.position_size_fraction = config.POSITION_SIZE_PERCENT / 100
+        self.stop_loss_fraction = config.STOP_LOSS_PERCENT / 100
+        self.leverage = min(config.MAX_LEVERAGE, self.leverage) if config.USE_LEVERAGE else 1
+        self._update_limits()
+
+    def apply_recommended_limits(self, limits, tighten_only=True, sizing_config=None):
+        """
+        Monte Carlo önerilen limitlerini uygula
+
+        Args:
+            limits: TradingConfig nitelik adı -> değer (MAX_DRAWDOWN_PERCENT,
+                    MAX_DAILY_LOSS_PERCENT, POSITION_SIZE_PERCENT)
+            tighten_only: Sadece mevcut limitten sıkı olan öneriler uygulanır
+            sizing_config: Emirleri boyutlandıran sözlük (AdvancedOrderManager.config);
+                           verilirse POSITION_SIZE_PERCENT buradaki değerle
+                           karşılaştırılır ve buraya da yazılır
+
+        Returns:
+            dict: Uygulanan değişiklikler, ad -> (eski, yeni)
+        """
+        applied = {}
+        for name in ('MAX_DRAWDOWN_PERCENT', 'MAX_DAILY_LOSS_PERCENT', 'POSITION_SIZE_PERCENT'):
+            if limits.get(name) is None:
+                continue
+            sizing = name == 'POSITION_SIZE_PERCENT' and sizing_config is not None
+            current = sizing_config['position_size_percent'] if sizing else getattr(self.config, name)
+            value = float(limits[name])
+            if value <= 0 or value == current or (tighten_only and value > current):
+                continue
+            setattr(self.config, name, value)
+            if sizing:
+                sizing_config['position_size_percent'] = value
+            applied[name] = (current, value)
+
+        if applied:
+            self.load_config(self.config)
+            self.logger.info(
+                "Risk limits updated from Monte Carlo",
+                extra={name: value for name, (_, value) in applied.items()}
+            )
+        return applied
 
     def _get_initial_balance(self):
         """Başlangıç bakiyesini al"""
         try:
-            if hasattr(self.config, 'INITIAL_BALANCE') and self.config.INITIAL_BALANCE:
-                return self.config.INITIAL_BALANCE
-            else:
-                balance = self.trader.exchange.fetch_balance()
-                return float(balance.get('BTC', {}).get('total', 0))
+            self.refresh_balance()
         except Exception as e:
             self.logger.error(f"Initial balance fetch error: {e}")
-            return 0
+
+        if hasattr(self.config, 'INITIAL_BALANCE') and self.config.INITIAL_BALANCE:
+            return self.config.INITIAL_BALANCE
+        return self.balance
+
+    def attach_portfolio(self, portfolio):
+        """Emir kontrollerine portföy risk motorunu ekle"""
+        self.portfolio = portfolio
+
+    def refresh_balance(self):
+        """Bakiyeyi exchange'den çek, trading döngüsü dışında periyodik çağrılır"""
+        balance = self.trader.exchange.fetch_balance()
+        # Dolum PnL'i uzlaşma para biriminde gelir, limitler de aynı birimde tutulur
+        currency = balance[self.config.SETTLEMENT_CURRENCY]
+        self.on_balance(float(currency.get('total') or 0), float(currency.get('free') or 0))
+
+        if self.portfolio:
+            currency = self.portfolio.config['equity_currency']
+            self.portfolio.set_equity(float(balance.get(currency, {}).get('total') or 0))
+
+    def refresh_leverage(self, symbol):
+        """Kaldıracı exchange'den çek ve önbelleğe al"""
+        if not self.config.USE_LEVERAGE:
+            self.leverage = 1
+            return
+        leverage = self.trader.exchange.fetch_leverage(symbol)
+        if isinstance(leverage, dict):
+            leverage = leverage.get('longLeverage') or leverage.get('leverage') or 1
+        self.set_leverage(leverage)
+
+    def set_leverage(self, leverage):
+        """Kaldıraç değişikliğini uygula"""
+        self.leverage = min(self.config.MAX_LEVERAGE, float(leverage)) if self.config.USE_LEVERAGE else 1
+
+    def on_balance(self, total, free):
+        """Bakiye olayı (REST yenileme veya margin akışı)"""
+        self.balance = total
+        self.free_balance = free
+        self._update_limits()
+
+    def on_fill(self, fill):
+        """
+        Fill olayı ile bakiye, gerçekleşen PnL ve drawdown'u güncelle
+
+        Her dolumun komisyon sonrası PnL'i (parçalı kapanış ve giriş
+        komisyonları dahil) günlük kayıp ve drawdown'a yansır; işlem sayısı
+        ve kazanç / kayıp sadece pozisyon kapandığında round-trip PnL ile sayılır.
+
+        Args:
+            fill: {'pnl': gerçekleşen PnL, 'fee': komisyon, 'closed': pozisyon kapandı mı,
+                   'position': kapanan pozisyon (round-trip pnl)}
+        """
+        pnl = fill.get('pnl', 0.0) - fill.get('fee', 0.0)
+        self.realized_pnl += pnl
+        self.balance += pnl
+        self.free_balance += pnl
+        self.daily_stats['pnl'] += pnl
+        self.daily_loss = max(0.0, -self.daily_stats['pnl'])
+        if fill.get('closed', True):
+            self.update_trade_stats((fill.get('position') or {}).get('pnl', pnl))
+        self._update_limits()
+
+    def _update_limits(self):
+        """Bakiyeye bağlı eşikleri güncelle"""
+        self.max_daily_loss = self.balance * self.daily_loss_fraction
+
+        if getattr(self, 'initial_balance', 0):
+            self.drawdown = (self.initial_balance - self.balance) / self.initial_balance * 100
+            self.max_drawdown = max(self.max_drawdown, self.drawdown)
 
     def _reset_daily_stats(self):
         """Günlük istatistikleri sıfırla"""
@@ -52,176 +209,120 @@ class RiskManager:
             'pnl': 0.0
         }
 
-    def can_trade(self):
-        """Trading kurallarını kontrol et"""
-        try:
-            # Trading saatlerini kontrol et
-            if not self._check_trading_hours():
-                self.logger.info("Trading saatleri dışında")
-                return False
+    def check_trade(self):
+        """Trading kurallarını kontrol et, (izin, engel nedeni) döndür"""
+        now = time.localtime()
 
-            # Günlük işlem limitini kontrol et
-            if self.daily_trades >= self.config.MAX_TRADES_PER_DAY:
-                self.logger.info("Günlük işlem limiti aşıldı")
-                return False
+        # Gün değiştiyse günlük sayaçları sıfırla
+        if now.tm_yday != self.current_day:
+            self.current_day = now.tm_yday
+            self._reset_daily_stats()
 
-            # Günlük kayıp limitini kontrol et
-            if abs(self.daily_loss) > self._get_max_daily_loss():
-                self.logger.info("Günlük kayıp limiti aşıldı")
-                return False
+        # Trading saatlerini kontrol et
+        minute = now.tm_hour * 60 + now.tm_min
+        if self.session_start <= self.session_end:
+            in_session = self.session_start <= minute <= self.session_end
+        else:  # Gece yarısını kapsayan saat aralığı
+            in_session = minute >= self.session_start or minute <= self.session_end
+        if not in_session:
+            return False, BLOCK_TRADING_HOURS
 
-            # Drawdown kontrolü
-            if self._check_drawdown():
-                self.logger.info("Maximum drawdown aşıldı")
-                return False
+        # Günlük işlem limitini kontrol et
+        if self.daily_trades >= self.max_trades:
+            return False, BLOCK_MAX_TRADES
 
-            # Balance kontrolü
-            if not self._check_minimum_balance():
-                self.logger.info("Yetersiz bakiye")
-                return False
+        # Günlük kayıp limitini kontrol et
+        if abs(self.daily_loss) > self.max_daily_loss:
+            return False, BLOCK_DAILY_LOSS
 
-            return True
+        # Drawdown kontrolü
+        if self.drawdown > self.max_drawdown_percent:
+            return False, BLOCK_DRAWDOWN
 
-        except Exception as e:
-            self.logger.error(f"Can trade check error: {e}")
-            return False
+        # Balance kontrolü
+        if self.free_balance <= MIN_FREE_BALANCE:
+            return False, BLOCK_MIN_BALANCE
 
-    def _check_minimum_balance(self):
-        """Minimum işlem bakiyesini kontrol et"""
-        try:
-            balance = self.trader.exchange.fetch_balance()
-            free_balance = float(balance['BTC']['free'])
-            return free_balance > 0.0001  # Minimum 0.0001 BTC gerekli
-        except Exception as e:
-            self.logger.error(f"Balance check error: {e}")
-            return False
+        return True, None
 
-    def calculate_position_size(self, side, entry_price):
-        """Pozisyon büyüklüğünü hesapla"""
-        try:
-            balance = self.trader.exchange.fetch_balance()
-            free_balance = float(balance['BTC']['free'])
-
-            # Risk bazlı pozisyon büyüklüğü
-            risk_amount = free_balance * (self.config.POSITION_SIZE_PERCENT / 100)
-            
-            # Stop loss mesafesini hesapla
-            stop_price = self.calculate_stop_loss(side, entry_price)
-            if stop_price is None:
-                return 0
-                
-            risk_per_coin = abs(entry_price - stop_price)
-            
-            # Sıfıra bölme kontrolü
-            if risk_per_coin == 0:
-                self.logger.error("Risk per coin cannot be zero")
-                return 0
-                
-            position_size = risk_amount / risk_per_coin
-            
-            # Kaldıraç kullan
-            if self.config.USE_LEVERAGE:
-                current_leverage = min(
-                    self.config.MAX_LEVERAGE, 
-                    self.trader.exchange.fetch_leverage()
-                )
-                position_size *= current_leverage
-
-            # Minimum ve maksimum kontrolleri
-            min_size = 0.001  # 0.001 BTC minimum
-            max_size = free_balance * current_leverage * 0.95  # Bakiyenin %95'i
-
-            position_size = max(min_size, min(position_size, max_size))
-            return round(position_size, 8)
+    def can_trade(self):
+        """Trading kurallarını kontrol et"""
+        allowed, reason = self.check_trade()
 
-        except Exception as e:
-            self.logger.error(f"Position size calculation error: {e}")
-            return 0
+        # Sadece durum değiştiğinde logla
+        if reason != self.block_reason:
+            if reason:
+                self.logger.info(BLOCK_MESSAGES[reason])
+            self.block_reason = reason
 
-    def calculate_stop_loss(self, side, entry_price):
-        """Stop loss seviyesini hesapla"""
-        try:
-            stop_percent = self.config.STOP_LOSS_PERCENT / 100
-            
-            if side == 'buy':
-                stop_price = entry_price * (1 - stop_percent)
-            else:
-                stop_price = entry_price * (1 + stop_percent)
+        return allowed
 
-            # Minimum hareket kontrolü (0.5$ for XBTUSD)
-            min_tick = 0.5
-            stop_price = round(stop_price / min_tick) * min_tick
+    def check_order(self, symbol, side, amount, price):
+        """Trading kuralları ve portföy durumuna göre emir kontrolü"""
+        allowed, reason = self.check_trade()
+        if allowed and self.portfolio:
+            allowed, reason = self.portfolio.check_order(symbol, side, amount, price)
 
-            return round(stop_price, 1)
+        if reason != self.block_reason:
+            if reason:
+                self.logger.info(f"Order blocked: {BLOCK_MESSAGES.get(reason, reason)}")
+            self.block_reason = reason
+        return allowed
 
-        except Exception as e:
-            self.logger.error(f"Stop loss calculation error: {e}")
-            return None
+    def calculate_position_size(self, side, entry_price):
+        """Pozisyon büyüklüğünü hesapla"""
+        # Risk bazlı pozisyon büyüklüğü
+        risk_amount = self.free_balance * self.position_size_fraction
 
-    def _check_trading_hours(self):
-        """Trading saatlerini kontrol et"""
-        try:
-            now = datetime.now().time()
-            start = datetime.strptime(self.config.TRADING_HOURS['START'], '%H:%M').time()
-            end = datetime.strptime(self.config.TRADING_HOURS['END'], '%H:%M').time()
-            
-            if start <= end:
-                return start <= now <= end
-            else:  # Gece yarısını kapsayan saat aralığı
-                return now >= start or now <= end
+        # Stop loss mesafesini hesapla
+        stop_price = self.calculate_stop_loss(side, entry_price)
+        risk_per_coin = abs(entry_price - stop_price)
 
-        except Exception as e:
-            self.logger.error(f"Trading hours check error: {e}")
-            return False
+        # Sıfıra bölme kontrolü
+        if risk_per_coin == 0:
+            self.logger.error("Risk per coin cannot be zero")
+            return 0
 
-    def _get_max_daily_loss(self):
-        """Maksimum günlük kayıp limitini hesapla"""
-        try:
-            current_balance = float(self.trader.exchange.fetch_balance()['BTC']['total'])
-            return current_balance * (self.config.MAX_DAILY_LOSS_PERCENT / 100)
-        except Exception as e:
-            self.logger.error(f"Max daily loss calculation error: {e}")
-            return float('inf')  # Hata durumunda limitsiz
+        # Kaldıraç kullan
+        position_size = risk_amount / risk_per_coin * self.leverage
 
-    def _check_drawdown(self):
-        """Drawdown kontrolü"""
-        try:
-            if self.initial_balance == 0:
-                return False
-                
-            current_balance = float(self.trader.exchange.fetch_balance()['BTC']['total'])
-            drawdown = (self.initial_balance - current_balance) / self.initial_balance * 100
-            
-            self.max_drawdown = max(self.max_drawdown, drawdown)
-            
-            return drawdown > self.config.MAX_DRAWDOWN_PERCENT
+        # Minimum ve maksimum kontrolleri
+        max_size = self.free_balance * self.leverage * 0.95  # Bakiyenin %95'i
 
-        except Exception as e:
-            self.logger.error(f"Drawdown check error: {e}")
-            return True  # Hata durumunda güvenli tarafta kal
+        position_size = max(MIN_POSITION_SIZE, min(position_size, max_size))
+        return round(position_size, 8)
+
+    def calculate_stop_loss(self, side, entry_price):
+        """Stop loss seviyesini hesapla"""
+        if side == 'buy':
+            stop_price = entry_price * (1 - self.stop_loss_fraction)
+        else:
+            stop_price = entry_price * (1 + self.stop_loss_fraction)
+
+        stop_price = round(stop_price / MIN_TICK) * MIN_TICK
+        return round(stop_price, 1)
 
     def update_trade_stats(self, pnl):
-        """İşlem istatistiklerini güncelle"""
-        try:
-            self.daily_trades += 1
-            self.daily_stats['trades'] += 1
-            self.daily_stats['pnl'] += pnl
-            
-            if pnl >= 0:
-                self.daily_stats['wins'] += 1
-            else:
-                self.daily_stats['losses'] += 1
-                self.daily_loss += abs(pnl)
+        """
+        Kapanan işlem istatistiklerini güncelle
 
-        except Exception as e:
-            self.logger.error(f"Stats update error: {e}")
+        Args:
+            pnl: İşlemin round-trip PnL'i (günlük PnL ve kayba on_fill'de eklenir)
+        """
+        self.daily_trades += 1
+        self.daily_stats['trades'] += 1
 
-    def get_risk_metrics(self):
-        """Risk metriklerini getir"""
+        if pnl >= 0:
+            self.daily_stats['wins'] += 1
+        else:
+            self.daily_stats['losses'] += 1
+
+    def get_risk_metrics(self, position=None, fetch_position=True):
+        """Risk metriklerini getir, pozisyon zaten alındıysa fetch_position=False"""
         try:
-            position = self.trader.get_position()
-            balance = self.trader.exchange.fetch_balance()
-            
+            if fetch_position:
+                position = self.trader.get_position()
+
             metrics = {
                 'position': {
                     'active': position is not None,
@@ -231,29 +332,66 @@ class RiskManager:
                     'leverage': position['leverage'] if position else 0
                 },
                 'account': {
-                    'balance': balance['BTC']['total'],
-                    'free': balance['BTC']['free'],
-                    'used': balance['BTC']['used'],
+                    'balance': self.balance,
+                    'free': self.free_balance,
+                    'used': self.balance - self.free_balance,
+                    'realized_pnl': self.realized_pnl,
+                    'drawdown': self.drawdown,
                     'max_drawdown': self.max_drawdown
                 },
                 'daily_stats': {
                     'trades': self.daily_stats['trades'],
                     'wins': self.daily_stats['wins'],
                     'losses': self.daily_stats['losses'],
-                    'win_rate': (self.daily_stats['wins'] / self.daily_stats['trades'] * 100) 
+                    'win_rate': (self.daily_stats['wins'] / self.daily_stats['trades'] * 100)
                               if self.daily_stats['trades'] > 0 else 0,
-                    'pnl': self.daily_stats['pnl']
-                }
+                    'pnl': self.daily_stats['pnl'],
+                    'max_drawdown': self.max_drawdown
+                },
+                'portfolio': self.portfolio.get_summary() if self.portfolio else {},
+                'block_reason': self.block_reason
             }
-            
+
             return metrics
-            
+
         except Exception as e:
             self.logger.error(f"Risk metrics calculation error: {e}")
             return None
 
+    def export_state(self):
+        """Warm-start için sayaçlar, drawdown ve başlangıç bakiyesi"""
+        return {
+            'initial_balance': self.initial_balance,
+            'balance': self.balance,
+            'free_balance': self.free_balance,
+            'realized_pnl': self.realized_pnl,
+            'max_drawdown': self.max_drawdown,
+            'daily_trades': self.daily_trades,
+            'daily_loss': self.daily_loss,
+            'daily_stats': dict(self.daily_stats),
+            'current_day': self.current_day
+        }
+
+    def restore_state(self, state):
+        """Kayıtlı sayaçları yükle, drawdown takibi kaldığı yerden devam eder"""
+        self.initial_balance = state['initial_balance'] or self.initial_balance
+        self.realized_pnl = state['realized_pnl']
+        self.max_drawdown = state['max_drawdown']
+        if not self.balance:
+            # Exchange'e ulaşılamadıysa son bilinen bakiye
+            self.balance = state['balance']
+            self.free_balance = state['free_balance']
+
+        if state['current_day'] == time.localtime().tm_yday:
+            self.daily_trades = state['daily_trades']
+            self.daily_loss = state['daily_loss']
+            self.daily_stats = dict(state['daily_stats'])
+        self._update_limits()
+
     def reset(self):
         """Risk yöneticisini sıfırla"""
         self._reset_daily_stats()
-        self.initial_balance = self._get_initial_balance()
         self.max_drawdown = 0
+        self.realized_pnl = 0.0
+        self.initial_balance = self._get_initial_balance()
+        self._update_limits()
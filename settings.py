@@ -11,39 +11,198 @@ API_CONFIG = {
    'testnet': os.getenv('USE_TESTNET', 'True').lower() == 'true'
 }
 
+RATE_LIMIT_CONFIG = {
+   # BitMEX: REST genelinde dakikada 120, emir uç noktalarında ayrıca saniyede 10 istek
+   'general_limit': 120,
+   'general_window': 60,
+   'order_limit': 10,
+   'order_window': 1,
+   'reserve_normal': 0.1,  # Normal öncelikli çağrıların dokunamayacağı pay
+   'reserve_low': 0.4,  # Dashboard / izleme / bakiye çağrıları için
+   'max_defer': 30,  # Düşük öncelikli çağrı en fazla bu kadar bekler (saniye)
+   'default_retry_after': 5
+}
+
+SUPERVISOR_CONFIG = {
+   'max_retries': 3,  # Ağ hatasında idempotent çağrılar için
+   'backoff_base': 0.25,  # saniye, her denemede iki katı (jitter'lı)
+   'backoff_max': 5,
+   'breaker_threshold': 5,  # Art arda hata sayısı, uç nokta başına
+   'breaker_reset': 30,  # Açık devre kesicinin deneme öncesi bekleme süresi
+   'stale_feed_after': 15,  # Bu süre piyasa verisi gelmezse güvenli mod
+   'safe_mode_min_duration': 30
+}
+
+RECONCILIATION_CONFIG = {
+   'interval': 5,  # Emir / pozisyon / dolum uzlaştırma aralığı (saniye)
+   'trade_limit': 100,  # Turda çekilen en fazla dolum
+   'trade_memory': 1000,  # Tekrar işlenmemesi için hatırlanan dolum id sayısı
+   'order_grace': 2  # Açık emir listesi çekilmeden bu kadar önce gönderilen emirler de silinmez (saniye)
+}
+
 TELEGRAM_CONFIG = {
    'token': os.getenv('TELEGRAM_TOKEN'),
    'chat_id': os.getenv('TELEGRAM_CHAT_ID'),
-   'use_telegram': os.getenv('USE_TELEGRAM', 'True').lower() == 'true'
+   'use_telegram': os.getenv('USE_TELEGRAM', 'True').lower() == 'true',
+   'rate_per_second': 1,  # Chat başına mesaj hızı (Telegram flood limiti)
+   'burst': 3,
+   'coalesce_window': 60,  # Aynı uyarının tekrarları bu süre boyunca özetlenir
+   'batch_max_chars': 3500,
+   'max_retries': 5,
+   'retry_backoff': 1.0,
+   'queue_size': 1000,
+   'report_interval': 86400  # Periyodik işlem analizi grafiği (saniye), 0 kapalı
 }
 
 TRADING_CONFIG = {
    'symbol': 'XBTUSDT',
+   'settlement_currency': 'USDT',  # Bakiye, PnL ve limitlerin para birimi
    'position_size_percent': 25,
    'max_leverage': 10,
    'stop_loss_percent': 1.5,
    'trailing_stop': True,
+   'trailing_stop_percent': 1.5,
+   'trailing_step_ticks': 10,  # Stop bu kadar tick ilerlemeden amend gönderilmez
+   'native_trailing_stop': os.getenv('NATIVE_TRAILING_STOP', 'False').lower() == 'true',
+   'max_amends_per_second': 2,
+   'tick_size': 0.5,
+   'slippage_window': 50,  # Beklenen kayma için kullanılan son dolum sayısı
+   'slippage_history': 1000,  # Bellekte tutulan son dolum sayısı
+   'thin_book_penalty_percent': 0.1,  # Görünür derinliğin ötesindeki miktar için ek kayma
    'atr_period': 7,
    'atr_multiplier': 7,
    'renko_brick_size': 125,
-   'min_volume': 1000000
+   'min_volume': 1000000,
+   'timeframes': ['1m', '5m', '15m', '1h'],
+   'candle_capacity': 500,
+   'ohlcv_page_limit': 1000,  # fetch_ohlcv tek istekte dönen en fazla mum
+   'indicator_cache_entries': 512,
+   'indicator_cache_mb': 64
 }
 
 SYSTEM_CONFIG = {
    'log_level': os.getenv('LOG_LEVEL', 'INFO'),
+   'log_json': os.getenv('LOG_JSON', 'True').lower() == 'true',
+   'log_sampling': {  # Logger adı -> tick başına DEBUG kayıtlarının geçirilme oranı, emir / fill kayıtları (INFO) hep yazılır
+       'trailing_stop': 0.2,
+       'execution': 0.5
+   },
    'data_dir': 'data',
    'log_dir': 'logs',
-   'db_path': os.getenv('DB_PATH', 'data/trading.db')
+   'db_path': os.getenv('DB_PATH', 'data/trading.db'),
+   'state_file': os.getenv('STATE_FILE', 'data/state.pkl'),
+   'trade_db': os.getenv('TRADE_DB', 'data/trades.db'),
+   'state_snapshot_interval': 10,  # Warm-start snapshot aralığı (saniye)
+   'state_max_age': 86400  # Bundan eski snapshot ile soğuk başlangıç yapılır
 }
 
 DASHBOARD_CONFIG = {
    'host': '0.0.0.0', 
    'port': int(os.getenv('DASHBOARD_PORT', '8050')),
-   'debug': False
+   'debug': False,
+   'mode': os.getenv('DASHBOARD_MODE', 'inprocess'),  # inprocess / external (dashboard_server.py)
+   'chart_bars': 200,  # Snapshot'a konan mum sayısı
+   'depth_interval': 1.0,  # Derinlik geçmişi örnekleme aralığı (saniye)
+   'depth_capacity': 3600,  # Saklanan örnek sayısı
+   'depth_rows': 200,  # Fiyat kovası sayısı
+   'depth_bucket_ticks': 2  # Kova genişliği (tick)
+}
+
+STATE_BUS_CONFIG = {
+   'backend': os.getenv('STATE_BUS', 'memory'),  # redis / memory (tek süreç, test)
+   'redis_url': os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
+   'channel': os.getenv('STATE_BUS_CHANNEL', 'trading:state'),
+   'serializer': os.getenv('STATE_BUS_SERIALIZER', 'msgpack')  # msgpack / json
 }
 
 API_SERVER_CONFIG = {
    'host': '0.0.0.0',
    'port': int(os.getenv('API_PORT', '8000')),
-   'api_key': os.getenv('API_KEY', 'your-secret-key')
+   'api_key': os.getenv('API_KEY'),  # Zorunlu, yoksa API başlatılmaz
+   'enabled': os.getenv('ENABLE_API', 'False').lower() == 'true',
+   'jwt_secret': os.getenv('JWT_SECRET'),  # Zorunlu, API_KEY'den farklı olmalı
+   'token_ttl': 3600,
+   'stream_interval': 0.5  # WebSocket snapshot kontrol aralığı
+}
+
+
+EXECUTION_CONFIG = {
+   'algo': os.getenv('EXECUTION_ALGO') or None,  # twap / iceberg / ladder, None = tek emir
+   'min_parent_size': float(os.getenv('EXECUTION_MIN_SIZE', '1000')),
+   'tick_size': TRADING_CONFIG['tick_size'],
+   'lot_size': 1,
+   'wheel_tick': 0.05,
+   'poll_interval': 2.0,
+   'depth_levels': 10,
+   'participation_rate': 0.2,  # Karşı taraf görünür derinliğin en fazla bu kadarı
+   'max_slippage_ticks': 4,
+   'twap_duration': 120,
+   'twap_slices': 12,
+   'iceberg_display_fraction': 0.5,
+   'iceberg_timeout': 300,
+   'reprice_ticks': 2,
+   'ladder_levels': 5,
+   'ladder_timeout': 180,
+   'max_tracked_orders': 500  # Dolum kalitesi için gönderim kaydı tutulan emir sayısı
+}
+
+PIPELINE_CONFIG = {
+   'poll_interval': float(os.getenv('POLL_INTERVAL', '1.0')),
+   'queue_size': int(os.getenv('PIPELINE_QUEUE_SIZE', '100')),
+   'executor_workers': int(os.getenv('EXECUTOR_WORKERS', '4')),
+   'monitor_interval': 5,
+   'balance_refresh_interval': 30,
+   'snapshot_interval': 5,  # Telegram / dashboard durum snapshot'ı yenileme aralığı
+   'snapshot_max_age': 30,  # Bu süreden eski snapshot okuyucu tarafından tazelenir
+   'enable_dashboard': os.getenv('ENABLE_DASHBOARD', 'True').lower() == 'true'
+}
+
+PORTFOLIO_RISK_CONFIG = {
+   'equity_currency': 'USDT',
+   'symbols': {
+       # BitMEX XBTUSDT: 1 kontrat = 0.000001 XBT, USDT ile uzlaşır
+       'XBTUSDT': {'multiplier': 0.000001, 'inverse': False}
+   },
+   'returns_interval': 60,  # saniye
+   'var_horizon': 60,  # getiri aralığı cinsinden (60 x 1dk = 1 saat)
+   'stress_shocks': [-0.2, -0.1, -0.05, 0.05, 0.1, 0.2],
+   'max_gross_leverage': 10,
+   'max_var_percent': 5,
+   'max_stress_loss_percent': 25,
+   'min_liquidation_distance_percent': 5
+}
+
+PERFORMANCE_CONFIG = {
+   'starting_equity': float(os.getenv('STARTING_EQUITY', '10000')),  # Drawdown ve getiri oranları için
+   'rolling_trades': 50,  # Son N işlem penceresi
+   'rolling_days': [7, 30],  # Son işleme göre gün pencereleri
+   'min_trades': 10,  # Bundan az işlemde öneri üretilmez
+   'min_win_rate': 0.5,
+   'max_drawdown': 0.2,
+   'max_size_variation': 0.5,  # Pozisyon boyutu std / ortalama
+   'max_size_pnl_correlation': 0.3,  # Boyut-PnL korelasyonu bundan negatifse uyarı
+   'win_rate_decay': 0.15  # Son pencerede genele göre kabul edilen düşüş
+}
+
+MONTE_CARLO_CONFIG = {
+   'enabled': os.getenv('ENABLE_MONTE_CARLO', 'True').lower() == 'true',
+   'interval': 21600,  # Limit kalibrasyonu aralığı (saniye)
+   'apply_limits': os.getenv('MONTE_CARLO_APPLY', 'False').lower() == 'true',  # False: sadece öneri loglanır
+   'tighten_only': True,  # Önerilen limit sadece mevcuttan sıkıysa uygulanır
+   'simulations': 20000,
+   'horizon': 500,  # Yol başına işlem sayısı
+   'trades_per_day': 5,  # Geçmişten tahmin edilemezse
+   'chunk_size': 2500,  # Worker başına yol sayısı
+   'workers': int(os.getenv('MONTE_CARLO_WORKERS', '0')),  # 0 = CPU sayısı
+   'start_method': 'spawn',
+   'min_trades': 30,
+   'quantiles': [0.5, 0.9, 0.95, 0.99],
+   'histogram_bins': 50,
+   'ruin_loss': 0.5,  # Başlangıca göre bu kadar kayıp iflas sayılır
+   'ruin_levels': [0.1, 0.2, 0.3, 0.5],
+   'max_ruin_probability': 0.01,
+   'position_scales': [1.0, 0.75, 0.5, 0.25],
+   'confidence': 0.95,  # Limit önerisinde kullanılan yüzdelik
+   'limit_floor_percent': 1,
+   'limit_ceiling_percent': 50
 }
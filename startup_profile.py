@@ -0,0 +1,67 @@
+# startup_profile.py
+
+import argparse
+import os
+import subprocess
+import sys
+
+# Başsız trading worker'ın yüklememesi gereken opsiyonel alt sistemler
+OPTIONAL_MODULES = ('dash', 'dash_bootstrap_components', 'plotly', 'telegram', 'fastapi', 'uvicorn', 'redis', 'msgpack')
+
+DEFAULT_BUDGET_MS = 1000
+
+
+def profile_import(module):
+    """python -X importtime çıktısını (modül, kendi süresi, kümülatif süre) listesine çevir"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        entries.append((name.strip(), int(self_us), int(cumulative_us), len(name) - len(name.lstrip())))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Başlangıç import süresi profili')
+    parser.add_argument('module', nargs='?', default='main', help='Profillenecek giriş modülü')
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS, help='Toplam import bütçesi')
+    parser.add_argument('--top', type=int, default=15, help='Gösterilecek en pahalı modül sayısı')
+    args = parser.parse_args()
+
+    entries = profile_import(args.module)
+    total_ms = sum(self_us for _, self_us, _, _ in entries) / 1000
+
+    # Sadece üst seviye paketler (girinti 1-2) kümülatif süreyle listelenir
+    top_level = [entry for entry in entries if entry[3] <= 3]
+    print(f"Import profile: {args.module}")
+    for name, _, cumulative_us, _ in sorted(top_level, key=lambda entry: -entry[2])[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+    print(f"Total: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    failures = []
+    loaded = {name.split('.')[0] for name, _, _, _ in entries}
+    optional = sorted(loaded.intersection(OPTIONAL_MODULES))
+    if optional:
+        failures.append(f"optional subsystems imported at startup: {', '.join(optional)}")
+    if total_ms > args.budget_ms:
+        failures.append(f"import time {total_ms:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"✗ {failure}")
+    if not failures:
+        print("✓ Startup within budget")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# modules/state_bus.py
+
+import json
+import logging
+import threading
+import time
+from datetime import date, datetime
+
+from state_snapshot import thaw
+
+
+def _default(value):
+    """numpy skalerleri ve tarihleri serileştirilebilir tiplere çevir"""
+    if hasattr(value, 'item'):
+        return value.item()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class Serializer:
+    def __init__(self, name='msgpack'):
+        """
+        Snapshot serileştirici, msgpack (kompakt) veya json
+
+        msgpack sadece seçildiğinde import edilir.
+        """
+        self.name = name
+        if name == 'msgpack':
+            import msgpack
+            self._packb = lambda state: msgpack.packb(state, default=_default, use_bin_type=True)
+            self._unpackb = lambda payload: msgpack.unpackb(payload, raw=False)
+        elif name == 'json':
+            self._packb = lambda state: json.dumps(state, default=_default, separators=(',', ':')).encode()
+            self._unpackb = json.loads
+        else:
+            raise ValueError(f"Unknown serializer: {name}")
+
+    def encode(self, state):
+        return self._packb(state)
+
+    def decode(self, payload):
+        return self._unpackb(payload)
+
+
+class InMemoryStateBus:
+    def __init__(self):
+        """
+        Tek süreç içi pub/sub, test ve geliştirme için Redis yerine
+
+        Son mesaj saklanır, sonradan abone olan hemen son durumu alır.
+        """
+        self.subscribers = []
+        self.last_payload = None
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def publish(self, payload):
+        with self.lock:
+            self.last_payload = payload
+            subscribers = list(self.subscribers)
+        for callback in subscribers:
+            try:
+                callback(payload)
+            except Exception as e:
+                self.logger.error(f"State bus subscriber error: {e}")
+
+    def subscribe(self, callback):
+        with self.lock:
+            self.subscribers.append(callback)
+            last_payload = self.last_payload
+        if last_payload is not None:
+            callback(last_payload)
+
+    def close(self):
+        with self.lock:
+            self.subscribers.clear()
+
+
+class RedisStateBus:
+    def __init__(self, url, channel):
+        """
+        Redis pub/sub üzerinden durum dağıtımı
+
+        Her yayın kanala gönderilir ve '<kanal>:last' anahtarına yazılır;
+        yeni başlayan dashboard worker'ları ilk durumu bu anahtardan okur.
+        """
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.channel = channel
+        self.last_key = f"{channel}:last"
+        self.pubsub = None
+        self.thread = None
+        self.logger = logging.getLogger(__name__)
+
+    def publish(self, payload):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.set(self.last_key, payload)
+        pipe.publish(self.channel, payload)
+        pipe.execute()
+
+    def subscribe(self, callback):
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(**{self.channel: lambda message: callback(message['data'])})
+
+        last_payload = self.client.get(self.last_key)
+        if last_payload is not None:
+            callback(last_payload)
+
+        self.thread = self.pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def close(self):
+        if self.thread:
+            self.thread.stop()
+        if self.pubsub:
+            self.pubsub.close()
+
+
+def create_state_bus(config):
+    """Yapılandırmaya göre bus oluştur: 'redis' veya 'memory'"""
+    if config['backend'] == 'redis':
+        return RedisStateBus(config['redis_url'], config['channel'])
+    return InMemoryStateBus()
+
+
+class StatePublisher:
+    def __init__(self, bus, serializer):
+        """StateStore snapshot'ını serileştirip bus'a yayınla (executor'da çağrılmalı)"""
+        self.bus = bus
+        self.serializer = serializer
+        self.logger = logging.getLogger(__name__)
+        self.published_version = None
+        self.stats = {'published': 0, 'errors': 0, 'last_bytes': 0, 'last_encode_ms': 0.0}
+
+    def publish(self, snapshot):
+        if snapshot['version'] == self.published_version:
+            return False
+        try:
+            started = time.perf_counter()
+            payload = self.serializer.encode(thaw(snapshot))
+            self.stats['last_encode_ms'] = (time.perf_counter() - started) * 1000
+            self.bus.publish(payload)
+            self.published_version = snapshot['version']
+            self.stats['published'] += 1
+            self.stats['last_bytes'] = len(payload)
+            return True
+
+        except Exception as e:
+            self.stats['errors'] += 1
+            self.logger.error(f"State publish error: {e}")
+            return False
+
+
+class StateSubscriber:
+    def __init__(self, bus, serializer, store):
+        """Bus'tan gelen snapshot'ları yerel StateStore'a aktar"""
+        self.bus = bus
+        self.serializer = serializer
+        self.store = store
+        self.listeners = []
+        self.logger = logging.getLogger(__name__)
+
+    def add_listener(self, callback):
+        """Her yeni snapshot için callback(snapshot) çağrılır"""
+        self.listeners.append(callback)
+
+    def start(self):
+        self.bus.subscribe(self._on_message)
+
+    def _on_message(self, payload):
+        try:
+            state = self.serializer.decode(payload)
+        except Exception as e:
+            self.logger.error(f"State decode error: {e}")
+            return
+
+        previous = self.store.get()
+        snapshot = self.store.mirror(state)
+        if snapshot is previous:
+            return
+        for callback in self.listeners:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                self.logger.error(f"State listener error: {e}")
+
+    def stop(self):
+        self.bus.close()
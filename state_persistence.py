@@ -0,0 +1,72 @@
+# modules/state_persistence.py
+
+import logging
+import os
+import pickle
+import time
+
+SNAPSHOT_VERSION = 1
+
+
+class StatePersistence:
+    def __init__(self, path, max_age=86400):
+        """
+        Yeniden başlatma için durum dosyası
+
+        Dosya önce geçici dosyaya yazılır, fsync sonrası os.replace ile
+        değiştirilir; yarım yazılmış snapshot okunmaz.
+
+        Args:
+            path: Snapshot dosya yolu
+            max_age: Bu süreden (saniye) eski snapshot'lar yüklenmez
+        """
+        self.path = path
+        self.max_age = max_age
+        self.logger = logging.getLogger(__name__)
+        self.last_save_duration = None
+
+    def save(self, state):
+        """Durumu atomik olarak yaz"""
+        started = time.perf_counter()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        payload = {'version': SNAPSHOT_VERSION, 'saved_at': time.time(), 'state': state}
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            self.last_save_duration = time.perf_counter() - started
+            return True
+
+        except Exception as e:
+            self.logger.error(f"State snapshot save error: {e}")
+            return False
+
+    def load(self):
+        """Geçerli snapshot varsa durumu döndür, yoksa None"""
+        if not os.path.exists(self.path):
+            return None
+
+        try:
+            with open(self.path, 'rb') as f:
+                payload = pickle.load(f)
+        except Exception as e:
+            self.logger.error(f"State snapshot load error: {e}")
+            return None
+
+        if payload.get('version') != SNAPSHOT_VERSION:
+            self.logger.warning(f"State snapshot version mismatch: {payload.get('version')}")
+            return None
+
+        age = time.time() - payload['saved_at']
+        if age > self.max_age:
+            self.logger.info(f"State snapshot too old ({age:.0f}s), cold start")
+            return None
+
+        self.logger.info(f"State snapshot loaded ({age:.0f}s old)")
+        return payload['state']
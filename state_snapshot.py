@@ -0,0 +1,83 @@
+# modules/state_snapshot.py
+
+import logging
+import threading
+import time
+from types import MappingProxyType
+
+
+def freeze(value):
+    """dict / list yapılarını salt okunur kopyalara çevir"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """freeze çıktısını JSON'a çevrilebilir dict / list yapısına döndür"""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
+
+
+class StateStore:
+    def __init__(self, collector=None):
+        """
+        Trading döngüsünün yayınladığı değişmez durum görüntüsü
+
+        Okuyucular (Telegram, dashboard, API) her zaman tamamlanmış bir
+        snapshot görür, yayın tek referans ataması ile yapılır ve okuma kilit
+        almaz. collector() bloklayan toplama işini yapar, refresh ile çağrılır.
+
+        Args:
+            collector: Yeni durum parçalarını dict olarak döndüren fonksiyon
+        """
+        self.collector = collector
+        self.logger = logging.getLogger(__name__)
+        self.snapshot = freeze({'version': 0, 'timestamp': None})
+        self.published_at = None
+        self.lock = threading.Lock()  # Sadece yazarlar arasında
+
+    def publish(self, **parts):
+        """Verilen parçaları mevcut snapshot ile birleştirip yeni snapshot yayınla"""
+        with self.lock:
+            state = dict(self.snapshot)
+            state.update({key: freeze(value) for key, value in parts.items()})
+            state['version'] = self.snapshot['version'] + 1
+            state['timestamp'] = time.time()
+            self.snapshot = MappingProxyType(state)
+            self.published_at = time.monotonic()
+        return self.snapshot
+
+    def mirror(self, state):
+        """Başka süreçte yayınlanmış tam snapshot'ı sürümüyle birlikte al"""
+        with self.lock:
+            # Sürüm bot yeniden başlayınca sıfırlanır, sıralama zaman damgasıyla
+            if (state.get('timestamp') or 0) <= (self.snapshot['timestamp'] or 0):
+                return self.snapshot
+            self.snapshot = freeze(state)
+            self.published_at = time.monotonic()
+        return self.snapshot
+
+    def refresh(self):
+        """collector ile durumu topla ve yayınla (executor'da çağrılmalı)"""
+        if self.collector is None:
+            return self.snapshot
+        try:
+            return self.publish(**self.collector())
+        except Exception as e:
+            self.logger.error(f"State snapshot refresh error: {e}")
+            return self.snapshot
+
+    def get(self):
+        return self.snapshot
+
+    def age(self):
+        """Son yayından bu yana geçen süre (saniye), hiç yayın yoksa None"""
+        if self.published_at is None:
+            return None
+        return time.monotonic() - self.published_at
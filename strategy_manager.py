@@ -1 +1,247 @@
+# modules/strategy_manager.py
 
+import logging
+import time
+import numpy as np
+import indicators as ind
+
+
+def indicator(name, **params):
+    """İndikatör anahtarı, stratejiler arasında tekilleştirme için kullanılır"""
+    return (name, tuple(sorted(params.items())))
+
+
+# İndikatör kayıt defteri: ad -> (bağımlılıklar, hesaplama fonksiyonu)
+INDICATORS = {}
+
+
+def register_indicator(name, compute, depends_on=None):
+    """
+    Yeni indikatör tanımla
+
+    Args:
+        compute: compute(data, params, deps) -> dizi veya dizi tuple'ı
+        depends_on: depends_on(params) -> bağımlı indikatör anahtarları
+    """
+    INDICATORS[name] = (depends_on or (lambda params: []), compute)
+
+
+register_indicator(
+    'atr',
+    lambda data, p, deps: ind.atr(data['high'], data['low'], data['close'], p['period'])
+)
+register_indicator(
+    'roc',
+    lambda data, p, deps: ind.roc(data['close'], p['period'])
+)
+register_indicator(
+    'volume_sma',
+    lambda data, p, deps: ind.sma(data['volume'], p['period'])
+)
+register_indicator(
+    'supertrend',
+    lambda data, p, deps: ind.supertrend(
+        data['high'], data['low'], data['close'], deps[0], p['multiplier']
+    ),
+    depends_on=lambda p: [indicator('atr', period=p['period'])]
+)
+register_indicator(
+    'renko',
+    lambda data, p, deps: ind.renko(data['close'], p['brick_size'])
+)
+
+
+class Strategy:
+    """Strateji temel sınıfı"""
+    name = None
+
+    def required_indicators(self):
+        """Stratejinin ihtiyaç duyduğu indikatör anahtarları"""
+        return []
+
+    def evaluate(self, data, values):
+        """Ortak indikatör dizileri üzerinden sinyal üret"""
+        raise NotImplementedError
+
+    def neutral_signal(self):
+        """Değerlendirme başarısız olduğunda kullanılan nötr sinyal"""
+        return {'direction': None, 'strength': 50}
+
+
+class SuperTrendStrategy(Strategy):
+    name = 'SuperTrend'
+
+    def __init__(self, atr_period, atr_multiplier, volume_period=20, roc_period=10):
+        self.supertrend = indicator('supertrend', period=atr_period, multiplier=atr_multiplier)
+        self.volume_sma = indicator('volume_sma', period=volume_period)
+        self.roc = indicator('roc', period=roc_period)
+
+    def required_indicators(self):
+        return [self.supertrend, self.volume_sma, self.roc]
+
+    def evaluate(self, data, values):
+        _, _, in_uptrend = values[self.supertrend]
+        strength = ind.signal_strength(
+            in_uptrend, data['volume'], values[self.volume_sma], values[self.roc]
+        )
+        uptrend = bool(in_uptrend[-1])
+        return {
+            'supertrend': uptrend,
+            'direction': 'long' if uptrend else 'short',
+            'strength': float(strength[-1])
+        }
+
+
+class RenkoStrategy(Strategy):
+    name = 'Renko'
+
+    def __init__(self, brick_size, confirm_bricks=2):
+        self.renko = indicator('renko', brick_size=brick_size)
+        self.confirm_bricks = confirm_bricks
+
+    def required_indicators(self):
+        return [self.renko]
+
+    def evaluate(self, data, values):
+        _, closes, directions = values[self.renko]
+        if len(directions) < self.confirm_bricks:
+            return {'direction': None, 'bricks': len(directions), 'last_brick': None}
+
+        # Son N tuğla aynı yöndeyse sinyal
+        recent = directions[-self.confirm_bricks:]
+        direction = None
+        if np.all(recent == 1):
+            direction = 'long'
+        elif np.all(recent == -1):
+            direction = 'short'
+
+        return {
+            'direction': direction,
+            'bricks': len(directions),
+            'last_brick': float(closes[-1])
+        }
+
+    def neutral_signal(self):
+        return {'direction': None, 'bricks': 0, 'last_brick': None}
+
+
+class StrategyManager:
+    def __init__(self, cache=None, symbol='XBTUSDT'):
+        self.logger = logging.getLogger(__name__)
+        self.cache = cache
+        self.symbol = symbol
+        self.strategies = {}
+        self.plan = []  # Tekilleştirilmiş, bağımlılık sırasına dizilmiş indikatörler
+
+        # Zaman dilimi bazında son sonuçlar
+        self.signals = {}
+        self.values = {}
+        self.versions = {}
+        self.last_run_duration = 0.0
+
+    @classmethod
+    def from_config(cls, config, cache=None):
+        """TRADING_CONFIG ile varsayılan stratejileri kur"""
+        manager = cls(cache, config.get('symbol', 'XBTUSDT'))
+        manager.register(SuperTrendStrategy(config['atr_period'], config['atr_multiplier']))
+        manager.register(RenkoStrategy(config['renko_brick_size']))
+        return manager
+
+    def register(self, strategy):
+        """Strateji ekle ve indikatör planını yeniden derle"""
+        self.strategies[strategy.name] = strategy
+        self._compile()
+
+    def unregister(self, name):
+        """Strateji çıkar"""
+        self.strategies.pop(name, None)
+        self._compile()
+
+    def _compile(self):
+        """Tüm stratejilerin indikatörlerini tekilleştir ve sıraya koy"""
+        plan = []
+        seen = set()
+
+        def visit(key):
+            if key in seen:
+                return
+            name, params = key
+            if name not in INDICATORS:
+                raise ValueError(f"Unknown indicator: {name}")
+            depends_on, _ = INDICATORS[name]
+            for dependency in depends_on(dict(params)):
+                visit(dependency)
+            seen.add(key)
+            plan.append(key)
+
+        for strategy in self.strategies.values():
+            for key in strategy.required_indicators():
+                visit(key)
+
+        self.plan = plan
+        # Strateji seti değişti, sürüm bazlı sonuçlar artık geçersiz
+        self.versions = {}
+
+    def compute_indicators(self, data, timeframe='1m', version=None):
+        """Plandaki her indikatörü bir kez hesapla, sürüm verilmişse önbelleği kullan"""
+        data = self._as_arrays(data)
+        values = {}
+        for key in self.plan:
+            name, params = key
+            depends_on, compute = INDICATORS[name]
+            params = dict(params)
+            deps = [values[dependency] for dependency in depends_on(params)]
+
+            if self.cache is None or version is None:
+                values[key] = compute(data, params, deps)
+            else:
+                values[key] = self.cache.get_or_compute(
+                    self.cache.make_key(self.symbol, timeframe, version, key),
+                    lambda: compute(data, params, deps)
+                )
+        return values
+
+    def run(self, data, timeframe='1m', version=None):
+        """Tüm stratejileri aynı indikatör dizileri üzerinde çalıştır"""
+        # Aynı veri sürümü için tekrar hesaplama yapma
+        if version is not None and self.versions.get(timeframe) == version:
+            return self.signals[timeframe]
+
+        start_time = time.perf_counter()
+        data = self._as_arrays(data)
+        values = self.compute_indicators(data, timeframe, version)
+
+        signals = {}
+        for name, strategy in self.strategies.items():
+            try:
+                signals[name] = strategy.evaluate(data, values)
+            except Exception as e:
+                self.logger.error(f"Strategy {name} evaluation error: {e}")
+                # Önbelleğe None yazılmaz: önceki sinyal korunur, yoksa nötr
+                previous = self.signals.get(timeframe, {}).get(name)
+                signals[name] = previous if previous is not None else strategy.neutral_signal()
+
+        self.values[timeframe] = values
+        self.signals[timeframe] = signals
+        self.versions[timeframe] = version
+        self.last_run_duration = time.perf_counter() - start_time
+        return signals
+
+    def get_signals(self, strategy_name, data=None, timeframe='1m'):
+        """Strateji sinyalini getir, veri verilmezse son hesaplananı döndür"""
+        if data is not None and len(data):
+            self.run(data, timeframe)
+        return self.signals.get(timeframe, {}).get(strategy_name)
+
+    def get_indicator(self, key, timeframe='1m'):
+        """Son çalıştırmadaki indikatör dizisi"""
+        return self.values.get(timeframe, {}).get(key)
+
+    @staticmethod
+    def _as_arrays(data):
+        if hasattr(data, 'columns'):
+            return {
+                column: data[column].to_numpy(dtype=np.float64)
+                for column in ('open', 'high', 'low', 'close', 'volume')
+            }
+        return data
@@ -10,7 +10,10 @@ from telegram.ext import (
     CallbackContext
 )
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from notifications import NotificationQueue, PRIORITY_CRITICAL, PRIORITY_HIGH, PRIORITY_NORMAL
+from settings import TRADING_CONFIG
 
 class TelegramBot:
     def __init__(self):
@@ -22,7 +25,16 @@ class TelegramBot:
         self.trader = None
         self.risk_manager = None
 
-    async def initialize(self, token: str, chat_id: str, market_analyzer, trader, risk_manager):
+        # Komutlar trading döngüsünün yayınladığı snapshot'tan okur
+        self.state_store = None
+        self.max_age = 30
+        self.executor = None
+        self._refresh = None
+        self.notifier = None
+        self.trade_analyzer = None
+
+    async def initialize(self, token: str, chat_id: str, market_analyzer, trader, risk_manager,
+                         state_store=None, executor=None, max_age=30, config=None, trade_analyzer=None):
         """Bot'u başlat ve komutları ayarla"""
         try:
             self.bot = Bot(token)
@@ -30,6 +42,11 @@ class TelegramBot:
             self.market_analyzer = market_analyzer
             self.trader = trader
             self.risk_manager = risk_manager
+            self.state_store = state_store
+            self.max_age = max_age
+            self.trade_analyzer = trade_analyzer
+            # Bloklayan işler trading executor'ını meşgul etmesin diye ayrı executor
+            self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix='telegram')
 
             # Application'ı oluştur
             self.application = Application.builder().token(token).build()
@@ -43,6 +60,7 @@ class TelegramBot:
             self.application.add_handler(CommandHandler("signals", self._signals_command))
             self.application.add_handler(CommandHandler("balance", self._balance_command))
             self.application.add_handler(CommandHandler("performance", self._performance_command))
+            self.application.add_handler(CommandHandler("report", self._report_command))
 
             # Diğer mesajlar için handler
             self.application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self._handle_message))
@@ -50,6 +68,10 @@ class TelegramBot:
             # Error handler
             self.application.add_error_handler(self._error_handler)
 
+            # Giden bildirimler öncelikli kuyruk üzerinden, flood limitine takılmadan
+            self.notifier = NotificationQueue(self.bot, chat_id, config or {})
+            self.notifier.start()
+
             # Bot'u başlat
             await self.application.initialize()
             await self.application.start()
@@ -66,24 +88,90 @@ class TelegramBot:
     async def stop(self):
         """Bot'u durdur"""
         try:
+            if self.notifier:
+                await self.notifier.stop()
             if self.application:
                 await self.application.stop()
+            if self.executor:
+                self.executor.shutdown(wait=False)
             self.logger.info("Telegram bot stopped")
         except Exception as e:
             self.logger.error(f"Telegram bot stop error: {e}")
 
-    async def send_message(self, message: str):
-        """Mesaj gönder"""
+    async def _run_blocking(self, func, *args):
+        """Bloklayan çağrıyı executor'da çalıştır"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    def _collect_state(self):
+        """Snapshot store yoksa durumu doğrudan topla (executor'da çalışır)"""
+        position = self.trader.get_position()
+        return {
+            'position': position,
+            'balance': self.trader.update_balance(),
+            'risk_metrics': self.risk_manager.get_risk_metrics(position, fetch_position=False),
+            'signals': self.market_analyzer.get_signal_summary()
+        }
+
+    async def _get_state(self):
+        """Güncel snapshot, eskiyse tek bir yenileme isteğiyle tazelenir"""
+        if self.state_store is None:
+            return await self._run_blocking(self._collect_state)
+
+        age = self.state_store.age()
+        if age is None or age > self.max_age:
+            # Aynı anda gelen komutlar aynı yenilemeyi bekler
+            if self._refresh is None or self._refresh.done():
+                self._refresh = asyncio.ensure_future(self._run_blocking(self.state_store.refresh))
+            await asyncio.shield(self._refresh)
+        return self.state_store.get()
+
+    async def send_message(self, message: str, priority=PRIORITY_NORMAL, key=None):
+        """Mesajı bildirim kuyruğuna ekle"""
+        self.notify(message, priority, key)
+
+    def notify(self, message, priority=PRIORITY_NORMAL, key=None):
+        """Thread-safe bildirim, key verilirse tekrarlar özet mesajında birleştirilir"""
         try:
-            if self.bot and self.chat_id:
-                await self.bot.send_message(
-                    chat_id=self.chat_id,
-                    text=message,
-                    parse_mode='HTML'
-                )
+            if self.notifier and self.chat_id:
+                self.notifier.notify(message, priority, key)
         except Exception as e:
             self.logger.error(f"Message send error: {e}")
 
+    def alert(self, message, key=None):
+        """Sistem uyarısı, aynı anahtarlı tekrarlar birleştirilir"""
+        self.notify(message, PRIORITY_HIGH, key)
+
+    def notify_fill(self, message):
+        """Fill / emir bildirimi, kuyrukta her zaman önce gönderilir"""
+        self.notify(message, PRIORITY_CRITICAL)
+
+    def send_chart(self, figure, caption=None):
+        """Grafiği (ör. TradeAnalyzer.plot_analysis) render edip gönder"""
+        if self.notifier and self.chat_id:
+            self.notifier.notify_chart(figure, caption)
+
+    def send_analysis_report(self, start_date=None):
+        """
+        İşlem analizi grafiğini gönder (bloklayan, executor'da çağrılır)
+
+        Returns:
+            bool: Analiz edilecek işlem varsa True
+        """
+        if self.trade_analyzer is None:
+            return False
+        analysis = self.trade_analyzer.analyze_trades(start_date)
+        if not analysis:
+            return False
+        general = analysis['general']
+        caption = (
+            f"📊 İşlem Analizi: {general['total_trades']} işlem, "
+            f"win rate {general['win_rate'] * 100:.1f}%, PnL ${general['total_pnl']:.2f}"
+        )
+        # Figür ve PNG render'ı bildirim kuyruğunun executor'ında yapılır
+        self.send_chart(lambda: self.trade_analyzer.plot_analysis(analysis), caption)
+        return True
+
     async def _start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Start komutu işleyicisi"""
         welcome_message = (
@@ -95,7 +183,8 @@ class TelegramBot:
             "/close - Pozisyonu kapat\n"
             "/signals - Sinyal bilgileri\n"
             "/balance - Bakiye bilgisi\n"
-            "/performance - Performans metrikleri"
+            "/performance - Performans metrikleri\n"
+            "/report - İşlem analizi grafiği"
         )
         await update.message.reply_text(welcome_message)
 
@@ -108,16 +197,18 @@ class TelegramBot:
             "/close - Açık pozisyonu kapat\n"
             "/signals - Güncel trading sinyalleri\n"
             "/balance - Hesap bakiyesi ve PnL\n"
-            "/performance - Performans metrikleri ve istatistikler"
+            "/performance - Performans metrikleri ve istatistikler\n"
+            "/report - İşlem analizi grafiği"
         )
         await update.message.reply_text(help_message)
 
     async def _status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Status komutu işleyicisi"""
         try:
-            position = self.trader.get_position()
-            signals = self.market_analyzer.get_signal_summary()
-            metrics = self.risk_manager.get_risk_metrics()
+            state = await self._get_state()
+            position = state.get('position')
+            signals = state.get('signals')
+            metrics = state['risk_metrics']
 
             status_message = (
                 "📊 Bot Durumu\n\n"
@@ -136,7 +227,7 @@ class TelegramBot:
     async def _position_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Position komutu işleyicisi"""
         try:
-            position = self.trader.get_position()
+            position = (await self._get_state()).get('position')
             if not position:
                 await update.message.reply_text("ℹ️ Aktif pozisyon yok")
                 return
@@ -159,12 +250,14 @@ class TelegramBot:
     async def _close_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Close komutu işleyicisi"""
         try:
-            position = self.trader.get_position()
+            position = (await self._get_state()).get('position')
             if not position:
                 await update.message.reply_text("ℹ️ Kapatılacak pozisyon yok")
                 return
 
-            result = self.trader.close_position()
+            result = await self._run_blocking(self.trader.close_position)
+            if result and self.state_store:
+                await self._run_blocking(self.state_store.refresh)
             if result:
                 close_message = (
                     "✅ Pozisyon kapatıldı\n\n"
@@ -183,11 +276,15 @@ class TelegramBot:
     async def _signals_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Signals komutu işleyicisi"""
         try:
-            signals = self.market_analyzer.get_signal_summary()
+            signals = (await self._get_state()).get('signals')
             if not signals:
                 await update.message.reply_text("ℹ️ Aktif sinyal yok")
                 return
 
+            timeframes = " | ".join(
+                f"{timeframe}: {(signal or {}).get('direction') or '-'}"
+                for timeframe, signal in signals.get('timeframes', {}).items()
+            )
             signals_message = (
                 "🎯 Trading Sinyalleri\n\n"
                 f"📈 Trend: {signals['trend']}\n"
@@ -196,6 +293,8 @@ class TelegramBot:
                 f"📉 Volatilite: {signals['volatility']:.2f}%\n"
                 f"📊 Hacim Faktörü: {signals['volume_factor']:.2f}"
             )
+            if timeframes:
+                signals_message += f"\n⏱ Zaman Dilimleri: {timeframes}"
             await update.message.reply_text(signals_message)
 
         except Exception as e:
@@ -205,14 +304,16 @@ class TelegramBot:
     async def _balance_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Balance komutu işleyicisi"""
         try:
-            balance = self.trader.update_balance()
-            metrics = self.risk_manager.get_risk_metrics()
+            state = await self._get_state()
+            balance = state['balance']
+            metrics = state['risk_metrics']
+            currency = TRADING_CONFIG['settlement_currency']
 
             balance_message = (
                 "💰 Bakiye Bilgisi\n\n"
-                f"💵 Total: {balance['total']:.8f} BTC\n"
-                f"🆓 Kullanılabilir: {balance['free']:.8f} BTC\n"
-                f"🔒 Kullanımda: {balance['used']:.8f} BTC\n"
+                f"💵 Total: {balance['total']:.2f} {currency}\n"
+                f"🆓 Kullanılabilir: {balance['free']:.2f} {currency}\n"
+                f"🔒 Kullanımda: {balance['used']:.2f} {currency}\n"
                 f"📈 Günlük PnL: ${metrics['daily_stats']['pnl']:.2f}\n"
                 f"📉 Max Drawdown: {metrics['daily_stats']['max_drawdown']:.2f}%"
             )
@@ -225,7 +326,7 @@ class TelegramBot:
     async def _performance_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Performance komutu işleyicisi"""
         try:
-            metrics = self.risk_manager.get_risk_metrics()
+            metrics = (await self._get_state())['risk_metrics']
             daily_stats = metrics['daily_stats']
 
             performance_message = (
@@ -243,6 +344,16 @@ class TelegramBot:
             self.logger.error(f"Performance command error: {e}")
             await update.message.reply_text("❌ Performans bilgisi alınamadı")
 
+    async def _report_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Report komutu işleyicisi"""
+        try:
+            if not await self._run_blocking(self.send_analysis_report):
+                await update.message.reply_text("ℹ️ Analiz için kapanmış işlem yok")
+
+        except Exception as e:
+            self.logger.error(f"Report command error: {e}")
+            await update.message.reply_text("❌ Analiz raporu oluşturulamadı")
+
     async def _handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Diğer mesajları işle"""
         await update.message.reply_text(
@@ -0,0 +1,25 @@
+# tests/test_connection_supervisor.py
+
+import ccxt
+import pytest
+
+from connection_supervisor import CLOSED, ConnectionSupervisor
+from settings import SUPERVISOR_CONFIG
+
+
+def test_rate_limit_is_not_retried_or_counted_as_failure():
+    supervisor = ConnectionSupervisor({**SUPERVISOR_CONFIG, 'breaker_threshold': 1})
+    calls = []
+
+    def limited():
+        calls.append(1)
+        raise ccxt.RateLimitExceeded('429 Too Many Requests')
+
+    for _ in range(3):
+        with pytest.raises(ccxt.RateLimitExceeded):
+            supervisor.call('fetch_ticker', limited)
+
+    health = supervisor.get_health()['endpoints']['fetch_ticker']
+    assert len(calls) == 3
+    assert health['state'] == CLOSED
+    assert health['failures'] == 0 and health['rate_limited'] == 3
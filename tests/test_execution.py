@@ -0,0 +1,30 @@
+# tests/test_execution.py
+
+from execution import ExecutionEngine, ParentOrder
+
+CONFIG = {'wheel_tick': 0.05, 'tick_size': 0.5, 'lot_size': 1, 'algo': 'ladder', 'min_parent_size': 1}
+
+
+class FakeExchange:
+    def __init__(self):
+        self.cancelled = []
+
+    def cancel_order(self, order_id, symbol=None):
+        self.cancelled.append(order_id)
+        return {'id': order_id, 'status': 'canceled', 'filled': 0.0}
+
+
+def test_cancel_withdraws_resting_children():
+    exchange = FakeExchange()
+    engine = ExecutionEngine(exchange, None, CONFIG)
+    parent = ParentOrder('parent-1', 'XBTUSDT', 'buy', 3000, 'ladder', 100.0)
+    for order_id, filled, status in (('a', 1000, 'closed'), ('b', 0, 'open'), ('c', 0, 'open')):
+        parent.apply({'id': order_id, 'amount': 1000, 'price': 100.0, 'filled': filled, 'status': status})
+    engine.parents[parent.id] = parent
+
+    report = engine.cancel(parent.id)
+
+    assert sorted(exchange.cancelled) == ['b', 'c']
+    assert parent.open_children() == []
+    assert report['status'] == 'cancelled' and report['filled'] == 1000
+    assert engine.cancel(parent.id) is None
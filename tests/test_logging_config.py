@@ -0,0 +1,56 @@
+# tests/test_logging_config.py
+
+import logging
+
+from logging_config import SamplingFilter
+from trailing_stop import TrailingStopEngine
+
+
+def make_record(name, level):
+    return logging.LogRecord(name, level, __file__, 0, 'message', None, None)
+
+
+class CaptureHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class FakeExchange:
+    def edit_order(self, *args):
+        return {}
+
+
+def test_sampling_keeps_info_audit_records():
+    sampler = SamplingFilter({'execution': 0.5, 'trailing_stop': 0.2})
+
+    assert all(sampler.filter(make_record('execution', logging.INFO)) for _ in range(10))
+    assert all(sampler.filter(make_record('trailing_stop', logging.INFO)) for _ in range(10))
+    assert sum(sampler.filter(make_record('trailing_stop', logging.DEBUG)) for _ in range(10)) == 2
+
+
+def test_noisy_trailing_stop_ticks_are_thinned():
+    engine = TrailingStopEngine(FakeExchange(), {
+        'trailing_stop': True, 'stop_loss_percent': 1.5, 'tick_size': 0.5,
+        'trailing_step_ticks': 1, 'max_amends_per_second': 1000
+    })
+    handler = CaptureHandler()
+    handler.addFilter(SamplingFilter({'trailing_stop': 0.2}))
+    engine.logger.addHandler(handler)
+    engine.logger.setLevel(logging.DEBUG)
+    try:
+        engine.track({'id': 'stop-1'}, 'XBTUSDT', 'long', 98.5, 100, 100.0)
+        for tick in range(1, 51):
+            engine.on_price('XBTUSDT', 100.0 + tick)
+            engine.flush()
+    finally:
+        engine.logger.removeHandler(handler)
+        engine.logger.setLevel(logging.NOTSET)
+
+    ticks = [record for record in handler.records if record.levelno == logging.DEBUG]
+    amends = [record for record in handler.records if record.levelno == logging.INFO]
+    assert len(ticks) == 10
+    assert len(amends) == engine.amend_count == 50
@@ -0,0 +1,41 @@
+# tests/test_market_analysis.py
+
+import time
+
+import numpy as np
+
+from candle_aggregator import BASE_MS
+from market_analysis import MarketAnalyzer
+from settings import TRADING_CONFIG
+
+
+class FakeExchange:
+    """1m mumları zamana göre üreten, istek başına limit uygulayan exchange"""
+
+    def __init__(self, page_limit):
+        self.page_limit = page_limit
+        self.calls = []
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None):
+        self.calls.append((since, limit))
+        now = int(time.time() * 1000)
+        now -= now % BASE_MS
+        limit = min(limit, self.page_limit)
+        start = since if since is not None else now - (limit - 1) * BASE_MS
+        timestamps = np.arange(start, min(now, start + (limit - 1) * BASE_MS) + 1, BASE_MS)
+        close = 30000 + 500 * np.sin(timestamps / BASE_MS / 90)
+        return [[int(ts), c, c + 20, c - 20, c, 1000.0] for ts, c in zip(timestamps, close)]
+
+
+def test_cold_start_seeds_every_timeframe():
+    exchange = FakeExchange(page_limit=200)
+    analyzer = MarketAnalyzer(exchange, None, {**TRADING_CONFIG, 'ohlcv_page_limit': 200})
+
+    assert analyzer.history_bars >= 60 * (TRADING_CONFIG['atr_period'] + 1)
+    assert analyzer.update_data()
+
+    assert len(exchange.calls) > 1
+    for timeframe in ('5m', '15m', '1h'):
+        assert analyzer.get_timeframe_signal(timeframe) is not None
+    summary = analyzer.get_signal_summary()
+    assert set(summary['timeframes']) == {'5m', '15m', '1h'}
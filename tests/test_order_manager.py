@@ -0,0 +1,54 @@
+# tests/test_order_manager.py
+
+import importlib
+
+AdvancedOrderManager = importlib.import_module('advanced-order-manager').AdvancedOrderManager
+
+CONFIG = {'position_size_percent': 25, 'stop_loss_percent': 1.5}
+
+
+class FakeExchange:
+    def __init__(self):
+        self.cancelled = []
+
+    def cancel_order(self, order_id, symbol=None):
+        self.cancelled.append(order_id)
+        return {'id': order_id, 'status': 'canceled'}
+
+
+def restored_manager(exchange, active_orders, last_signal='long'):
+    manager = AdvancedOrderManager(exchange, CONFIG)
+    manager.restore_state({
+        'active_orders': {'entry_long': None, 'entry_short': None, 'stop_loss': None, **active_orders},
+        'last_signal': last_signal,
+        'slippage_data': []
+    })
+    return manager
+
+
+def test_flat_position_clears_restored_signal_and_stop():
+    exchange = FakeExchange()
+    manager = restored_manager(exchange, {
+        'entry_long': {'order': {'id': 'parent-1', 'parent': True}, 'intended_price': 100.0},
+        'stop_loss': {'order': {'id': 'stop-1'}, 'intended_price': 98.5}
+    })
+
+    manager.reconcile_position(None)
+
+    assert manager.last_signal is None
+    assert exchange.cancelled == ['stop-1']
+    assert manager.active_orders == {'entry_long': None, 'entry_short': None, 'stop_loss': None}
+
+
+def test_open_position_and_pending_entry_are_kept():
+    exchange = FakeExchange()
+    manager = restored_manager(exchange, {
+        'entry_short': {'order': {'id': 'entry-1'}, 'intended_price': 100.0},
+        'stop_loss': {'order': {'id': 'stop-1'}, 'intended_price': 101.5}
+    }, last_signal='short')
+
+    manager.reconcile_position(None)
+    assert manager.last_signal == 'short' and exchange.cancelled == []
+
+    manager.reconcile_position({'contracts': 100, 'side': 'long'})
+    assert manager.last_signal == 'long'
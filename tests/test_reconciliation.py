@@ -0,0 +1,66 @@
+# tests/test_reconciliation.py
+
+import importlib
+import time
+
+from reconciliation import PositionReconciler
+
+AdvancedOrderManager = importlib.import_module('advanced-order-manager').AdvancedOrderManager
+
+CONFIG = {'trade_limit': 100, 'trade_memory': 100, 'order_grace': 2}
+
+
+class FakeExchange:
+    def __init__(self):
+        self.open_orders = []
+        self.trades = []
+
+    def fetch_open_orders(self, symbol):
+        return list(self.open_orders)
+
+    def fetch_positions(self):
+        return []
+
+    def fetch_my_trades(self, symbol, since=None, limit=None):
+        return list(self.trades)
+
+
+def make_manager(exchange):
+    manager = AdvancedOrderManager(exchange, {'slippage_history': 100})
+    reconciler = PositionReconciler(exchange, 'XBTUSDT', CONFIG)
+    manager.attach_reconciler(reconciler)
+    return manager, reconciler
+
+
+def test_fill_is_matched_before_order_is_removed():
+    exchange = FakeExchange()
+    manager, reconciler = make_manager(exchange)
+    exchange.open_orders = [{'id': 'entry-1', 'status': 'open'}]
+    reconciler.run_once()
+
+    manager.active_orders['entry_long'] = {
+        'order': {'id': 'entry-1'}, 'intended_price': 100.0, 'submitted_at': time.time() - 60
+    }
+    exchange.open_orders = []
+    exchange.trades = [{'id': 't1', 'order': 'entry-1', 'price': 101.0, 'amount': 1, 'timestamp': 1}]
+    reconciler.run_once()
+
+    assert manager.active_orders['entry_long'] is None
+    assert len(manager.slippage_data) == 1
+    assert manager.slippage_data[0]['execution_price'] == 101.0
+
+
+def test_order_submitted_during_fetch_is_kept():
+    exchange = FakeExchange()
+    manager, reconciler = make_manager(exchange)
+    exchange.open_orders = [{'id': 'old', 'status': 'open'}]
+    reconciler.run_once()
+
+    # Liste çekildikten sonra gönderilen emir henüz listede yok
+    manager.active_orders['stop_loss'] = {
+        'order': {'id': 'new'}, 'intended_price': 99.0, 'submitted_at': time.time()
+    }
+    exchange.open_orders = []
+    reconciler.run_once()
+
+    assert manager.active_orders['stop_loss']['order']['id'] == 'new'
@@ -0,0 +1,98 @@
+# tests/test_risk_manager.py
+
+from reconciliation import FillLedger
+from risk_manager import BLOCK_DAILY_LOSS, BLOCK_DRAWDOWN, BLOCK_MAX_TRADES, RiskManager
+from trading_config import TradingConfig
+
+
+class FakeExchange:
+    def fetch_balance(self):
+        return {'USDT': {'total': 1000.0, 'free': 1000.0}}
+
+
+class FakeTrader:
+    exchange = FakeExchange()
+
+
+def make_risk_manager(**overrides):
+    config = TradingConfig(
+        SETTLEMENT_CURRENCY='USDT',
+        TRADING_HOURS={'START': '00:00', 'END': '23:59'},
+        INITIAL_BALANCE=None,
+        **overrides
+    )
+    return RiskManager(FakeTrader(), config)
+
+
+def trade(side, amount, price, timestamp=1):
+    return {'side': side, 'amount': amount, 'price': price, 'timestamp': timestamp, 'fee': {'cost': 0.0}}
+
+
+def test_max_trades_per_day_blocks_after_closed_fills():
+    risk = make_risk_manager(MAX_TRADES_PER_DAY=2, MAX_DAILY_LOSS_PERCENT=50, MAX_DRAWDOWN_PERCENT=50)
+    ledger = FillLedger(multiplier=1.0, started_at=0)
+    ledger.seed(None)
+
+    for _ in range(2):
+        assert risk.check_trade() == (True, None)
+        for fill in (ledger.apply(trade('buy', 1, 100)), ledger.apply(trade('sell', 1, 101))):
+            risk.on_fill(fill)
+
+    assert risk.daily_trades == 2
+    assert risk.realized_pnl == 2.0
+    assert risk.check_trade() == (False, BLOCK_MAX_TRADES)
+
+
+def test_daily_loss_blocks_after_losing_fill():
+    risk = make_risk_manager(MAX_TRADES_PER_DAY=10, MAX_DAILY_LOSS_PERCENT=5, MAX_DRAWDOWN_PERCENT=50)
+    ledger = FillLedger(multiplier=1.0, started_at=0)
+    ledger.seed(None)
+
+    risk.on_fill(ledger.apply(trade('sell', 10, 100)))
+    risk.on_fill(ledger.apply(trade('buy', 10, 106)))
+
+    assert risk.daily_loss == 60.0
+    assert risk.check_trade() == (False, BLOCK_DAILY_LOSS)
+
+
+def test_daily_loss_counts_every_fill_of_a_split_close():
+    risk = make_risk_manager(MAX_TRADES_PER_DAY=10, MAX_DAILY_LOSS_PERCENT=10, MAX_DRAWDOWN_PERCENT=50)
+    ledger = FillLedger(multiplier=1.0, started_at=0)
+    ledger.seed(None)
+
+    opening = ledger.apply({**trade('buy', 20, 100), 'fee': {'cost': 2.0}})
+    risk.on_fill(opening)
+    assert risk.daily_loss == 2.0 and risk.daily_trades == 0
+
+    first = ledger.apply(trade('sell', 10, 95))
+    assert not first['closed']
+    risk.on_fill(first)
+    assert risk.daily_loss == 52.0 and risk.daily_trades == 0
+    assert risk.check_trade() == (True, None)
+
+    risk.on_fill(ledger.apply(trade('sell', 10, 95)))
+
+    assert risk.daily_loss == 102.0
+    assert risk.daily_stats == {'trades': 1, 'wins': 0, 'losses': 1, 'pnl': -102.0}
+    assert risk.check_trade() == (False, BLOCK_DAILY_LOSS)
+
+
+def test_drawdown_blocks_after_losses():
+    risk = make_risk_manager(MAX_TRADES_PER_DAY=10, MAX_DAILY_LOSS_PERCENT=100, MAX_DRAWDOWN_PERCENT=10)
+    ledger = FillLedger(multiplier=1.0, started_at=0)
+    ledger.seed({'contracts': 20, 'side': 'long', 'entryPrice': 100})
+
+    closed = ledger.apply(trade('sell', 20, 94))
+    assert closed['closed'] and closed['pnl'] == -120.0
+    assert closed['position']['side'] == 'long' and closed['position']['size'] == 20
+    risk.on_fill(closed)
+
+    assert risk.drawdown == 12.0
+    assert risk.check_trade() == (False, BLOCK_DRAWDOWN)
+
+
+def test_ledger_ignores_fills_before_start():
+    ledger = FillLedger(multiplier=1.0, started_at=1000)
+    ledger.seed(None)
+    assert ledger.apply(trade('buy', 1, 100, timestamp=999)) is None
+    assert ledger.size == 0
@@ -0,0 +1,41 @@
+# tests/test_strategy_manager.py
+
+import numpy as np
+
+from strategy_manager import Strategy, StrategyManager
+
+
+class FlakyStrategy(Strategy):
+    name = 'Flaky'
+
+    def __init__(self):
+        self.fail = False
+
+    def evaluate(self, data, values):
+        if self.fail:
+            raise ValueError('boom')
+        return {'direction': 'long', 'strength': 90}
+
+
+def make_data(n=30):
+    close = np.linspace(100, 110, n)
+    return {'open': close, 'high': close + 1, 'low': close - 1, 'close': close, 'volume': np.ones(n)}
+
+
+def test_failed_strategy_keeps_previous_signal():
+    manager = StrategyManager()
+    strategy = FlakyStrategy()
+    manager.register(strategy)
+
+    assert manager.run(make_data(), version=1)['Flaky'] == {'direction': 'long', 'strength': 90}
+    strategy.fail = True
+    assert manager.run(make_data(), version=2)['Flaky'] == {'direction': 'long', 'strength': 90}
+
+
+def test_failed_strategy_without_history_is_neutral():
+    manager = StrategyManager()
+    strategy = FlakyStrategy()
+    strategy.fail = True
+    manager.register(strategy)
+
+    assert manager.run(make_data(), version=1)['Flaky'] == {'direction': None, 'strength': 50}
@@ -0,0 +1,28 @@
+# tests/test_trade_store.py
+
+from reconciliation import FillLedger
+from trade_store import TradeStore
+
+
+def test_closed_round_trip_is_recorded(tmp_path):
+    store = TradeStore(str(tmp_path / 'trades.db'))
+    ledger = FillLedger(multiplier=1.0, started_at=0)
+    ledger.seed(None)
+
+    fills = [
+        {'side': 'buy', 'amount': 10, 'price': 100, 'timestamp': 1_000, 'fee': {'cost': 0.5}},
+        {'side': 'sell', 'amount': 4, 'price': 110, 'timestamp': 2_000, 'fee': {'cost': 0.5}},
+        {'side': 'sell', 'amount': 6, 'price': 105, 'timestamp': 3_000, 'fee': {'cost': 0.5}}
+    ]
+    results = [ledger.apply(fill) for fill in fills]
+    assert [result['closed'] for result in results] == [False, False, True]
+
+    store.record_position('XBTUSDT', **results[-1]['position'])
+    history = store.get_trade_history()
+    store.close()
+
+    assert len(history) == 1
+    row = history.iloc[0]
+    assert row['side'] == 'long' and row['size'] == 10
+    assert row['exit_price'] == 107.0
+    assert row['pnl'] == 40 + 30 - 1.5
@@ -3,10 +3,10 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import logging
 
+from execution_quality import summarize_execution_quality
+
 class TradeAnalyzer:
    def __init__(self, database_manager):
        self.db = database_manager
@@ -25,7 +25,7 @@ class TradeAnalyzer:
                'time': self._analyze_time_distribution(trades_df),
                'profit': self._analyze_profit_distribution(trades_df),
                'risk': self._analyze_risk_metrics(trades_df),
-               'slippage': self._analyze_slippage(trades_df)
+               'slippage': self._analyze_slippage(start_date, end_date)
            }
            
            return analysis
@@ -97,13 +97,21 @@ class TradeAnalyzer:
            'sortino_ratio': self._calculate_sortino_ratio(df['pnl'])
        }
 
-   def _analyze_slippage(self, df):
-       """Kayma analizi"""
+   def _analyze_slippage(self, start_date=None, end_date=None):
+       """Kayma analizi, dolum kayıtlarından (executions tablosu)"""
+       executions = self.db.get_executions(start_date, end_date)
+       quality = summarize_execution_quality(executions)
+       if quality is None:
+           return None
+
+       # Kayma maliyeti: bps * nominal (fiyat * miktar)
+       cost = executions['slippage_bps'] / 10000 * executions['exec_price'] * executions['amount']
        return {
-           'average_slippage': df['slippage'].mean(),
-           'max_slippage': df['slippage'].max(),
-           'slippage_cost': df['slippage'].sum(),
-           'slippage_distribution': df['slippage'].describe().to_dict()
+           'average_slippage': quality['overall']['slippage_bps'],
+           'max_slippage': executions['slippage_bps'].max(),
+           'slippage_cost': cost.sum(),
+           'slippage_distribution': executions['slippage_bps'].describe().to_dict(),
+           'execution_quality': quality
        }
 
    def _calculate_max_drawdown_duration(self, df):
@@ -148,6 +156,9 @@ class TradeAnalyzer:
 
    def plot_analysis(self, analysis):
        """Analiz görselleştirme"""
+       # plotly sadece grafik istendiğinde yüklenir, başsız worker'lar ödemez
+       from plotly.subplots import make_subplots
+
        fig = make_subplots(
            rows=3, cols=2,
            subplot_titles=(
@@ -0,0 +1,143 @@
+# modules/trade_store.py
+
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+import pandas as pd
+
+EXECUTION_COLUMNS = (
+    'order_id', 'order_type', 'side', 'amount', 'intended_price', 'arrival_price', 'exec_price',
+    'submitted_at', 'filled_at', 'latency_ms', 'spread', 'imbalance', 'top_depth',
+    'slippage_bps', 'shortfall_bps', 'markout_1s', 'markout_10s', 'markout_60s'
+)
+
+
+class TradeStore:
+    def __init__(self, path):
+        """
+        SQLite işlem deposu (TradeAnalyzer'ın veritabanı arayüzü)
+
+        Yazımlar toplu yapılır ve executor'da çağrılmalıdır; bağlantı
+        thread'ler arasında kilitle paylaşılır.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self._create_tables()
+
+    def _create_tables(self):
+        with self.lock, self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS positions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    symbol TEXT,
+                    side TEXT,
+                    size REAL,
+                    entry_price REAL,
+                    exit_price REAL,
+                    pnl REAL,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS executions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    order_id TEXT,
+                    order_type TEXT,
+                    side TEXT,
+                    amount REAL,
+                    intended_price REAL,
+                    arrival_price REAL,
+                    exec_price REAL,
+                    submitted_at REAL,
+                    filled_at REAL,
+                    latency_ms REAL,
+                    spread REAL,
+                    imbalance REAL,
+                    top_depth REAL,
+                    slippage_bps REAL,
+                    shortfall_bps REAL,
+                    markout_1s REAL,
+                    markout_10s REAL,
+                    markout_60s REAL
+                )
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_executions_filled ON executions (filled_at)')
+
+    def record_executions(self, rows):
+        """Dolum kayıtlarını tek işlemde yaz"""
+        if not rows:
+            return 0
+        placeholders = ', '.join('?' for _ in EXECUTION_COLUMNS)
+        try:
+            with self.lock, self.conn:
+                self.conn.executemany(
+                    f"INSERT INTO executions ({', '.join(EXECUTION_COLUMNS)}) VALUES ({placeholders})",
+                    [tuple(row.get(column) for column in EXECUTION_COLUMNS) for row in rows]
+                )
+            return len(rows)
+        except Exception as e:
+            self.logger.error(f"Execution record error: {e}")
+            return 0
+
+    def record_position(self, symbol, side, size, entry_price, exit_price, pnl, timestamp=None):
+        """Kapanan pozisyon (timestamp epoch ms, yoksa şimdi)"""
+        closed_at = (
+            datetime.fromtimestamp(timestamp / 1000, timezone.utc) if timestamp else datetime.now(timezone.utc)
+        ).strftime('%Y-%m-%d %H:%M:%S')
+        try:
+            with self.lock, self.conn:
+                self.conn.execute(
+                    'INSERT INTO positions (symbol, side, size, entry_price, exit_price, pnl, timestamp) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (symbol, side, size, entry_price, exit_price, pnl, closed_at)
+                )
+            return True
+        except Exception as e:
+            self.logger.error(f"Position record error: {e}")
+            return False
+
+    @staticmethod
+    def _bound(value, to_epoch):
+        """Tarih sınırı: epoch saniye veya positions tablosundaki UTC metin biçimi"""
+        if to_epoch:
+            return value.timestamp()
+        if isinstance(value, datetime):
+            # Naive değerler yerel saat kabul edilir (datetime.timestamp ile aynı)
+            return value.astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        return value
+
+    def _query(self, sql, start_date, end_date, column, to_epoch):
+        conditions, params = [], []
+        if start_date is not None:
+            conditions.append(f'{column} >= ?')
+            params.append(self._bound(start_date, to_epoch))
+        if end_date is not None:
+            conditions.append(f'{column} < ?')
+            params.append(self._bound(end_date, to_epoch))
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        with self.lock:
+            return pd.read_sql_query(sql, self.conn, params=params)
+
+    def get_executions(self, start_date=None, end_date=None):
+        """Dolum kayıtları, filled_at epoch saniye"""
+        return self._query('SELECT * FROM executions', start_date, end_date, 'filled_at', True)
+
+    def get_trade_history(self, start_date=None, end_date=None):
+        """Kapanan pozisyonlar (TradeAnalyzer girişi)"""
+        df = self._query('SELECT * FROM positions', start_date, end_date, 'timestamp', False)
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        return df
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -1 +1,32 @@
+# config/trading_config.py
 
+import os
+from settings import TRADING_CONFIG
+
+
+class TradingConfig:
+    def __init__(self, **overrides):
+        """RiskManager için nitelik tabanlı trading konfigürasyonu"""
+        self.SYMBOL = TRADING_CONFIG['symbol']
+        self.SETTLEMENT_CURRENCY = TRADING_CONFIG['settlement_currency']
+        self.POSITION_SIZE_PERCENT = float(
+            os.getenv('POSITION_SIZE_PERCENT', TRADING_CONFIG['position_size_percent'])
+        )
+        self.MAX_LEVERAGE = float(os.getenv('MAX_LEVERAGE', TRADING_CONFIG['max_leverage']))
+        self.USE_LEVERAGE = os.getenv('USE_LEVERAGE', 'True').lower() == 'true'
+        self.STOP_LOSS_PERCENT = float(
+            os.getenv('STOP_LOSS_PERCENT', TRADING_CONFIG['stop_loss_percent'])
+        )
+
+        # Risk limitleri
+        self.MAX_TRADES_PER_DAY = int(os.getenv('MAX_TRADES_PER_DAY', '10'))
+        self.MAX_DAILY_LOSS_PERCENT = float(os.getenv('MAX_DAILY_LOSS_PERCENT', '5'))
+        self.MAX_DRAWDOWN_PERCENT = float(os.getenv('MAX_DRAWDOWN_PERCENT', '20'))
+        self.TRADING_HOURS = {
+            'START': os.getenv('TRADING_HOURS_START', '00:00'),
+            'END': os.getenv('TRADING_HOURS_END', '23:59')
+        }
+        self.INITIAL_BALANCE = float(os.getenv('INITIAL_BALANCE', '0')) or None
+
+        for key, value in overrides.items():
+            setattr(self, key, value)
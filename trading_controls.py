@@ -5,14 +5,28 @@ import dash_bootstrap_components as dbc
 from dash import html, dcc
 from dash.dependencies import Input, Output, State
 
+from rate_limiter import PRIORITY_LOW, get_rate_limit_manager
+
 class TradingControls:
-    def __init__(self, api_key, api_secret, testnet=False):
-        self.exchange = ccxt.bitmex({
-            'apiKey': api_key,
-            'secret': api_secret,
-            'enableRateLimit': True,
-            'test': testnet
-        })
+    def __init__(self, api_key, api_secret, testnet=False, state_store=None):
+        """
+        Trading kontrol paneli
+
+        state_store verilirse bakiye ve fiyat trading döngüsünün yayınladığı
+        snapshot'tan okunur; açık sekme sayısından bağımsız olarak borsaya
+        ek istek gitmez. Verilmezse panel kendi borsa bağlantısını kullanır.
+        """
+        self.state_store = state_store
+        self.exchange = None
+        if state_store is None:
+            self.exchange = ccxt.bitmex({
+                'apiKey': api_key,
+                'secret': api_secret,
+                'enableRateLimit': True,
+                'test': testnet
+            })
+            # Panel çağrıları düşük öncelikli, emir payına dokunmaz
+            get_rate_limit_manager().install(self.exchange, default_priority=PRIORITY_LOW)
         
         # Varsayılan trading parametreleri
         self.trading_params = {
@@ -135,13 +149,24 @@ class TradingControls:
     def update_balance(self):
         """Bakiye bilgisini güncelle"""
         try:
-            balance = self.exchange.fetch_balance()
-            self.trading_params['balance'] = balance['USDT']['free']
+            if self.state_store is not None:
+                balance = self.state_store.get().get('balance')
+                self.trading_params['balance'] = balance['free'] if balance else 0
+            else:
+                balance = self.exchange.fetch_balance()
+                self.trading_params['balance'] = balance['USDT']['free']
             return self.trading_params['balance']
         except Exception as e:
             print(f"Bakiye güncelleme hatası: {e}")
             return 0
 
+    def current_price(self):
+        """Güncel fiyat, snapshot varsa order book orta fiyatı"""
+        if self.state_store is not None:
+            market = self.state_store.get().get('market')
+            return market['price'] if market else None
+        return self.exchange.fetch_ticker('BTC/USD')['last']
+
     def calculate_position_size(self, price):
         """Pozisyon büyüklüğünü hesapla"""
         available_capital = self.trading_params['balance'] * (self.trading_params['capital_percentage'] / 100)
@@ -211,9 +236,10 @@ def setup_callbacks(app, trading_controls):
             'capital_percentage': capital
         })
         
-        # Örnek fiyat (gerçek uygulamada güncel fiyat kullanılacak)
-        current_price = trading_controls.exchange.fetch_ticker('BTC/USD')['last']
-        
+        current_price = trading_controls.current_price()
+        if not current_price:
+            return html.Div("Fiyat verisi bekleniyor"), None
+
         info = trading_controls.format_position_info("LONG", current_price)
         
         pre_trade = [html.Div(f"{k}: {v}") for k, v in info['pre_trade'].items()]
@@ -0,0 +1,195 @@
+# modules/trailing_stop.py
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucket:
+    """Basit token bucket hız sınırlayıcı"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self, tokens=1):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < tokens:
+                return False
+            self.tokens -= tokens
+            return True
+
+
+class TrailingStopEngine:
+    def __init__(self, exchange, config):
+        """
+        Feed'den gelen fiyatı takip edip stop emirlerini yerinde günceller (amend)
+
+        Stop sadece fiyat yapılandırılan tick adımı kadar ilerlediğinde taşınır,
+        tüm pozisyonlar için amend çağrıları ortak bir hız sınırına tabidir.
+        Bekleyen amend'ler birleştirilir, her emir için sadece en son seviye gönderilir.
+
+        Args:
+            exchange: ccxt exchange instance
+            config: TRADING_CONFIG sözlüğü
+        """
+        self.exchange = exchange
+        self.logger = logging.getLogger(__name__)
+
+        self.enabled = config.get('trailing_stop', False)
+        self.native = config.get('native_trailing_stop', False)
+        self.trail_fraction = config.get('trailing_stop_percent', config['stop_loss_percent']) / 100
+        self.tick_size = config.get('tick_size', 0.5)
+        self.step = config.get('trailing_step_ticks', 10) * self.tick_size
+        self.limiter = TokenBucket(config.get('max_amends_per_second', 2))
+
+        self.stops = {}  # order_id -> stop durumu
+        self.pending = OrderedDict()  # order_id -> gönderilecek stop seviyesi
+        self.lock = threading.Lock()
+        self.amend_count = 0
+
+    def _round(self, price):
+        return round(round(price / self.tick_size) * self.tick_size, 8)
+
+    def native_params(self, position_side, reference_price):
+        """Exchange tarafında takip için BitMEX TrailingStopPeg parametreleri"""
+        offset = self._round(reference_price * self.trail_fraction)
+        return {
+            'pegPriceType': 'TrailingStopPeg',
+            # Long pozisyonun stopu fiyatın altında takip eder
+            'pegOffsetValue': -offset if position_side == 'long' else offset,
+            'execInst': 'LastPrice'
+        }
+
+    def track(self, order, symbol, position_side, stop_price, amount, reference_price):
+        """Yerel takip için stop emrini kaydet"""
+        if not self.enabled or self.native:
+            return
+        with self.lock:
+            self.stops[order['id']] = {
+                'symbol': symbol,
+                'position_side': position_side,
+                'side': 'sell' if position_side == 'long' else 'buy',
+                'amount': amount,
+                'stop_price': stop_price,
+                'best_price': reference_price,
+                'tracked_at': time.time()
+            }
+
+    def untrack(self, order_id):
+        """Stop emrini takipten çıkar"""
+        with self.lock:
+            self.stops.pop(order_id, None)
+            self.pending.pop(order_id, None)
+
+    def retain(self, order_ids, cutoff=None):
+        """
+        Sadece verilen emirleri takipte tut (uzlaştırma)
+
+        Args:
+            cutoff: Bu zamandan (epoch saniye) sonra takibe alınan stoplar
+                    listede olmasa da korunur; liste o andan önce çekildi
+        """
+        with self.lock:
+            for order_id, stop in list(self.stops.items()):
+                if order_id in order_ids or (cutoff is not None and stop.get('tracked_at', 0) > cutoff):
+                    continue
+                self.stops.pop(order_id)
+                self.pending.pop(order_id, None)
+
+    def export_state(self):
+        with self.lock:
+            return {order_id: dict(stop) for order_id, stop in self.stops.items()}
+
+    def restore_state(self, state):
+        with self.lock:
+            self.stops = {order_id: dict(stop) for order_id, stop in state.items()}
+
+    def clear(self):
+        with self.lock:
+            self.stops.clear()
+            self.pending.clear()
+
+    def on_price(self, symbol, price):
+        """Fiyat güncellemesi, amend gerekiyorsa True döndür (I/O yapmaz)"""
+        # Tick başına tanı kaydı, DEBUG kapalıyken kayıt nesnesi hiç oluşmaz
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        with self.lock:
+            for order_id, stop in self.stops.items():
+                if stop['symbol'] != symbol:
+                    continue
+
+                if stop['position_side'] == 'long':
+                    if price <= stop['best_price']:
+                        continue
+                    stop['best_price'] = price
+                    candidate = self._round(price * (1 - self.trail_fraction))
+                    moved = candidate - stop['stop_price']
+                else:
+                    if price >= stop['best_price']:
+                        continue
+                    stop['best_price'] = price
+                    candidate = self._round(price * (1 + self.trail_fraction))
+                    moved = stop['stop_price'] - candidate
+
+                if debug:
+                    self.logger.debug(
+                        "Trailing stop best price moved",
+                        extra={'order_id': order_id, 'best_price': price, 'candidate': candidate, 'moved': moved}
+                    )
+                if moved >= self.step:
+                    self.pending[order_id] = candidate
+                    self.pending.move_to_end(order_id)
+
+            return bool(self.pending)
+
+    def flush(self):
+        """Hız sınırı izin verdikçe bekleyen amend'leri gönder"""
+        sent = 0
+        while True:
+            with self.lock:
+                if not self.pending:
+                    return sent
+                if not self.limiter.try_acquire():
+                    self.logger.debug("Trailing stop amends deferred by rate limit", extra={'pending': len(self.pending)})
+                    return sent
+                order_id, stop_price = self.pending.popitem(last=False)
+                stop = self.stops.get(order_id)
+                if stop is None:
+                    continue
+                stop = dict(stop)
+
+            if self._amend(order_id, stop, stop_price):
+                sent += 1
+
+    def _amend(self, order_id, stop, stop_price):
+        try:
+            self.exchange.edit_order(
+                order_id,
+                stop['symbol'],
+                'stop',
+                stop['side'],
+                stop['amount'],
+                None,
+                {'stopPx': stop_price}
+            )
+            with self.lock:
+                if order_id in self.stops:
+                    self.stops[order_id]['stop_price'] = stop_price
+            self.amend_count += 1
+            self.logger.info(
+                f"Trailing stop amended - Order: {order_id}, Stop: {stop_price}",
+                extra={'order_id': order_id, 'stop_price': stop_price}
+            )
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Trailing stop amend error: {e}")
+            return False
@@ -9,18 +9,33 @@ import dash_bootstrap_components as dbc
 from dash.dependencies import Input, Output, State
 import pandas as pd
 import logging
+import threading
 from datetime import datetime
 
+from state_snapshot import StateStore
+
 class DashboardVisualizer:
-    def __init__(self, market_analyzer, order_manager, risk_manager):
-        self.market_analyzer = market_analyzer
-        self.order_manager = order_manager
-        self.risk_manager = risk_manager
+    def __init__(self, state_store=None, depth_history=None):
+        """
+        Dashboard panelleri
+
+        Tüm paneller trading döngüsünün yayınladığı StateStore snapshot'ından
+        okunur, borsaya istek atılmaz. Snapshot aynı süreçteki bottan veya
+        state bus üzerinden (dashboard_server.py) gelebilir. Grafikler snapshot
+        sürümü başına bir kez çizilir ve tüm açık sekmeler aynı figürü paylaşır.
+        Derinlik heatmap'i DepthHistory halkasından artımlı güncellenir.
+        """
+        self.state_store = state_store or StateStore()
+        self.depth_history = depth_history
         self.logger = logging.getLogger(__name__)
         
         # Veri depolama
         self.price_history = []
         self.trade_history = []
+
+        # Snapshot sürümüne göre figür önbelleği: {ad: (sürüm, figür)}
+        self.figure_cache = {}
+        self.figure_lock = threading.Lock()
         
         # Grafik ayarları
         self.chart_config = {
@@ -38,6 +53,10 @@ class DashboardVisualizer:
     def create_main_chart(self):
         """Ana grafik oluştur"""
         try:
+            chart = self.state_store.get().get('chart')
+            if not chart:
+                return None
+
             fig = make_subplots(
                 rows=2, cols=1,
                 shared_xaxes=True,
@@ -49,23 +68,22 @@ class DashboardVisualizer:
             # Mum grafiği
             fig.add_trace(
                 go.Candlestick(
-                    x=self.market_analyzer.price_data.index,
-                    open=self.market_analyzer.price_data['open'],
-                    high=self.market_analyzer.price_data['high'],
-                    low=self.market_analyzer.price_data['low'],
-                    close=self.market_analyzer.price_data['close'],
+                    x=chart['time'],
+                    open=chart['open'],
+                    high=chart['high'],
+                    low=chart['low'],
+                    close=chart['close'],
                     name='XBTUSDT'
                 ),
                 row=1, col=1
             )
             
             # SuperTrend çizgisi
-            supertrend_data = self.market_analyzer.calculate_supertrend()
-            if supertrend_data is not None:
+            if 'upperband' in chart:
                 fig.add_trace(
                     go.Scatter(
-                        x=supertrend_data.index,
-                        y=supertrend_data['upperband'],
+                        x=chart['time'],
+                        y=chart['upperband'],
                         mode='lines',
                         line=dict(color=self.chart_config['colors']['sell']),
                         name='SuperTrend Üst'
@@ -75,8 +93,8 @@ class DashboardVisualizer:
                 
                 fig.add_trace(
                     go.Scatter(
-                        x=supertrend_data.index,
-                        y=supertrend_data['lowerband'],
+                        x=chart['time'],
+                        y=chart['lowerband'],
                         mode='lines',
                         line=dict(color=self.chart_config['colors']['buy']),
                         name='SuperTrend Alt'
@@ -103,16 +121,17 @@ class DashboardVisualizer:
                 )
             
             # Sinyal göstergesi
-            fig.add_trace(
-                go.Scatter(
-                    x=supertrend_data.index,
-                    y=supertrend_data['in_uptrend'],
-                    mode='lines',
-                    line=dict(color=self.chart_config['colors']['line']),
-                    name='SuperTrend Signal'
-                ),
-                row=2, col=1
-            )
+            if 'in_uptrend' in chart:
+                fig.add_trace(
+                    go.Scatter(
+                        x=chart['time'],
+                        y=chart['in_uptrend'],
+                        mode='lines',
+                        line=dict(color=self.chart_config['colors']['line']),
+                        name='SuperTrend Signal'
+                    ),
+                    row=2, col=1
+                )
             
             # Grafik düzeni
             fig.update_layout(
@@ -132,7 +151,7 @@ class DashboardVisualizer:
     def create_order_book_visual(self):
         """Order book görselleştirmesi"""
         try:
-            ob_state = self.order_manager.ob_manager.get_current_state()
+            ob_state = self.state_store.get().get('order_book')
             if not ob_state:
                 return None
                 
@@ -170,6 +189,63 @@ class DashboardVisualizer:
             self.logger.error(f"Order book visualization error: {e}")
             return None
 
+    def create_depth_heatmap(self, window):
+        """Derinlik geçmişi heatmap'i, x fiyat ve y zaman (yeni örnekler alta eklenir)"""
+        fig = go.Figure(
+            go.Heatmap(
+                x=window['prices'],
+                y=(window['times'] * 1000).astype('datetime64[ms]'),
+                z=window['volumes'],
+                colorscale='Viridis',
+                showscale=False,
+                name='Depth'
+            )
+        )
+        fig.update_layout(
+            title='Derinlik Geçmişi',
+            template='plotly_dark',
+            paper_bgcolor=self.chart_config['colors']['background'],
+            plot_bgcolor=self.chart_config['colors']['background'],
+            height=400,
+            uirevision='depth'
+        )
+        return fig
+
+    def update_depth_heatmap(self, cursor):
+        """
+        Heatmap güncellemesi: sadece yeni satırlar extendData ile gönderilir
+
+        Args:
+            cursor: Sekmenin son gördüğü {'history_id', 'origin', 'seq', 'grid_version'}
+                    (ilk yüklemede None)
+
+        Returns:
+            tuple: (figure, extendData, cursor), değişmeyenler dash.no_update
+        """
+        history = self.depth_history
+        if history is None or history.seq == 0:
+            return dash.no_update, dash.no_update, cursor
+
+        # Cursor başka bir worker'ın geçmişinden geliyorsa, ızgara kaydıysa
+        # veya sekme halkanın gerisinde kaldıysa tam çizim
+        window = history.window(after=cursor['seq']) if history.matches(cursor) else None
+        if window is None or (window['grid_version'], window['origin']) != (cursor['grid_version'], cursor['origin']):
+            window = history.window()
+            return self.create_depth_heatmap(window), dash.no_update, history.cursor(window)
+
+        if not len(window['times']):
+            return dash.no_update, dash.no_update, cursor
+
+        extend = [
+            {
+                'y': [(window['times'] * 1000).astype('datetime64[ms]')],
+                'z': [window['volumes']]
+            },
+            [0],
+            history.capacity
+        ]
+        return dash.no_update, extend, history.cursor(window)
+
     def create_dashboard_layout(self):
         """Dashboard layout oluştur"""
         return dbc.Container([
@@ -183,7 +259,9 @@ class DashboardVisualizer:
                 # Sol Panel - Grafikler
                 dbc.Col([
                     dcc.Graph(id='main-chart'),
-                    dcc.Graph(id='order-book-chart')
+                    dcc.Graph(id='order-book-chart'),
+                    dcc.Graph(id='depth-heatmap'),
+                    dcc.Store(id='depth-cursor')
                 ], width=9),
                 
                 # Sağ Panel - Kontroller ve Bilgiler
@@ -215,9 +293,20 @@ class DashboardVisualizer:
             )
         ], fluid=True)
 
+    def cached_figure(self, name, builder):
+        """Figürü snapshot sürümü değiştiyse yeniden çiz, yoksa önbellekten ver"""
+        version = self.state_store.get()['version']
+        with self.figure_lock:
+            cached = self.figure_cache.get(name)
+            if cached and cached[0] == version:
+                return cached[1]
+            figure = builder()
+            self.figure_cache[name] = (version, figure)
+            return figure
+
     def update_position_info(self):
         """Pozisyon bilgilerini güncelle"""
-        position = self.order_manager.get_position()
+        position = self.state_store.get().get('position')
         if not position:
             return html.Div("Aktif pozisyon yok")
             
@@ -230,29 +319,29 @@ class DashboardVisualizer:
 
     def update_signal_info(self):
         """Sinyal bilgilerini güncelle"""
-        signals = self.market_analyzer.current_signals
-        entry_conditions = self.market_analyzer.get_entry_conditions()
-        
+        signals = self.state_store.get().get('signals')
+        if not signals:
+            return html.Div("Sinyal bekleniyor")
+
         return html.Div([
             html.P(f"Yön: {signals['direction'].upper()}"),
-            html.P(f"Sinyal Gücü: {entry_conditions['strength']}%"),
-            html.Div([
-                html.P("Giriş Nedenleri:"),
-                html.Ul([
-                    html.Li(reason) for reason in entry_conditions['reasons']
-                ])
-            ])
+            html.P(f"Trend: {signals['trend']}"),
+            html.P(f"Sinyal Gücü: {signals['strength']:.0f}%"),
+            html.P(f"RSI: {signals['rsi']:.1f}"),
+            html.P(f"Volatilite: {signals['volatility']:.2f}%")
         ])
 
     def update_risk_info(self):
         """Risk metriklerini güncelle"""
-        metrics = self.risk_manager.get_risk_metrics()
-        
+        metrics = self.state_store.get().get('risk_metrics')
+        if not metrics:
+            return html.Div("Risk verisi bekleniyor")
+
         return html.Div([
             html.P(f"Günlük PnL: ${metrics['daily_stats']['pnl']:.2f}"),
-            html.P(f"Max Drawdown: {metrics['account_metrics']['max_drawdown']:.2f}%"),
-            html.P(f"Win Rate: {metrics['position_metrics']['win_rate']:.2f}%"),
-            html.P(f"Avg Slippage: ${metrics['position_metrics']['avg_slippage']:.2f}")
+            html.P(f"Max Drawdown: {metrics['account']['max_drawdown']:.2f}%"),
+            html.P(f"Win Rate: {metrics['daily_stats']['win_rate']:.2f}%"),
+            html.P(f"Blok: {metrics['block_reason'] or '-'}")
         ])
 
     def add_trade_marker(self, trade):
@@ -262,3 +351,43 @@ class DashboardVisualizer:
             'price': trade['entry_price'],
             'side': trade['side']
         })
+
+
+def create_dashboard_app(visualizer):
+    """Dash uygulamasını oluştur"""
+    app = dash.Dash(__name__, external_stylesheets=[dbc.themes.DARKLY])
+    app.layout = visualizer.create_dashboard_layout()
+    setup_dashboard_callbacks(app, visualizer)
+    return app
+
+def setup_dashboard_callbacks(app, visualizer):
+    # Bir panelin hatası diğerlerini bozmasın diye her çıktı ayrı callback
+    @app.callback(Output('main-chart', 'figure'), [Input('update-interval', 'n_intervals')])
+    def update_main_chart(n):
+        return visualizer.cached_figure('main', visualizer.create_main_chart) or dash.no_update
+
+    @app.callback(Output('order-book-chart', 'figure'), [Input('update-interval', 'n_intervals')])
+    def update_order_book(n):
+        return visualizer.cached_figure('order_book', visualizer.create_order_book_visual) or dash.no_update
+
+    @app.callback(
+        [Output('depth-heatmap', 'figure'),
+         Output('depth-heatmap', 'extendData'),
+         Output('depth-cursor', 'data')],
+        [Input('update-interval', 'n_intervals')],
+        [State('depth-cursor', 'data')]
+    )
+    def update_depth_heatmap(n, cursor):
+        return visualizer.update_depth_heatmap(cursor)
+
+    @app.callback(Output('position-info', 'children'), [Input('update-interval', 'n_intervals')])
+    def update_position(n):
+        return visualizer.update_position_info()
+
+    @app.callback(Output('signal-info', 'children'), [Input('update-interval', 'n_intervals')])
+    def update_signals(n):
+        return visualizer.update_signal_info()
+
+    @app.callback(Output('risk-info', 'children'), [Input('update-interval', 'n_intervals')])
+    def update_risk(n):
+        return visualizer.update_risk_info()